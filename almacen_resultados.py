@@ -0,0 +1,93 @@
+# --------------------------------------------
+# ALMACÉN DE RESULTADOS (JSON LINES)
+# --------------------------------------------
+# Cada línea del almacén es un registro JSON con el hash del PDF, su ruta, su tamaño,
+# su número de páginas y el diccionario que devuelve procesar_documento.
+# Al ser un archivo de solo anexado, varios procesos pueden escribir cada uno en su
+# propio almacén y luego se fusionan sin coordinación adicional.
+
+import hashlib  # hashlib: calcula el hash del contenido del PDF para identificarlo sin importar su ruta.
+import json  # json: serializa cada registro en una línea de texto.
+import os  # os: tamaños de archivo y escrituras seguras en disco.
+
+
+def calcular_hash(ruta_pdf, tam_bloque=1 << 20):
+    """
+    Calcula el SHA-256 del contenido del archivo, leyendo por bloques
+    para no cargar PDFs grandes completos en memoria.
+    """
+    sha = hashlib.sha256()
+    with open(ruta_pdf, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(tam_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def construir_registro(ruta_pdf, resultado, hash_pdf=None, num_paginas=None):
+    """ Arma el registro que se guarda en el almacén para un documento procesado. """
+    return {
+        "hash": hash_pdf or calcular_hash(ruta_pdf),
+        "ruta": ruta_pdf,
+        "bytes": os.path.getsize(ruta_pdf),
+        "paginas": num_paginas,
+        "resultado": resultado,
+    }
+
+
+def guardar_registro(ruta_almacen, registro):
+    """
+    Agrega un registro al final del almacén. Se escribe la línea completa de una vez
+    y se fuerza a disco para que un corte no deje registros a medias en el sistema de archivos en red.
+    """
+    linea = json.dumps(registro, ensure_ascii=False) + "\n"
+    with open(ruta_almacen, "a", encoding="utf-8") as archivo:
+        archivo.write(linea)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+
+
+def leer_almacen(ruta_almacen):
+    """
+    Recorre los registros del almacén uno por uno (sin cargarlo completo).
+    Una última línea incompleta (proceso interrumpido) se ignora.
+    """
+    if not os.path.exists(ruta_almacen):
+        return
+    with open(ruta_almacen, encoding="utf-8") as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                print(f"⚠️ Registro incompleto ignorado en {ruta_almacen}")
+
+
+def hashes_en_almacen(ruta_almacen):
+    """ Devuelve el conjunto de hashes ya procesados, útil para reanudar un lote. """
+    return {registro["hash"] for registro in leer_almacen(ruta_almacen)}
+
+
+def fusionar_almacenes(rutas_almacenes, ruta_destino):
+    """
+    Combina varios almacenes en uno solo. Si un mismo documento (mismo hash)
+    aparece en más de un almacén, se conserva el primer registro encontrado.
+    Devuelve el número de registros escritos.
+    """
+    vistos = set()
+    escritos = 0
+    ruta_temporal = ruta_destino + ".tmp"
+
+    with open(ruta_temporal, "w", encoding="utf-8") as destino:
+        for ruta in rutas_almacenes:
+            for registro in leer_almacen(ruta):
+                if registro["hash"] in vistos:
+                    continue
+                vistos.add(registro["hash"])
+                destino.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                escritos += 1
+
+    # Se reemplaza el destino solo cuando la fusión terminó completa
+    os.replace(ruta_temporal, ruta_destino)
+    return escritos
@@ -0,0 +1,311 @@
+# --------------------------------------------
+# ALMACÉN DE TEXTO DEL CORPUS (MMAP + ÍNDICE DE DESPLAZAMIENTOS)
+# --------------------------------------------
+# Guarda el texto de cada página (el que produce extraer_texto_paginado) de todos los
+# documentos en un solo archivo de solo anexado, con un índice compacto para llegar a
+# cualquier página sin abrir el PDF ni cargar un JSON por documento:
+#
+#   base.texto    texto UTF-8 de todas las páginas, una tras otra
+#   base.paginas  desplazamiento en bytes donde empieza cada página (uint64)
+#   base.imagenes cantidad de imágenes de cada página (uint16), en el mismo orden que base.paginas
+#   base.docs     un registro fijo por documento: hash, primera página en base.paginas,
+#                 cantidad de páginas y byte donde termina su texto
+#
+# Las imágenes por página se guardan porque clasificar_paginas las usa: sin ellas, un documento
+# procesado desde el almacén podría tener otros papeles de página que uno recién extraído.
+# En almacenes anteriores a base.imagenes esas páginas quedan marcadas como desconocidas.
+#
+# Los archivos se leen con mmap: leer una página es tomar un rango del archivo ya mapeado.
+# El registro en base.docs se escribe al final, así un corte a medias deja bytes sin usar
+# pero nunca un documento incompleto; antes de agregar, los archivos se recortan hasta
+# donde llega el último registro completo. Un solo proceso debe escribir en cada almacén
+# (en manifiesto.py cada fragmento tiene el suyo).
+
+import argparse
+import mmap
+import os
+
+import numpy as np
+
+from procedencia import desplazamientos_paginas
+
+TIPO_DOCUMENTO = np.dtype([
+    ("hash", "S32"),  # SHA-256 del PDF en bytes (32 en lugar de 64 caracteres)
+    ("primera", "<u8"),
+    ("paginas", "<u4"),
+    ("fin", "<u8"),
+])
+TIPO_PAGINA = np.dtype("<u8")
+TIPO_IMAGENES = np.dtype("<u2")
+IMAGENES_DESCONOCIDAS = np.iinfo(TIPO_IMAGENES).max  # Páginas guardadas sin la cantidad de imágenes
+
+
+def hash_en_bytes(valor):
+    """ NumPy quita los bytes nulos del final de un campo S32; se restituyen para comparar. """
+    return bytes(valor).ljust(TIPO_DOCUMENTO["hash"].itemsize, b"\0")
+
+
+def rutas_almacen_texto(base):
+    return base + ".texto", base + ".paginas", base + ".imagenes", base + ".docs"
+
+
+class AlmacenTexto:
+    """ Almacén de texto por páginas. Se abre para leer y para agregar documentos. """
+
+    def __init__(self, base):
+        self.base = base
+        self.ruta_texto, self.ruta_paginas, self.ruta_imagenes, self.ruta_docs = rutas_almacen_texto(base)
+        for ruta in rutas_almacen_texto(base):
+            if not os.path.exists(ruta):
+                open(ruta, "ab").close()
+        self._mapa = None
+        self.abrir()
+
+    # ----- lectura -----
+
+    def abrir(self):
+        """ Mapea los archivos y arma el índice de hashes. """
+        self.cerrar()
+        self._remapear()
+        self.fila_por_hash = {hash_en_bytes(h): i for i, h in enumerate(self.docs["hash"])}
+
+    def _remapear(self):
+        """
+        Vuelve a mapear lo que creció desde la última lectura. El mapa anterior del texto no se
+        cierra: si alguien todavía tiene una vista sobre él, se libera cuando ya no se use.
+        """
+        tamano = os.path.getsize(self.ruta_texto)
+        if tamano and (self._mapa is None or len(self._mapa) < tamano):
+            with open(self.ruta_texto, "rb") as archivo:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self.paginas = self._mapear(self.ruta_paginas, TIPO_PAGINA)
+        self.imagenes = self._mapear(self.ruta_imagenes, TIPO_IMAGENES)
+        self.docs = self._mapear(self.ruta_docs, TIPO_DOCUMENTO)
+        self._desactualizado = False
+
+    def _actualizar(self):
+        """ Después de agregar, los mapas se renuevan recién en la siguiente lectura. """
+        if self._desactualizado:
+            self._remapear()
+
+    @staticmethod
+    def _mapear(ruta, tipo):
+        cantidad = os.path.getsize(ruta) // tipo.itemsize
+        if not cantidad:
+            return np.zeros(0, dtype=tipo)
+        return np.memmap(ruta, dtype=tipo, mode="r", shape=(cantidad,))
+
+    def cerrar(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+
+    def __contains__(self, hash_pdf):
+        return bytes.fromhex(hash_pdf) in self.fila_por_hash
+
+    def __len__(self):
+        return len(self.fila_por_hash)
+
+    def hashes(self):
+        self._actualizar()
+        return [hash_en_bytes(h).hex() for h in self.docs["hash"]]
+
+    def _rangos(self, hash_pdf):
+        """ Desplazamientos en bytes del inicio de cada página y del final del documento. """
+        self._actualizar()
+        doc = self.docs[self.fila_por_hash[bytes.fromhex(hash_pdf)]]
+        primera, cantidad = int(doc["primera"]), int(doc["paginas"])
+        return [int(x) for x in self.paginas[primera:primera + cantidad]] + [int(doc["fin"])]
+
+    def imagenes_de(self, hash_pdf):
+        """ Cantidad de imágenes de cada página, o None si el documento se guardó sin ellas. """
+        self._actualizar()
+        doc = self.docs[self.fila_por_hash[bytes.fromhex(hash_pdf)]]
+        primera, cantidad = int(doc["primera"]), int(doc["paginas"])
+        imagenes = self.imagenes[primera:primera + cantidad]
+        if len(imagenes) < cantidad or np.any(imagenes == IMAGENES_DESCONOCIDAS):
+            return None
+        return [int(x) for x in imagenes]
+
+    def bytes_pagina(self, hash_pdf, pagina):
+        """
+        Texto UTF-8 de una página (desde 0). Se copia del mapa: una vista quedaría atada a un
+        mapa que se renueva al agregar documentos.
+        """
+        rangos = self._rangos(hash_pdf)
+        return self._mapa[rangos[pagina]:rangos[pagina + 1]] if self._mapa else b""
+
+    def texto_pagina(self, hash_pdf, pagina):
+        return self.bytes_pagina(hash_pdf, pagina).decode("utf-8")
+
+    def paginas_de(self, hash_pdf):
+        """ Texto de cada página del documento. """
+        rangos = self._rangos(hash_pdf)
+        if not self._mapa:
+            return [""] * (len(rangos) - 1)
+        return [self._mapa[inicio:fin].decode("utf-8") for inicio, fin in zip(rangos, rangos[1:])]
+
+    def texto_de(self, hash_pdf):
+        """ Texto completo del documento, decodificado de una sola vez. """
+        rangos = self._rangos(hash_pdf)
+        return self._mapa[rangos[0]:rangos[-1]].decode("utf-8") if self._mapa else ""
+
+    def extraido(self, hash_pdf, ruta_pdf):
+        """
+        Misma tupla que extraer_texto_paginado (texto, páginas, ruta, desplazamientos, imágenes
+        por página), para pasarla a procesar_documento sin volver a leer el PDF. Las imágenes
+        son None si el documento se guardó antes de que el almacén las registrara.
+        """
+        paginas = self.paginas_de(hash_pdf)
+        return (
+            "".join(paginas), len(paginas), ruta_pdf, desplazamientos_paginas(paginas), self.imagenes_de(hash_pdf)
+        )
+
+    def documentos(self):
+        """ Recorre (hash, texto) de todo el corpus, en el orden en que se agregaron. """
+        for hash_pdf in self.hashes():
+            yield hash_pdf, self.texto_de(hash_pdf)
+
+    # ----- escritura -----
+
+    def recortar_sobrantes(self):
+        """
+        Recorta los archivos hasta donde llega el último documento completo: un corte a
+        medias puede dejar un registro parcial en base.docs, desplazamientos o imágenes de más
+        en base.paginas y base.imagenes, o texto sin documento en base.texto.
+        Si base.imagenes se queda corto (almacén anterior), se completa con IMAGENES_DESCONOCIDAS.
+        Devuelve cuántos documentos hay.
+        """
+        tamano_registro = TIPO_DOCUMENTO.itemsize
+        cantidad = os.path.getsize(self.ruta_docs) // tamano_registro
+        paginas, fin = 0, 0
+        if cantidad:
+            with open(self.ruta_docs, "rb") as archivo:
+                archivo.seek((cantidad - 1) * tamano_registro)
+                ultimo = np.frombuffer(archivo.read(tamano_registro), dtype=TIPO_DOCUMENTO)[0]
+            paginas, fin = int(ultimo["primera"]) + int(ultimo["paginas"]), int(ultimo["fin"])
+
+        for ruta, largo in (
+            (self.ruta_docs, cantidad * tamano_registro),
+            (self.ruta_paginas, paginas * TIPO_PAGINA.itemsize),
+            (self.ruta_imagenes, paginas * TIPO_IMAGENES.itemsize),
+            (self.ruta_texto, fin),
+        ):
+            if os.path.getsize(ruta) > largo:
+                print(f"⚠️ Se descartan {os.path.getsize(ruta) - largo} bytes sin documento en {ruta}")
+                os.truncate(ruta, largo)
+
+        faltantes = paginas - os.path.getsize(self.ruta_imagenes) // TIPO_IMAGENES.itemsize
+        if faltantes > 0:
+            with open(self.ruta_imagenes, "ab") as archivo:
+                archivo.write(np.full(faltantes, IMAGENES_DESCONOCIDAS, dtype=TIPO_IMAGENES).tobytes())
+        return cantidad
+
+    def agregar(self, hash_pdf, paginas, imagenes=None):
+        """
+        Agrega las páginas de un documento (si no estaba), con la cantidad de imágenes de cada
+        una si se conoce. Devuelve True si se agregó.
+        """
+        if hash_pdf in self:
+            return False
+        fila = self.recortar_sobrantes()
+        codificadas = [texto_pagina.encode("utf-8") for texto_pagina in paginas]
+
+        with open(self.ruta_texto, "ab") as archivo:
+            inicio = archivo.seek(0, os.SEEK_END)
+            inicios = inicio + np.concatenate(([0], np.cumsum([len(d) for d in codificadas])[:-1])) if codificadas else []
+            archivo.write(b"".join(codificadas))
+            fin = archivo.tell()
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        with open(self.ruta_paginas, "ab") as archivo:
+            primera = archivo.seek(0, os.SEEK_END) // TIPO_PAGINA.itemsize
+            archivo.write(np.asarray(inicios, dtype=TIPO_PAGINA).tobytes())
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        if imagenes is None:
+            cantidades = np.full(len(paginas), IMAGENES_DESCONOCIDAS, dtype=TIPO_IMAGENES)
+        else:
+            # Más imágenes de las que caben se guardan como el máximo conocido (solo importa que haya)
+            cantidades = np.minimum(np.asarray(imagenes, dtype=np.int64), IMAGENES_DESCONOCIDAS - 1).astype(TIPO_IMAGENES)
+        with open(self.ruta_imagenes, "ab") as archivo:
+            archivo.write(cantidades.tobytes())
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        registro = np.array([(bytes.fromhex(hash_pdf), primera, len(paginas), fin)], dtype=TIPO_DOCUMENTO)
+        with open(self.ruta_docs, "ab") as archivo:
+            archivo.write(registro.tobytes())
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        self.fila_por_hash[bytes.fromhex(hash_pdf)] = fila
+        self._desactualizado = True
+        return True
+
+
+def guardar_texto_pdf(almacen, ruta_pdf, hash_pdf):
+    """
+    Extrae el texto del PDF (una sola vez), lo agrega al almacén y devuelve la tupla
+    de extraer_texto_paginado para seguir procesando sin releer el archivo.
+    """
+    from rae2 import extraer_texto_paginado, separar_paginas
+
+    extraido = extraer_texto_paginado(ruta_pdf)
+    almacen.agregar(hash_pdf, separar_paginas(extraido[0], extraido[3]), extraido[4])
+    return extraido
+
+
+def extraido_o_guardado(almacen, ruta_pdf, hash_pdf):
+    """ Texto desde el almacén si el documento ya está; si no, se extrae del PDF y se guarda. """
+    if hash_pdf in almacen:
+        return almacen.extraido(hash_pdf, ruta_pdf)
+    return guardar_texto_pdf(almacen, ruta_pdf, hash_pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén de texto por páginas del corpus.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_agregar = sub.add_parser("agregar", help="Agrega al almacén el texto de los PDFs de una carpeta.")
+    p_agregar.add_argument("directorio")
+    p_agregar.add_argument("base", help="Ruta base del almacén (sin extensión).")
+
+    p_info = sub.add_parser("info", help="Resumen del almacén.")
+    p_info.add_argument("base")
+
+    p_pagina = sub.add_parser("pagina", help="Muestra el texto de una página (desde 1).")
+    p_pagina.add_argument("base")
+    p_pagina.add_argument("hash")
+    p_pagina.add_argument("pagina", type=int)
+
+    args = parser.parse_args()
+    almacen = AlmacenTexto(args.base)
+
+    if args.accion == "agregar":
+        from almacen_resultados import calcular_hash
+        from manifiesto import enumerar_pdfs
+
+        agregados = 0
+        for ruta_pdf in enumerar_pdfs(args.directorio):
+            hash_pdf = calcular_hash(ruta_pdf)
+            if hash_pdf in almacen:
+                continue
+            try:
+                guardar_texto_pdf(almacen, ruta_pdf, hash_pdf)
+                agregados += 1
+            except Exception as error:
+                print(f"❌ Error leyendo {ruta_pdf}: {error}")
+        print(f"✅ {agregados} documentos agregados ({len(almacen)} en total)")
+    elif args.accion == "info":
+        print(f"📚 {len(almacen)} documentos, {len(almacen.paginas)} páginas, "
+              f"{os.path.getsize(almacen.ruta_texto) / 1e6:.1f} MB de texto")
+    else:
+        print(almacen.texto_pagina(args.hash, args.pagina - 1))
+    almacen.cerrar()
+
+
+if __name__ == "__main__":
+    main()
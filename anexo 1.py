@@ -224,4 +224,5 @@ def seleccionar_multiples_pdfs():
 # EJECUCIÓN DEL PROGRAMA
 # --------------------------------------
 
-seleccionar_multiples_pdfs()
\ No newline at end of file
+if __name__ == "__main__":
+    seleccionar_multiples_pdfs()
\ No newline at end of file
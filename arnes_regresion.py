@@ -0,0 +1,174 @@
+# --------------------------------------------
+# ARNÉS DE REGRESIÓN: PRECISIÓN Y VELOCIDAD
+# --------------------------------------------
+# Ejecuta procesar_documento sobre un conjunto de PDFs anotados y reporta, lado a lado,
+# la precisión y exhaustividad (recall) por campo y los documentos por segundo.
+# Cada PDF del conjunto va acompañado de un JSON con el mismo nombre y los valores esperados:
+#
+#   tesis_001.pdf
+#   tesis_001.json   {"TÍTULO": "...", "AUTOR(ES)": "...", "DIRECTOR": "...",
+#                     "Metodología": "...", "Conclusiones": "...", "Fuentes": "..."}
+#
+# La comparación es por palabras (sin tildes ni mayúsculas), así un cambio de espacios o
+# saltos de línea no cuenta como error. El arnés termina con código 1 si alguna métrica
+# queda por debajo de su umbral o cae más de la tolerancia respecto a la línea base.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from referencias import plegar
+from rae2 import procesar_documento
+
+CAMPOS_EVALUADOS = ["TÍTULO", "AUTOR(ES)", "DIRECTOR", "Metodología", "Conclusiones", "Fuentes"]
+VALORES_VACIOS = {"no encontrado", "no registrado", "no disponible", "no disponibles"}
+
+
+def palabras(valor):
+    """ Bolsa de palabras plegadas de un valor (texto o lista). Los valores centinela cuentan como vacíos. """
+    if valor is None:
+        return Counter()
+    if isinstance(valor, list):
+        valor = " ".join(str(v) for v in valor)
+    valor = str(valor)
+    if plegar(valor) in VALORES_VACIOS:
+        return Counter()
+    return Counter(plegar(valor).split())
+
+
+def cargar_conjunto(directorio):
+    """ Pares (ruta del PDF, valores esperados) de todos los PDFs que tienen su JSON. """
+    conjunto = []
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.lower().endswith(".pdf"):
+            continue
+        ruta_pdf = os.path.join(directorio, nombre)
+        ruta_json = os.path.splitext(ruta_pdf)[0] + ".json"
+        if not os.path.exists(ruta_json):
+            print(f"⚠️ Sin anotación, se omite: {nombre}")
+            continue
+        with open(ruta_json, encoding="utf-8") as archivo:
+            conjunto.append((ruta_pdf, json.load(archivo)))
+    return conjunto
+
+
+def evaluar(conjunto):
+    """
+    Procesa el conjunto y devuelve las métricas: precisión y recall por campo
+    (sumando coincidencias de todos los documentos) y documentos por segundo.
+    """
+    aciertos = Counter()
+    predichas = Counter()
+    esperadas = Counter()
+    tiempo_total = 0.0
+
+    for ruta_pdf, esperado in conjunto:
+        inicio = time.perf_counter()
+        # Se silencia la salida de consola del extractor para que no afecte la medición
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = procesar_documento(ruta_pdf)
+        tiempo_total += time.perf_counter() - inicio
+
+        for campo in CAMPOS_EVALUADOS:
+            if campo not in esperado:
+                continue
+            obtenidas = palabras(resultado.get(campo))
+            correctas = palabras(esperado[campo])
+            aciertos[campo] += sum((obtenidas & correctas).values())
+            predichas[campo] += sum(obtenidas.values())
+            esperadas[campo] += sum(correctas.values())
+
+    metricas = {"campos": {}, "docs_por_segundo": len(conjunto) / tiempo_total if tiempo_total else 0.0}
+    for campo in CAMPOS_EVALUADOS:
+        if not esperadas[campo] and not predichas[campo]:
+            continue
+        metricas["campos"][campo] = {
+            "precision": aciertos[campo] / predichas[campo] if predichas[campo] else 0.0,
+            "recall": aciertos[campo] / esperadas[campo] if esperadas[campo] else 0.0,
+        }
+    return metricas
+
+
+def comparar(metricas, linea_base, min_precision, min_recall, min_docs_seg, tolerancia, tolerancia_velocidad):
+    """ Devuelve la lista de fallas (vacía si todo está dentro de los umbrales). """
+    fallas = []
+    for campo, valores in metricas["campos"].items():
+        if valores["precision"] < min_precision:
+            fallas.append(f"{campo}: precisión {valores['precision']:.3f} < {min_precision}")
+        if valores["recall"] < min_recall:
+            fallas.append(f"{campo}: recall {valores['recall']:.3f} < {min_recall}")
+
+        base = (linea_base or {}).get("campos", {}).get(campo)
+        if base:
+            for metrica in ("precision", "recall"):
+                if valores[metrica] < base[metrica] - tolerancia:
+                    fallas.append(f"{campo}: {metrica} bajó de {base[metrica]:.3f} a {valores[metrica]:.3f}")
+
+    velocidad = metricas["docs_por_segundo"]
+    if velocidad < min_docs_seg:
+        fallas.append(f"velocidad {velocidad:.2f} docs/s < {min_docs_seg}")
+    if linea_base and velocidad < linea_base["docs_por_segundo"] * (1 - tolerancia_velocidad):
+        fallas.append(f"velocidad bajó de {linea_base['docs_por_segundo']:.2f} a {velocidad:.2f} docs/s")
+    return fallas
+
+
+def imprimir_reporte(metricas, linea_base):
+    base_campos = (linea_base or {}).get("campos", {})
+    print(f"\n{'Campo':<16}{'Precisión':>11}{'Recall':>9}{'(base P/R)':>18}")
+    print("-" * 54)
+    for campo, valores in metricas["campos"].items():
+        base = base_campos.get(campo)
+        texto_base = f"{base['precision']:.3f}/{base['recall']:.3f}" if base else "-"
+        print(f"{campo:<16}{valores['precision']:>11.3f}{valores['recall']:>9.3f}{texto_base:>18}")
+    texto_base = f" (base {linea_base['docs_por_segundo']:.2f})" if linea_base else ""
+    print(f"\n⏱️ Velocidad: {metricas['docs_por_segundo']:.2f} docs/s{texto_base}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arnés de regresión de precisión y velocidad del extractor.")
+    parser.add_argument("directorio", help="Carpeta con los PDFs anotados (PDF + JSON esperado).")
+    parser.add_argument("--linea-base", help="JSON con las métricas de referencia de una ejecución anterior.")
+    parser.add_argument("--guardar-linea-base", help="Guarda las métricas de esta ejecución como nueva línea base.")
+    parser.add_argument("--min-precision", type=float, default=0.0)
+    parser.add_argument("--min-recall", type=float, default=0.0)
+    parser.add_argument("--min-docs-seg", type=float, default=0.0)
+    parser.add_argument("--tolerancia", type=float, default=0.02,
+                        help="Caída máxima permitida en precisión o recall respecto a la línea base.")
+    parser.add_argument("--tolerancia-velocidad", type=float, default=0.2,
+                        help="Caída relativa máxima permitida en docs/s respecto a la línea base.")
+    args = parser.parse_args()
+
+    conjunto = cargar_conjunto(args.directorio)
+    if not conjunto:
+        print("❌ No hay documentos anotados en el directorio.")
+        sys.exit(1)
+
+    linea_base = None
+    if args.linea_base and os.path.exists(args.linea_base):
+        with open(args.linea_base, encoding="utf-8") as archivo:
+            linea_base = json.load(archivo)
+
+    metricas = evaluar(conjunto)
+    imprimir_reporte(metricas, linea_base)
+
+    if args.guardar_linea_base:
+        with open(args.guardar_linea_base, "w", encoding="utf-8") as archivo:
+            json.dump(metricas, archivo, ensure_ascii=False, indent=1)
+
+    fallas = comparar(metricas, linea_base, args.min_precision, args.min_recall, args.min_docs_seg,
+                      args.tolerancia, args.tolerancia_velocidad)
+    if fallas:
+        print("\n❌ Regresión detectada:")
+        for falla in fallas:
+            print(f"   - {falla}")
+        sys.exit(1)
+    print(f"\n✅ {len(conjunto)} documentos evaluados sin regresiones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+# --------------------------------------------
+# CLASIFICADOR DE LÍNEAS DE INVESTIGACIÓN (N-GRAMAS + MODELO LINEAL)
+# --------------------------------------------
+# Las palabras clave de configuracion_extraccion.json solo reconocen frases literales, y muchas
+# tesis quedan "No clasificada". Este módulo agrega un modo opcional: un modelo lineal (regresión
+# logística, una por línea) sobre n-gramas de palabras (1 y 2) llevados por hash a un vector
+# disperso de tamaño fijo, así no hay vocabulario que guardar ni crecer.
+#
+#   - Se entrena en local con los resultados de uno o varios almacenes. Las líneas que ya tienen
+#     salieron de las palabras clave, así que un "No clasificada" no dice que el documento no
+#     tenga línea (solo que no usa las frases literales): esos documentos no entran como negativos.
+#   - Las etiquetas confirmadas a mano (archivo JSON Lines con {"hash", "lineas"}) sí son
+#     confiables, incluidas las que dicen que un documento no tiene línea. Una parte de ellas se
+#     reserva para calibrar el umbral y medir el modelo; las métricas se informan también para
+#     los documentos sin coincidencias de palabras clave, que son los que el modelo resuelve.
+#   - Se puntúa por lotes: los textos del lote forman una matriz dispersa (SciPy) y se
+#     multiplican de una vez por los pesos (NumPy).
+#   - Las palabras clave siguen siendo el primer filtro: si encuentran líneas, esas se usan
+#     y el modelo solo se consulta para los documentos sin coincidencias.
+#
+# Para usarlo dentro de procesar_documento basta con indicar el modelo entrenado en la
+# variable de entorno MODELO_LINEAS_INVESTIGACION.
+#
+# Uso:
+#   python clasificador_lineas.py entrenar corpus.jsonl --modelo lineas.npz
+#   python clasificador_lineas.py clasificar corpus.jsonl --modelo lineas.npz --salida corpus_clasificado.jsonl
+
+import argparse
+import json
+import os
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from configuracion import LINEAS_INVESTIGACION, PATRONES_LINEAS
+
+SIN_LINEA = "No clasificada"
+BITS_HASH = 18  # 2^18 columnas: pocas colisiones para el vocabulario de títulos y resúmenes
+UMBRAL = 0.5  # Probabilidad mínima para asignar una línea (si no se puede calibrar)
+UMBRALES_CANDIDATOS = np.round(np.arange(0.05, 0.96, 0.05), 2)
+PROPORCION_VALIDACION = 0.5  # Etiquetas confirmadas reservadas para calibrar el umbral y medir
+MIN_VALIDACION = 10  # Con menos etiquetas confirmadas reservadas no se calibra
+SEMILLA = 1
+TAM_LOTE = 5000  # Documentos por lote al puntuar
+EPOCAS = 200
+TASA_APRENDIZAJE = 2.0
+REGULARIZACION = 1e-4
+PATRON_PALABRA = re.compile(r"\w+")
+PRIMO_BIGRAMA = np.uint64(1000003)
+
+
+def lineas_por_palabras_clave(texto):
+    """ Líneas cuyas palabras clave aparecen en el texto, en el orden de la configuración. """
+    texto = texto.lower()
+    return [linea for linea, patron in PATRONES_LINEAS.items() if patron.search(texto)]
+
+
+# --------------------------------------------
+# RASGOS: N-GRAMAS CON HASH
+# --------------------------------------------
+
+@lru_cache(maxsize=1 << 18)
+def hash_palabra(palabra):
+    # crc32 y no hash(): el de Python cambia entre procesos y el modelo se guarda en disco
+    return zlib.crc32(palabra.encode("utf-8"))
+
+
+def columnas_texto(texto, bits=BITS_HASH):
+    """ Columnas (con repetición) de las palabras y pares de palabras consecutivas del texto. """
+    hashes = np.fromiter(
+        (hash_palabra(p) for p in PATRON_PALABRA.findall(texto.lower())), dtype=np.uint64
+    )
+    bigramas = hashes[:-1] * PRIMO_BIGRAMA ^ hashes[1:]
+    return (np.concatenate((hashes, bigramas)) & np.uint64((1 << bits) - 1)).astype(np.int32)
+
+
+def vectorizar(textos, bits=BITS_HASH):
+    """
+    Matriz dispersa (documentos x 2^bits) con log(1 + frecuencia) de cada n-grama,
+    normalizada por fila para que la longitud del resumen no pese.
+    """
+    from scipy import sparse
+
+    columnas = [columnas_texto(texto or "", bits) for texto in textos]
+    indptr = np.zeros(len(columnas) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in columnas], out=indptr[1:])
+    indices = np.concatenate(columnas) if columnas else np.zeros(0, dtype=np.int32)
+    matriz = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(len(columnas), 1 << bits)
+    )
+    matriz.sum_duplicates()
+    matriz.data = np.log1p(matriz.data)
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1.0
+    return sparse.diags(1.0 / normas).dot(matriz).tocsr().astype(np.float32)
+
+
+def texto_de_resultado(resultado):
+    """ Mismo texto que usan las palabras clave en procesar_documento: título y descripción. """
+    info = resultado.get("Información General") or {}
+    descripcion = resultado.get("Descripción") or ""
+    if isinstance(descripcion, list):
+        descripcion = " ".join(descripcion)
+    return f"{info.get('TÍTULO', '')} {descripcion}"
+
+
+# --------------------------------------------
+# MODELO
+# --------------------------------------------
+
+def sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class ModeloLineas:
+    """ Pesos de una regresión logística por línea de investigación. """
+
+    def __init__(self, lineas, pesos, sesgos, bits=BITS_HASH, umbral=UMBRAL):
+        self.lineas = list(lineas)
+        self.pesos = pesos  # (2^bits, líneas), float32
+        self.sesgos = sesgos  # (líneas,)
+        self.bits = bits
+        self.umbral = umbral
+
+    def probabilidades(self, textos):
+        matriz = vectorizar(textos, self.bits)
+        return sigmoide(matriz @ self.pesos + self.sesgos)
+
+    def clasificar(self, textos, tam_lote=TAM_LOTE):
+        """ Lista de líneas por texto (o ["No clasificada"]), puntuando por lotes. """
+        clasificados = []
+        for inicio in range(0, len(textos), tam_lote):
+            asignadas = self.probabilidades(textos[inicio:inicio + tam_lote]) >= self.umbral
+            for fila in asignadas:
+                clasificados.append([self.lineas[j] for j in np.flatnonzero(fila)] or [SIN_LINEA])
+        return clasificados
+
+    def guardar(self, ruta):
+        np.savez_compressed(
+            ruta, lineas=np.array(self.lineas), pesos=self.pesos, sesgos=self.sesgos,
+            bits=self.bits, umbral=self.umbral,
+        )
+
+
+def cargar_modelo(ruta):
+    datos = np.load(ruta)
+    return ModeloLineas(
+        [str(l) for l in datos["lineas"]], datos["pesos"], datos["sesgos"],
+        int(datos["bits"]), float(datos["umbral"]),
+    )
+
+
+@lru_cache(maxsize=1)
+def modelo_configurado():
+    """ Modelo indicado en MODELO_LINEAS_INVESTIGACION, o None si no hay (se carga una vez). """
+    ruta = os.environ.get("MODELO_LINEAS_INVESTIGACION")
+    if not ruta or not os.path.exists(ruta):
+        return None
+    return cargar_modelo(ruta)
+
+
+def matriz_objetivo(etiquetas, lineas):
+    """ 1 donde el documento tiene la línea; un documento sin líneas es negativo en todas. """
+    return np.array([[linea in e for linea in lineas] for e in etiquetas], dtype=np.float32).reshape(-1, len(lineas))
+
+
+def entrenar(textos, etiquetas, lineas=None, bits=BITS_HASH, epocas=EPOCAS,
+             tasa=TASA_APRENDIZAJE, regularizacion=REGULARIZACION):
+    """
+    Entrena por descenso de gradiente (todo el lote en cada época: con la matriz dispersa
+    cada época son dos productos matriz-matriz). 'etiquetas' es una lista de listas de líneas
+    (vacía para los documentos sin línea).
+    Cada línea pondera sus positivos según lo escasos que son, para no aprender a decir siempre "no".
+    """
+    lineas = list(lineas or LINEAS_INVESTIGACION)
+    matriz = vectorizar(textos, bits)
+    objetivo = matriz_objetivo(etiquetas, lineas)
+    positivos = objetivo.sum(axis=0)
+    peso_positivos = np.where(positivos > 0, (len(objetivo) - positivos) / np.maximum(positivos, 1), 1.0)
+    ponderacion = np.where(objetivo > 0, np.maximum(peso_positivos, 1.0), 1.0).astype(np.float32)
+
+    pesos = np.zeros((1 << bits, len(lineas)), dtype=np.float32)
+    sesgos = np.zeros(len(lineas), dtype=np.float32)
+    transpuesta = matriz.T.tocsr()
+    for _ in range(epocas):
+        error = (sigmoide(matriz @ pesos + sesgos) - objetivo) * ponderacion / len(objetivo)
+        pesos -= tasa * (transpuesta @ error + regularizacion * pesos)
+        sesgos -= tasa * error.sum(axis=0)
+    return ModeloLineas(lineas, pesos.astype(np.float32), sesgos.astype(np.float32), bits)
+
+
+def medir(probabilidades, objetivo, umbral):
+    """
+    Precisión, exhaustividad y F1 (sumando todas las líneas) con el umbral dado, y la
+    proporción de documentos sin línea a los que se les asigna alguna.
+    """
+    asignadas = probabilidades >= umbral
+    aciertos = float(np.sum(asignadas & (objetivo > 0)))
+    precision = aciertos / max(1.0, float(asignadas.sum()))
+    exhaustividad = aciertos / max(1.0, float(objetivo.sum()))
+    sin_linea = objetivo.sum(axis=1) == 0
+    return {
+        "umbral": float(umbral),
+        "precision": precision,
+        "exhaustividad": exhaustividad,
+        "f1": 2 * precision * exhaustividad / max(1e-9, precision + exhaustividad),
+        "sin_linea": int(sin_linea.sum()),
+        "sin_linea_asignados": float(asignadas[sin_linea].any(axis=1).mean()) if sin_linea.any() else 0.0,
+    }
+
+
+def calibrar_umbral(probabilidades, objetivo):
+    """ Umbral candidato con mejor F1; ante un empate, el más alto (asigna menos líneas). """
+    return max(UMBRALES_CANDIDATOS, key=lambda umbral: (medir(probabilidades, objetivo, umbral)["f1"], umbral))
+
+
+def entrenar_con_validacion(textos, etiquetas, confirmadas, umbral=None, proporcion=PROPORCION_VALIDACION, **opciones):
+    """
+    'confirmadas' marca los ejemplos con etiqueta confirmada a mano. Una proporción de ellos (al
+    azar, con semilla fija) no se usa para entrenar: con ellos se calibra el umbral (si no se da
+    uno) y se mide el modelo, en total y solo en los que no tienen coincidencias de palabras clave.
+    Devuelve (modelo, métricas); las métricas son None si hay muy pocas etiquetas confirmadas, y
+    entonces se entrena con todo y se usa el umbral dado o UMBRAL.
+    """
+    indices_confirmados = np.flatnonzero(confirmadas)
+    orden = np.random.RandomState(SEMILLA).permutation(indices_confirmados)
+    validacion = orden[:int(len(orden) * proporcion)]
+    if len(validacion) < MIN_VALIDACION:
+        modelo = entrenar(textos, etiquetas, **opciones)
+        modelo.umbral = UMBRAL if umbral is None else umbral
+        return modelo, None
+
+    reservados = set(validacion.tolist())
+    entrenamiento = [i for i in range(len(textos)) if i not in reservados]
+    modelo = entrenar([textos[i] for i in entrenamiento], [etiquetas[i] for i in entrenamiento], **opciones)
+    probabilidades = modelo.probabilidades([textos[i] for i in validacion])
+    objetivo = matriz_objetivo([etiquetas[i] for i in validacion], modelo.lineas)
+    modelo.umbral = calibrar_umbral(probabilidades, objetivo) if umbral is None else umbral
+    metricas = medir(probabilidades, objetivo, modelo.umbral)
+    metricas["documentos"] = len(validacion)
+
+    sin_coincidencias = np.array([not lineas_por_palabras_clave(textos[i]) for i in validacion])
+    metricas["sin_palabras_clave"] = (
+        medir(probabilidades[sin_coincidencias], objetivo[sin_coincidencias], modelo.umbral)
+        if sin_coincidencias.any() else None
+    )
+    if metricas["sin_palabras_clave"] is not None:
+        metricas["sin_palabras_clave"]["documentos"] = int(sin_coincidencias.sum())
+    return modelo, metricas
+
+
+# --------------------------------------------
+# CLASIFICACIÓN DE ALMACENES COMPLETOS
+# --------------------------------------------
+
+def cargar_etiquetas_confirmadas(ruta):
+    """
+    Etiquetas revisadas a mano: JSON Lines con {"hash": ..., "lineas": [...]}. Una lista vacía
+    (o ["No clasificada"]) confirma que el documento no pertenece a ninguna línea.
+    """
+    confirmadas = {}
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                datos = json.loads(linea)
+                confirmadas[datos["hash"]] = [l for l in datos.get("lineas") or [] if l in LINEAS_INVESTIGACION]
+    return confirmadas
+
+
+def ejemplos_de_almacenes(rutas_almacen, confirmadas=None):
+    """
+    Textos, líneas y si la etiqueta está confirmada, para los resultados de los almacenes.
+    Con etiqueta confirmada (ver cargar_etiquetas_confirmadas) se usa esa, aunque no tenga línea.
+    Si no, se usan las líneas del resultado; los "No clasificada" se omiten: las palabras clave no
+    los encontraron, lo que no dice si tienen línea o no. Cada hash se toma una sola vez.
+    """
+    from almacen_resultados import leer_almacen
+
+    confirmadas = confirmadas or {}
+    textos, etiquetas, confirmados = [], [], []
+    vistos = set()
+    for ruta in rutas_almacen:
+        for registro in leer_almacen(ruta):
+            hash_pdf = registro.get("hash")
+            if hash_pdf in vistos:
+                continue
+            resultado = registro["resultado"]
+            texto = texto_de_resultado(resultado)
+            if hash_pdf in confirmadas:
+                lineas = confirmadas[hash_pdf]
+            else:
+                lineas = [l for l in resultado.get("LÍNEAS DE INVESTIGACIÓN") or [] if l in LINEAS_INVESTIGACION]
+                if not lineas:
+                    continue
+            if not texto.strip():
+                continue
+            vistos.add(hash_pdf)
+            textos.append(texto)
+            etiquetas.append(lineas)
+            confirmados.append(hash_pdf in confirmadas)
+    return textos, etiquetas, confirmados
+
+
+def resumen_metricas(metricas):
+    return (
+        f"umbral {metricas['umbral']:.2f}, precisión {metricas['precision']:.3f}, "
+        f"exhaustividad {metricas['exhaustividad']:.3f}, F1 {metricas['f1']:.3f}; "
+        f"{metricas['sin_linea_asignados']:.1%} de los {metricas['sin_linea']} sin línea reciben alguna"
+    )
+
+
+def clasificar_textos(textos, modelo, tam_lote=TAM_LOTE):
+    """
+    Palabras clave primero; el modelo solo puntúa, en lotes, los textos sin coincidencias.
+    Devuelve las líneas de cada texto y cuántos resolvió el modelo.
+    """
+    clasificados = [lineas_por_palabras_clave(texto) for texto in textos]
+    pendientes = [i for i, lineas in enumerate(clasificados) if not lineas]
+    for i, lineas in zip(pendientes, modelo.clasificar([textos[i] for i in pendientes], tam_lote)):
+        clasificados[i] = lineas
+    return clasificados, len(pendientes)
+
+
+def lotes_de_registros(ruta_almacen, tam_lote):
+    from almacen_resultados import leer_almacen
+
+    lote = []
+    for registro in leer_almacen(ruta_almacen):
+        lote.append(registro)
+        if len(lote) >= tam_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def clasificar_almacen(ruta_almacen, modelo, ruta_salida, tam_lote=TAM_LOTE):
+    """ Copia el almacén a 'ruta_salida' con las líneas de investigación recalculadas. """
+    cambiados = 0
+    with open(ruta_salida, "w", encoding="utf-8") as salida:
+        for lote in lotes_de_registros(ruta_almacen, tam_lote):
+            textos = [texto_de_resultado(registro["resultado"]) for registro in lote]
+            for registro, lineas in zip(lote, clasificar_textos(textos, modelo, tam_lote)[0]):
+                if registro["resultado"].get("LÍNEAS DE INVESTIGACIÓN") != lineas:
+                    cambiados += 1
+                registro["resultado"]["LÍNEAS DE INVESTIGACIÓN"] = lineas
+                salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    return cambiados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clasificador de líneas de investigación por n-gramas.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_entrenar = sub.add_parser("entrenar", help="Entrena con los resultados de los almacenes.")
+    p_entrenar.add_argument("almacenes", nargs="+")
+    p_entrenar.add_argument("--modelo", required=True, help="Archivo .npz donde se guarda el modelo.")
+    p_entrenar.add_argument("--epocas", type=int, default=EPOCAS)
+    p_entrenar.add_argument("--etiquetas", help="JSON Lines con etiquetas confirmadas a mano ({hash, lineas}).")
+    p_entrenar.add_argument("--umbral", type=float, default=None,
+                            help="Umbral fijo; si no se da, se calibra con las etiquetas confirmadas reservadas.")
+    p_entrenar.add_argument("--validacion", type=float, default=PROPORCION_VALIDACION,
+                            help="Proporción de etiquetas confirmadas reservadas para calibrar y medir.")
+
+    p_clasificar = sub.add_parser("clasificar", help="Recalcula las líneas de un almacén completo.")
+    p_clasificar.add_argument("almacen")
+    p_clasificar.add_argument("--modelo", required=True)
+    p_clasificar.add_argument("--salida", required=True)
+    p_clasificar.add_argument("--tam-lote", type=int, default=TAM_LOTE)
+
+    args = parser.parse_args()
+    if args.accion == "entrenar":
+        confirmadas = cargar_etiquetas_confirmadas(args.etiquetas) if args.etiquetas else {}
+        textos, etiquetas, confirmados = ejemplos_de_almacenes(args.almacenes, confirmadas)
+        if not any(etiquetas):
+            print("❌ No hay resultados clasificados para entrenar.")
+            return
+        modelo, metricas = entrenar_con_validacion(
+            textos, etiquetas, confirmados, args.umbral, args.validacion, epocas=args.epocas
+        )
+        modelo.guardar(args.modelo)
+        print(f"✅ Modelo entrenado con {len(textos)} documentos ({sum(confirmados)} confirmados) → {args.modelo}")
+        if metricas is None:
+            print(f"⚠️ Muy pocas etiquetas confirmadas para validar (--etiquetas); umbral {modelo.umbral:.2f} "
+                  f"sin calibrar y sin métricas: las líneas de las palabras clave no sirven para medir el modelo.")
+        else:
+            print(f"📊 Validación con {metricas['documentos']} confirmados: {resumen_metricas(metricas)}.")
+            sin_palabras = metricas["sin_palabras_clave"]
+            if sin_palabras is None:
+                print("⚠️ Ningún confirmado reservado queda sin coincidencias de palabras clave.")
+            else:
+                print(f"📊 De ellos, {sin_palabras['documentos']} sin coincidencias de palabras clave: "
+                      f"{resumen_metricas(sin_palabras)}.")
+    else:
+        cambiados = clasificar_almacen(args.almacen, cargar_modelo(args.modelo), args.salida, args.tam_lote)
+        print(f"✅ {cambiados} documentos con líneas nuevas → {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
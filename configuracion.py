@@ -0,0 +1,121 @@
+# --------------------------------------------
+# CONFIGURACIÓN DE ENCABEZADOS Y LISTAS DE PALABRAS
+# --------------------------------------------
+# Las variantes de encabezados, los apellidos, las líneas de investigación, las stopwords y
+# las palabras prohibidas viven en configuracion_extraccion.json (versionado), para que cada
+# facultad agregue variantes sin tocar el código. Al importar este módulo la configuración se
+# compila una sola vez en expresiones combinadas y conjuntos, de modo que agregar variantes
+# no multiplica el trabajo por documento.
+#
+# Se puede usar otro archivo con la variable de entorno CONFIGURACION_EXTRACCION.
+
+import json
+import os
+import re
+from functools import lru_cache
+
+VERSION_SOPORTADA = 1
+RUTA_CONFIGURACION = os.environ.get(
+    "CONFIGURACION_EXTRACCION",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "configuracion_extraccion.json"),
+)
+
+
+def cargar_configuracion(ruta=RUTA_CONFIGURACION):
+    with open(ruta, encoding="utf-8") as archivo:
+        config = json.load(archivo)
+    if config.get("version") != VERSION_SOPORTADA:
+        raise ValueError(
+            f"Versión de configuración {config.get('version')} no soportada en {ruta} "
+            f"(se esperaba {VERSION_SOPORTADA})"
+        )
+    return config
+
+
+def compilar_literales(palabras):
+    """
+    Une una lista de palabras en una sola expresión que las busca como subcadenas
+    (sin distinguir mayúsculas). Las más largas van primero para que ganen sobre sus prefijos.
+    """
+    ordenadas = sorted({p.lower() for p in palabras}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in ordenadas), re.IGNORECASE)
+
+
+def alternativas(nombre):
+    """ Variantes de un encabezado unidas en un solo grupo de alternativas. """
+    return "|".join(CONFIG["encabezados"][nombre])
+
+
+CONFIG = cargar_configuracion()
+
+APELLIDOS_COMUNES = CONFIG["apellidos_comunes"]
+LINEAS_INVESTIGACION = CONFIG["lineas_investigacion"]
+STOPWORDS_PALABRAS_CLAVE = frozenset(CONFIG["stopwords_palabras_clave"])
+
+PATRON_APELLIDOS = compilar_literales(APELLIDOS_COMUNES)
+PATRON_ETIQUETAS_NOMBRES = compilar_literales(CONFIG["etiquetas_nombres"])
+PATRON_PROHIBIDAS_LINEAS_NOMBRES = compilar_literales(CONFIG["palabras_prohibidas_lineas_nombres"])
+PATRON_PROHIBIDAS_NOMBRES = compilar_literales(CONFIG["palabras_prohibidas_nombres"])
+
+# Una expresión por línea con todas sus palabras clave: basta un search por línea. Con una sola
+# expresión para todas, en cada posición gana una alternativa, y una palabra que es prefijo de
+# otra de una línea distinta ("evaluación" y "evaluación docente") haría perder una de las líneas.
+PATRONES_LINEAS = {linea: compilar_literales(palabras) for linea, palabras in LINEAS_INVESTIGACION.items()}
+
+
+@lru_cache(maxsize=None)
+def compilar_apellidos(apellidos):
+    """ Expresión de apellidos para una lista distinta de la configurada (recibe una tupla). """
+    return compilar_literales(apellidos)
+
+
+def patron_apellidos(apellidos):
+    if apellidos is APELLIDOS_COMUNES:
+        return PATRON_APELLIDOS
+    return compilar_apellidos(tuple(apellidos))
+
+
+@lru_cache(maxsize=None)
+def patron_seccion(seccion, cierre):
+    """
+    Expresión compilada para encontrar una sección ('descripcion', 'metodologia' o
+    'conclusiones') y su contenido hasta el 'cierre' dado. Se compila una vez por cierre.
+    """
+    if seccion == "descripcion":
+        patron = rf"\s*(\d+\s*\.\s*)?({alternativas('descripcion')})\s*\n([\s\S]*?){cierre}"
+    elif seccion == "metodologia":
+        patron = rf"\s*(\d+\s*\.\s*)?[\s\n]*({alternativas('metodologia')})\s*\n([\s\S]*?){cierre}"
+    elif seccion == "conclusiones":
+        patron = rf"\s*(\d+\s*\.\s*\d*\s*)?({alternativas('conclusiones')})\s*[\n\.]*([\s\S]*?){cierre}"
+    else:
+        raise ValueError(f"Sección desconocida: {seccion}")
+    return re.compile(patron, re.MULTILINE | re.DOTALL)
+
+
+PATRON_FUENTES = re.compile(
+    rf"\s*(\d+[\.\s]*)?({alternativas('fuentes')})\s*\n+(?!\s*\d\.\d)"
+    rf"([\s\S]*?)(?=({alternativas('fin_fuentes')})\s*$)",
+    re.MULTILINE | re.DOTALL,
+)
+
+# Encabezado de la tabla de contenido: debe ocupar la línea completa, así la palabra
+# "contenido" dentro de un párrafo no cuenta como encabezado.
+PATRON_TABLA_CONTENIDO = re.compile(
+    rf"^\s*({alternativas('tabla_contenido')})\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Encabezados al inicio de una página (ver roles_pagina.py): la bibliografía como línea propia
+# ("6. Referencias") y los anexos seguidos o no de su número y nombre ("Anexo 1. Encuesta").
+PATRON_PAGINA_FUENTES = re.compile(
+    rf"^\s*(\d+[\.\s]*)?({alternativas('fuentes')})\s*:?\s*$",
+)
+PATRON_PAGINA_ANEXO = re.compile(
+    rf"^\s*({alternativas('anexos')})\b",
+)
+# Encabezados del cuerpo al inicio de una página: "Capítulo 3..." o una sección de las que se
+# extraen, sola en su línea ("4. Metodología", "CONCLUSIONES").
+PATRON_PAGINA_CUERPO = re.compile(
+    rf"^\s*(?:(?:\d+|[IVX]+)[\.\s]*)?(?:(?i:cap[ií]tulo)\s+[\wÍ]+\b"
+    rf"|(?:{alternativas('descripcion')}|{alternativas('metodologia')}|{alternativas('conclusiones')})\s*:?\s*$)",
+)
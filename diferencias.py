@@ -0,0 +1,205 @@
+# --------------------------------------------
+# DIFERENCIAS ENTRE DOS ALMACENES DE RESULTADOS
+# --------------------------------------------
+# Al cambiar una expresión regular o la lista de apellidos hace falta saber qué documentos
+# cambiaron su resultado y cómo, sin volver a extraer nada. Se comparan dos almacenes (por
+# ejemplo, el de la versión anterior del extractor y el de la nueva) emparejando los registros
+# por el hash del PDF:
+#
+#   1. del almacén "antes" se guarda, por documento, solo la posición de su línea en el archivo
+#      y una huella (blake2b) de la línea completa;
+#   2. el almacén "después" se recorre en flujo: si la huella de la línea coincide, el documento
+#      no cambió y ni siquiera se decodifica; si no, se vuelve a leer (con un salto directo) la
+#      línea del registro anterior y se comparan los campos.
+#
+# Los campos anidados ("Información General", "Procedencia") se comparan por subcampo:
+# "Información General.TÍTULO". Cada cambio se clasifica como "aparece" (antes vacío o
+# "No encontrado"), "desaparece" o "cambia".
+#
+# Uso:
+#   python diferencias.py antes.jsonl despues.jsonl --muestras 3 --salida cambios.jsonl
+
+import argparse
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+
+from modelo_resultado import valor_o_none
+
+MUESTRAS_POR_CAMPO = 3
+LARGO_MUESTRA = 200  # Caracteres de cada valor que se muestran en el resumen
+PATRON_HASH = re.compile(rb'\{"hash":\s*"([0-9a-f]+)"')
+
+
+def campos_planos(resultado):
+    """ Campos del resultado, con los diccionarios anidados abiertos un nivel ("Información General.TÍTULO"). """
+    planos = {}
+    for campo, valor in resultado.items():
+        if isinstance(valor, dict):
+            for subcampo, subvalor in valor.items():
+                planos[f"{campo}.{subcampo}"] = subvalor
+        else:
+            planos[campo] = valor
+    return planos
+
+
+def huella(linea):
+    return hashlib.blake2b(linea.strip(), digest_size=16).digest()
+
+
+def hash_de_linea(linea):
+    """ Hash del PDF sin decodificar todo el registro (guardar_registro lo escribe primero). """
+    encontrado = PATRON_HASH.match(linea)
+    return encontrado.group(1).decode("ascii") if encontrado else json.loads(linea)["hash"]
+
+
+def lineas_con_posicion(ruta_almacen):
+    """ (posición en bytes, hash, línea) de cada registro del almacén; la última línea incompleta se ignora. """
+    with open(ruta_almacen, "rb") as archivo:
+        posicion = 0
+        for linea in archivo:
+            inicio, posicion = posicion, posicion + len(linea)
+            if not linea.strip():
+                continue
+            if not linea.endswith(b"\n"):
+                # guardar_registro escribe la línea completa con su salto: sin él, el proceso se cortó
+                print(f"⚠️ Registro incompleto ignorado en {ruta_almacen}")
+                continue
+            yield inicio, hash_de_linea(linea), linea
+
+
+def indexar_almacen(ruta_almacen):
+    """ hash -> (posición de la línea, huella de la línea). Si un hash se repite, gana el primero. """
+    indice = {}
+    for posicion, hash_pdf, linea in lineas_con_posicion(ruta_almacen):
+        if hash_pdf not in indice:
+            indice[hash_pdf] = (posicion, huella(linea))
+    return indice
+
+
+def leer_registro_en(archivo, posicion):
+    archivo.seek(posicion)
+    return json.loads(archivo.readline())
+
+
+def tipo_de_cambio(antes, despues):
+    if valor_o_none(antes) is None:
+        return "aparece"
+    if valor_o_none(despues) is None:
+        return "desaparece"
+    return "cambia"
+
+
+def diferencias(ruta_antes, ruta_despues, ignorar=()):
+    """
+    Recorre los cambios entre los dos almacenes. Devuelve diccionarios:
+      {"tipo": "nuevo" | "eliminado", "hash", "ruta"}                     documento en uno solo
+      {"tipo": "aparece" | "desaparece" | "cambia", "hash", "ruta",
+       "campo", "antes", "despues"}                                        un campo distinto
+    """
+    ignorar = set(ignorar)
+    indice = indexar_almacen(ruta_antes)
+    vistos = set()
+
+    with open(ruta_antes, "rb") as archivo_antes:
+        for _, hash_pdf, linea in lineas_con_posicion(ruta_despues):
+            if hash_pdf in vistos:
+                continue
+            vistos.add(hash_pdf)
+            if hash_pdf not in indice:
+                yield {"tipo": "nuevo", "hash": hash_pdf, "ruta": json.loads(linea).get("ruta")}
+                continue
+
+            posicion, huella_antes = indice[hash_pdf]
+            if huella(linea) == huella_antes:
+                continue  # Registro idéntico: ni siquiera se decodifica
+
+            registro = json.loads(linea)
+            campos_antes = campos_planos(leer_registro_en(archivo_antes, posicion)["resultado"])
+            campos_despues = campos_planos(registro["resultado"])
+            for campo in sorted(campos_antes.keys() | campos_despues.keys()):
+                if campo in ignorar or campo.split(".", 1)[0] in ignorar:
+                    continue
+                antes, despues = campos_antes.get(campo), campos_despues.get(campo)
+                if antes == despues:
+                    continue
+                yield {
+                    "tipo": tipo_de_cambio(antes, despues),
+                    "hash": hash_pdf,
+                    "ruta": registro.get("ruta"),
+                    "campo": campo,
+                    "antes": antes,
+                    "despues": despues,
+                }
+
+    for hash_pdf in indice.keys() - vistos:
+        yield {"tipo": "eliminado", "hash": hash_pdf, "ruta": None}
+
+
+class ResumenDiferencias:
+    """ Conteos por campo y tipo de cambio, con unas pocas muestras de cada campo. """
+
+    def __init__(self, muestras=MUESTRAS_POR_CAMPO):
+        self.muestras_por_campo = muestras
+        self.conteo = defaultdict(Counter)  # campo -> tipo -> cantidad
+        self.documentos = Counter()  # nuevo / eliminado
+        self.cambiados = set()
+        self.muestras = defaultdict(list)
+
+    def agregar(self, cambio):
+        if cambio["tipo"] in ("nuevo", "eliminado"):
+            self.documentos[cambio["tipo"]] += 1
+            return
+        self.conteo[cambio["campo"]][cambio["tipo"]] += 1
+        self.cambiados.add(cambio["hash"])
+        if len(self.muestras[cambio["campo"]]) < self.muestras_por_campo:
+            self.muestras[cambio["campo"]].append(cambio)
+
+    def imprimir(self):
+        print(f"\n📊 {len(self.cambiados)} documentos con cambios · "
+              f"{self.documentos['nuevo']} nuevos · {self.documentos['eliminado']} eliminados")
+        print(f"\n{'Campo':<40}{'cambia':>8}{'aparece':>9}{'desaparece':>12}")
+        print("-" * 69)
+        for campo in sorted(self.conteo, key=lambda c: -sum(self.conteo[c].values())):
+            conteo = self.conteo[campo]
+            print(f"{campo:<40}{conteo['cambia']:>8}{conteo['aparece']:>9}{conteo['desaparece']:>12}")
+
+        for campo, muestras in self.muestras.items():
+            print(f"\n🔹 {campo}")
+            for cambio in muestras:
+                print(f"   {cambio['tipo']} · {cambio['ruta'] or cambio['hash']}")
+                print(f"      antes:   {recortar(cambio['antes'])}")
+                print(f"      después: {recortar(cambio['despues'])}")
+
+
+def recortar(valor):
+    texto = valor if isinstance(valor, str) else json.dumps(valor, ensure_ascii=False)
+    texto = " ".join(texto.split())
+    return texto if len(texto) <= LARGO_MUESTRA else texto[:LARGO_MUESTRA] + "…"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos almacenes de resultados campo por campo.")
+    parser.add_argument("antes", help="Almacén de referencia (versión anterior del extractor).")
+    parser.add_argument("despues", help="Almacén a comparar.")
+    parser.add_argument("--muestras", type=int, default=MUESTRAS_POR_CAMPO, help="Ejemplos por campo en el resumen.")
+    parser.add_argument("--ignorar", nargs="*", default=[], help='Campos que no se comparan, por ejemplo "Procedencia".')
+    parser.add_argument("--salida", help="JSON Lines donde se escriben todos los cambios.")
+    args = parser.parse_args()
+
+    resumen = ResumenDiferencias(args.muestras)
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else None
+    try:
+        for cambio in diferencias(args.antes, args.despues, args.ignorar):
+            resumen.agregar(cambio)
+            if salida:
+                salida.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+    finally:
+        if salida:
+            salida.close()
+    resumen.imprimir()
+
+
+if __name__ == "__main__":
+    main()
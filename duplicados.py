@@ -0,0 +1,211 @@
+# --------------------------------------------
+# DETECCIÓN DE TESIS CASI DUPLICADAS (MINHASH + LSH)
+# --------------------------------------------
+# Cada documento se resume en una firma MinHash calculada sobre "shingles" (grupos de
+# palabras consecutivas) del texto que ya produce extraer_texto. El índice LSH agrupa
+# las firmas por bandas, de modo que buscar los parecidos de un documento nuevo solo
+# revisa los documentos que comparten alguna banda, no todo el corpus.
+
+import argparse
+import os
+import re
+import unicodedata
+import zlib  # zlib.crc32: hash rápido de 32 bits para cada shingle.
+from collections import defaultdict
+
+import numpy as np  # numpy: calcula las 128 permutaciones de la firma de forma vectorizada.
+
+from almacen_resultados import calcular_hash, construir_registro, guardar_registro
+from manifiesto import enumerar_pdfs
+from rae2 import extraer_texto_paginado, procesar_documento
+from triaje import ESTADO_TEXTO, clasificar_pdf, ruta_cola_triaje, separar
+
+NUM_PERMUTACIONES = 128
+BANDAS = 32  # 32 bandas de 4 filas: se consideran candidatos los pares con similitud ≳ 0.4
+TAM_SHINGLE = 5  # Palabras por shingle
+MIN_PALABRAS = 50  # Con menos palabras (escaneos sin capa de texto, páginas en blanco) no se calcula firma
+UMBRAL_SIMILITUD = 0.8  # Similitud estimada a partir de la cual se marca como casi duplicado
+TAM_BLOQUE = 8192  # Shingles por bloque al calcular la firma
+
+PRIMO_MERSENNE = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Coeficientes fijos de las permutaciones: las firmas deben ser comparables entre ejecuciones
+_generador = np.random.RandomState(1)
+COEF_A = _generador.randint(1, 1 << 32, size=NUM_PERMUTACIONES, dtype=np.uint64)
+COEF_B = _generador.randint(0, 1 << 32, size=NUM_PERMUTACIONES, dtype=np.uint64)
+
+
+def shingles(texto, tam=TAM_SHINGLE):
+    """
+    Devuelve los hashes de los grupos de 'tam' palabras consecutivas del texto, sin tildes
+    y en minúsculas, para que cambios de formato no afecten la comparación.
+    Un texto de menos de MIN_PALABRAS palabras no tiene shingles: todos los textos vacíos o
+    casi vacíos se parecerían entre sí.
+    """
+    texto = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("ascii").lower()
+    palabras = re.findall(r"[a-z0-9]+", texto)
+    if len(palabras) < max(tam, MIN_PALABRAS):
+        return np.empty(0, dtype=np.uint64)
+    return np.fromiter(
+        {zlib.crc32(" ".join(palabras[i:i + tam]).encode()) for i in range(len(palabras) - tam + 1)},
+        dtype=np.uint64,
+    )
+
+
+def firma_minhash(texto):
+    """
+    Calcula la firma MinHash (NUM_PERMUTACIONES enteros) del texto. Sin shingles queda la
+    firma vacía (todos los valores en el máximo), que no se compara con nada (es_firma_vacia).
+    """
+    valores = shingles(texto)
+    firma = np.full(NUM_PERMUTACIONES, MAX_HASH, dtype=np.uint64)
+    # Cada fila es una permutación aplicada a los shingles; el mínimo por fila es la firma.
+    # Se recorre por bloques para no crear una matriz enorme con tesis de cientos de páginas.
+    for inicio in range(0, len(valores), TAM_BLOQUE):
+        bloque = valores[inicio:inicio + TAM_BLOQUE]
+        permutados = (np.outer(COEF_A, bloque) + COEF_B[:, None]) % PRIMO_MERSENNE & MAX_HASH
+        np.minimum(firma, permutados.min(axis=1), out=firma)
+    return firma.astype(np.uint32)
+
+
+def es_firma_vacia(firma):
+    return bool(np.all(firma == np.uint32(MAX_HASH)))
+
+
+def similitud_estimada(firma_a, firma_b):
+    """ Proporción de posiciones iguales entre dos firmas: estima la similitud de Jaccard. """
+    return float(np.mean(firma_a == firma_b))
+
+
+class IndiceLSH:
+    """ Índice de firmas MinHash agrupadas por bandas para buscar casi duplicados. """
+
+    def __init__(self, bandas=BANDAS):
+        self.bandas = bandas
+        self.filas = NUM_PERMUTACIONES // bandas
+        self.ids = []
+        self.firmas = []
+        self.posiciones = {}  # id -> posición en self.ids / self.firmas
+        self.cubetas = defaultdict(list)  # (banda, bytes de la banda) -> posiciones
+
+    def __contains__(self, id_documento):
+        return id_documento in self.posiciones
+
+    def __len__(self):
+        return len(self.ids)
+
+    def claves_bandas(self, firma):
+        for banda in range(self.bandas):
+            yield banda, firma[banda * self.filas:(banda + 1) * self.filas].tobytes()
+
+    def agregar(self, id_documento, firma):
+        if id_documento in self.posiciones:
+            return
+        posicion = len(self.ids)
+        self.ids.append(id_documento)
+        self.firmas.append(firma)
+        self.posiciones[id_documento] = posicion
+        if es_firma_vacia(firma):
+            return  # Se recuerda el documento, pero no entra en las cubetas
+        for clave in self.claves_bandas(firma):
+            self.cubetas[clave].append(posicion)
+
+    def consultar(self, firma, umbral=UMBRAL_SIMILITUD):
+        """
+        Devuelve [(id, similitud)] de los documentos parecidos, de mayor a menor similitud.
+        Solo se comparan los documentos que comparten al menos una banda con la firma;
+        una firma vacía no tiene parecidos.
+        """
+        if es_firma_vacia(firma):
+            return []
+        candidatos = set()
+        for clave in self.claves_bandas(firma):
+            candidatos.update(self.cubetas.get(clave, ()))
+
+        parecidos = []
+        for posicion in candidatos:
+            similitud = similitud_estimada(firma, self.firmas[posicion])
+            if similitud >= umbral:
+                parecidos.append((self.ids[posicion], similitud))
+        return sorted(parecidos, key=lambda par: par[1], reverse=True)
+
+    def guardar(self, ruta_indice):
+        """ Guarda ids y firmas; las cubetas se reconstruyen al cargar. """
+        firmas = np.vstack(self.firmas) if self.firmas else np.empty((0, NUM_PERMUTACIONES), np.uint32)
+        ruta_temporal = ruta_indice + ".tmp.npz"
+        np.savez_compressed(ruta_temporal, ids=np.array(self.ids, dtype=str), firmas=firmas, bandas=self.bandas)
+        os.replace(ruta_temporal, ruta_indice)
+
+    @classmethod
+    def cargar(cls, ruta_indice):
+        if not os.path.exists(ruta_indice):
+            return cls()
+        datos = np.load(ruta_indice)
+        indice = cls(int(datos["bandas"]))
+        for id_documento, firma in zip(datos["ids"], datos["firmas"]):
+            indice.agregar(str(id_documento), firma)
+        return indice
+
+
+def procesar_con_huella(ruta_pdf, indice, ruta_almacen, umbral=UMBRAL_SIMILITUD):
+    """
+    Procesa un PDF pasando antes por el índice de huellas:
+      - si el hash del archivo ya está en el índice, no se vuelve a ejecutar procesar_documento;
+      - si no tiene capa de texto (escaneado, cifrado, dañado), va a la cola de triaje;
+      - si no, se calcula su firma con el mismo texto que luego usa procesar_documento,
+        se buscan sus casi duplicados y se guarda el registro con esa información.
+    Devuelve la lista de casi duplicados, o None si el documento ya era conocido o se separó.
+    """
+    hash_pdf = calcular_hash(ruta_pdf)
+    if hash_pdf in indice:
+        print(f"⏭️ Documento ya conocido, se omite: {ruta_pdf}")
+        return None
+
+    clasificacion = clasificar_pdf(ruta_pdf)
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        separar(ruta_cola_triaje(ruta_almacen), ruta_pdf, clasificacion, hash_pdf)
+        return None
+
+    extraido = extraer_texto_paginado(ruta_pdf)
+    firma = firma_minhash(extraido[0])
+    parecidos = indice.consultar(firma, umbral)
+    if parecidos:
+        print(f"⚠️ Posible duplicado de {len(parecidos)} documento(s): {ruta_pdf}")
+
+    resultado = procesar_documento(ruta_pdf, extraido)
+    registro = construir_registro(ruta_pdf, resultado, hash_pdf, extraido[1])
+    registro["casi_duplicados"] = [{"hash": h, "similitud": round(s, 3)} for h, s in parecidos]
+    guardar_registro(ruta_almacen, registro)
+
+    indice.agregar(hash_pdf, firma)
+    return parecidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Procesa PDFs marcando tesis casi duplicadas.")
+    parser.add_argument("directorio")
+    parser.add_argument("indice", help="Archivo .npz con las firmas del corpus.")
+    parser.add_argument("almacen", help="Almacén JSON Lines donde se guardan los resultados.")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD)
+    args = parser.parse_args()
+
+    indice = IndiceLSH.cargar(args.indice)
+    errores = 0
+    try:
+        for ruta_pdf in enumerar_pdfs(args.directorio):
+            # Un PDF ilegible o que falla no detiene el resto; se vuelve a intentar en la próxima corrida
+            try:
+                procesar_con_huella(ruta_pdf, indice, args.almacen, args.umbral)
+            except Exception as error:
+                errores += 1
+                print(f"❌ Error procesando {ruta_pdf}: {error}")
+    finally:
+        indice.guardar(args.indice)
+    print(f"✅ Índice con {len(indice)} documentos guardado en {args.indice}")
+    if errores:
+        print(f"⚠️ {errores} documento(s) con error no entraron al índice.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# --------------------------------------------
+# EXPORTACIÓN A PARQUET PARTICIONADO
+# --------------------------------------------
+# Convierte los almacenes JSON Lines (los de manifiesto.py, servicio_carpeta.py, etc.) en un
+# conjunto de archivos Parquet particionado por año y por línea de investigación:
+#
+#   destino/año=2021/linea=Educación y tecnología/parte-0.parquet
+#
+# Cada tesis va en una sola partición, la de su primera línea de investigación (en el orden de la
+# configuración); la lista completa queda en la columna "lineas_investigacion" para filtrar.
+# El año es el mismo que da detectar_año (ver ResultadoTesis.año).
+#
+# Los textos largos (descripción, metodología, conclusiones, fuentes...) se guardan sin
+# diccionario y con compresión zstd; el diccionario solo se usa en columnas con pocos valores
+# distintos, donde sí reduce el tamaño.
+#
+# Uso:
+#   python exportar_parquet.py corpus.jsonl otro.jsonl --destino corpus_parquet
+
+import argparse
+import os
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from almacen_resultados import leer_almacen
+from modelo_resultado import ResultadoTesis, a_tabla_arrow, esquema_arrow
+
+TAM_LOTE = 2000  # Documentos por lote en memoria
+SIN_LINEA = "No clasificada"
+COLUMNAS_CON_DICCIONARIO = ["formato", "unidad_patrocinante", "director", "linea"]
+
+
+def esquema_exportacion():
+    return esquema_arrow().append(pa.field("linea", pa.string()))
+
+
+def lotes_de_resultados(rutas_almacen, tam_lote=TAM_LOTE):
+    """
+    Recorre los almacenes en lotes de RecordBatch, sin repetir documentos
+    (si un hash aparece en varios almacenes, gana el primero).
+    """
+    vistos = set()
+    lote = []
+    for ruta in rutas_almacen:
+        for registro in leer_almacen(ruta):
+            if registro["hash"] in vistos:
+                continue
+            vistos.add(registro["hash"])
+            lote.append(ResultadoTesis.desde_registro(registro))
+            if len(lote) >= tam_lote:
+                yield from tabla_lote(lote).to_batches()
+                lote = []
+    if lote:
+        yield from tabla_lote(lote).to_batches()
+
+
+def tabla_lote(resultados):
+    """ Tabla de Arrow del lote con la columna de partición "linea". """
+    lineas = [(r.lineas_investigacion or [SIN_LINEA])[0] for r in resultados]
+    return a_tabla_arrow(resultados).append_column("linea", pa.array(lineas, pa.string()))
+
+
+def exportar(rutas_almacen, destino, tam_lote=TAM_LOTE):
+    """ Escribe el conjunto particionado en 'destino' (reemplaza las particiones que ya existan). """
+    esquema = esquema_exportacion()
+    formato = ds.ParquetFileFormat()
+    opciones = formato.make_write_options(
+        compression="zstd",
+        use_dictionary=COLUMNAS_CON_DICCIONARIO,
+    )
+    ds.write_dataset(
+        lotes_de_resultados(rutas_almacen, tam_lote),
+        destino,
+        schema=esquema,
+        format=formato,
+        file_options=opciones,
+        partitioning=ds.partitioning(
+            pa.schema([("año", pa.int16()), ("linea", pa.string())]), flavor="hive"
+        ),
+        basename_template="parte-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta almacenes de resultados a Parquet particionado.")
+    parser.add_argument("almacenes", nargs="+", help="Almacenes JSON Lines con los resultados.")
+    parser.add_argument("--destino", required=True, help="Carpeta del conjunto Parquet.")
+    parser.add_argument("--tam-lote", type=int, default=TAM_LOTE)
+    args = parser.parse_args()
+
+    for ruta in args.almacenes:
+        if not os.path.exists(ruta):
+            print(f"⚠️ No existe el almacén: {ruta}")
+    exportar(args.almacenes, args.destino, args.tam_lote)
+    print(f"✅ Conjunto Parquet escrito en {args.destino}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# --------------------------------------------
+# EXTRACTOR CONJUNTO CON ENRUTAMIENTO POR COSTO
+# --------------------------------------------
+# Reúne las cuatro estrategias del repositorio bajo una misma interfaz:
+#   - "regex":     expresiones y reglas simples de 'anexo 1.py' (la más barata)
+#   - "apellidos": heurísticas de apellidos y secciones de rae2.py
+#   - "spacy":     entidades nombradas con spaCy de 'anexo 2.py'
+#   - "nltk":      entidades nombradas con NLTK de 'prueba 3.py'
+# Cada estrategia devuelve un valor y una confianza (0 a 1) por campo. El enrutador ejecuta
+# primero las baratas y solo pasa a las de NLP para los campos que quedaron con poca confianza.
+# Los módulos de NLP se cargan la primera vez que hacen falta.
+#
+# Todas las estrategias trabajan sobre el mismo texto (el de extraer_texto de rae2.py),
+# así el documento se lee una sola vez aunque se consulten varias.
+
+import argparse
+import importlib.util
+import os
+import re
+import time
+from collections import Counter
+
+import rae2
+
+CAMPOS = ["Título", "Autor", "Director", "Metodología", "Conclusiones"]
+UMBRAL_CONFIANZA = 0.6
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+ETIQUETAS_PERSONA = re.compile(r"(?i)^\s*(director[a]?|tutor[a]?|asesor[a]?|autor(?:\(es\)|es)?|presentado\s+por)\s*:?\s*")
+
+# Cuántas veces se usó cada estrategia: permite ver qué fracción de documentos llega a NLP
+estadisticas = Counter()
+
+
+def cargar_prototipo(nombre_archivo):
+    """ Importa uno de los prototipos del repositorio (sus nombres tienen espacios). """
+    nombre_modulo = os.path.splitext(nombre_archivo)[0].replace(" ", "_")
+    spec = importlib.util.spec_from_file_location(nombre_modulo, os.path.join(DIRECTORIO, nombre_archivo))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# --------------------------------------------
+# CONFIANZA POR CAMPO
+# --------------------------------------------
+
+def es_vacio(valor):
+    if not valor:
+        return True
+    texto = valor if isinstance(valor, str) else " ".join(valor)
+    return bool(re.search(r"(?i)no\s+encontrad|no\s+registrado|no\s+disponible", texto))
+
+
+def confianza_nombre(valor):
+    """ Qué tanto parece un nombre de persona: largo, mayúsculas, apellido conocido. """
+    nombre = ETIQUETAS_PERSONA.sub("", valor).strip()
+    palabras = nombre.split()
+    if not 2 <= len(palabras) <= 5 or re.search(r"\d|@", nombre) or not rae2.es_nombre_valido(nombre):
+        return 0.1
+    puntaje = 0.4
+    if rae2.patron_apellidos(rae2.APELLIDOS_COMUNES).search(nombre):
+        puntaje += 0.4
+    if all(p[0].isupper() for p in palabras if len(p) > 3):
+        puntaje += 0.2
+    return puntaje
+
+
+def confianza_titulo(valor):
+    palabras = valor.split()
+    if any(pal in valor.upper() for pal in rae2.ENCABEZADOS_INSTITUCIONALES):
+        return 0.2
+    if re.search(r"(?i)\b(director|tutor|asesor|autor|presentado\s+por)\b", valor):
+        return 0.4  # El título arrastró una etiqueta de la portada
+    return 0.9 if 4 <= len(palabras) <= 40 else 0.3
+
+
+def confianza_seccion(valor):
+    # Líneas con puntos guía ("Metodología ........ 4") indican que se tomó la tabla de contenido
+    if re.search(r"\.{4,}|…{2,}", valor[:500]):
+        return 0.2
+    palabras = len(valor.split())
+    if palabras >= 40:
+        return 0.9
+    return 0.5 if palabras > 10 else 0.1
+
+
+def confianza(campo, valor):
+    if es_vacio(valor):
+        return 0.0
+    if campo in ("Autor", "Director"):
+        return confianza_nombre(valor)
+    if campo == "Título":
+        return confianza_titulo(valor)
+    return confianza_seccion(valor)
+
+
+# --------------------------------------------
+# ESTRATEGIAS
+# --------------------------------------------
+
+class Estrategia:
+    """
+    Una forma de extraer los campos. 'extraer' devuelve {campo: (valor, confianza)}
+    solo para los campos pedidos que la estrategia sabe resolver.
+    """
+
+    def __init__(self, nombre, costo, campos, cargar, confiabilidad):
+        self.nombre = nombre
+        self.costo = costo  # Costo relativo por documento, para ordenar las estrategias
+        self.campos = set(campos)
+        self.cargar = cargar  # Devuelve la función (texto, campos) -> {campo: valor}
+        self.confiabilidad = confiabilidad  # Qué tanto se confía en la estrategia en general
+        self._funcion = None
+
+    def extraer(self, texto, campos):
+        campos = self.campos & set(campos)
+        if not campos:
+            return {}
+        if self._funcion is None:
+            self._funcion = self.cargar()
+        estadisticas[self.nombre] += 1
+
+        salida = {}
+        for campo, valor in self._funcion(texto, campos).items():
+            if isinstance(valor, str):
+                valor = ETIQUETAS_PERSONA.sub("", valor).strip() if campo in ("Autor", "Director") else valor.strip()
+            salida[campo] = (valor, round(confianza(campo, valor) * self.confiabilidad, 3))
+        return salida
+
+
+def cargar_regex():
+    anexo_1 = cargar_prototipo("anexo 1.py")
+
+    def extraer(texto, campos):
+        return {c: v for c, v in anexo_1.extraer_informacion_trabajo(texto).items() if c in campos}
+    return extraer
+
+
+def cargar_apellidos():
+    cierres = [r"(?=\n\s*\n)", r"(?=\.\s*\n)"]
+
+    def extraer(texto, campos):
+        # Los nombres están en las primeras páginas; no hace falta recorrer todo el texto
+        inicio = "\n".join(texto.splitlines()[:80])
+        nombres = [
+            n for n in rae2.detectar_nombres_por_apellidos(inicio, rae2.APELLIDOS_COMUNES)
+            if rae2.es_nombre_valido(n)
+        ]
+        salida = {}
+        if "Autor" in campos:
+            salida["Autor"] = nombres[0] if nombres else None
+        if "Director" in campos:
+            salida["Director"] = nombres[-1] if len(nombres) >= 2 else None
+        if "Título" in campos:
+            salida["Título"] = rae2.obtener_titulo(texto, nombres[0] if nombres else None)
+        if "Metodología" in campos:
+            salida["Metodología"] = rae2.extraer_metodologia(texto, cierres)
+        if "Conclusiones" in campos:
+            salida["Conclusiones"] = rae2.extraer_conclusiones(texto, cierres)
+        return salida
+    return extraer
+
+
+def cargar_spacy():
+    anexo_2 = cargar_prototipo("anexo 2.py")
+
+    def extraer(texto, campos):
+        salida = {}
+        if "Autor" in campos:
+            salida["Autor"] = anexo_2.buscar_autor_spacy(texto)
+        if "Director" in campos:
+            salida["Director"] = anexo_2.extraer_director_spacy(texto)
+        return salida
+    return extraer
+
+
+def cargar_nltk():
+    prueba_3 = cargar_prototipo("prueba 3.py")
+
+    def extraer(texto, campos):
+        salida = {}
+        if "Autor" in campos:
+            salida["Autor"] = prueba_3.extraer_autor(texto)
+        if "Metodología" in campos:
+            salida["Metodología"] = prueba_3.extraer_parrafos(texto, "metodología", num_parrafos=2)
+        if "Conclusiones" in campos:
+            salida["Conclusiones"] = prueba_3.extraer_parrafos(texto, "conclusiones", num_parrafos=2)
+        return salida
+    return extraer
+
+
+ESTRATEGIAS = [
+    Estrategia("regex", 1, CAMPOS, cargar_regex, 0.7),
+    Estrategia("apellidos", 3, CAMPOS, cargar_apellidos, 0.9),
+    Estrategia("spacy", 20, ["Autor", "Director"], cargar_spacy, 0.95),
+    Estrategia("nltk", 30, ["Autor", "Metodología", "Conclusiones"], cargar_nltk, 0.6),
+]
+
+
+# --------------------------------------------
+# ENRUTADOR
+# --------------------------------------------
+
+def extraer_con_enrutamiento(texto, umbral=UMBRAL_CONFIANZA, estrategias=ESTRATEGIAS):
+    """
+    Ejecuta las estrategias de la más barata a la más costosa. Cada una solo recibe
+    los campos cuya mejor confianza hasta el momento está por debajo del umbral.
+    Devuelve {campo: {"valor", "confianza", "estrategia"}}.
+    """
+    resultado = {campo: {"valor": None, "confianza": 0.0, "estrategia": None} for campo in CAMPOS}
+    pendientes = set(CAMPOS)
+
+    for estrategia in sorted(estrategias, key=lambda e: e.costo):
+        if not pendientes:
+            break
+        for campo, (valor, conf) in estrategia.extraer(texto, pendientes).items():
+            if conf > resultado[campo]["confianza"]:
+                resultado[campo] = {"valor": valor, "confianza": conf, "estrategia": estrategia.nombre}
+        pendientes = {c for c in pendientes if resultado[c]["confianza"] < umbral}
+
+    return resultado
+
+
+def extraer_documento(ruta_pdf, umbral=UMBRAL_CONFIANZA):
+    texto, _, _ = rae2.extraer_texto(ruta_pdf)
+    return extraer_con_enrutamiento(texto, umbral)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae los campos combinando las cuatro estrategias.")
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_CONFIANZA)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    for ruta_pdf in args.pdfs:
+        print(f"\n📄 {ruta_pdf}")
+        for campo, datos in extraer_documento(ruta_pdf, args.umbral).items():
+            valor = datos["valor"] if isinstance(datos["valor"], str) else "No encontrado"
+            print(f"🔹 {campo} [{datos['estrategia'] or '-'} {datos['confianza']:.2f}]: {valor[:200]}")
+
+    print(f"\n⏱️ {len(args.pdfs)} documentos en {time.perf_counter() - inicio:.1f} s")
+    for nombre, usos in estadisticas.most_common():
+        print(f"   {nombre}: usada en {usos} documento(s)")
+
+
+if __name__ == "__main__":
+    main()
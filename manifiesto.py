@@ -0,0 +1,237 @@
+# --------------------------------------------
+# MANIFIESTO DE CORPUS Y REPARTO EN FRAGMENTOS
+# --------------------------------------------
+# Permite repartir la extracción entre varias máquinas que comparten un sistema de
+# archivos en red. El flujo es:
+#   1. crear:    se recorre el corpus una sola vez (tamaño, hash y páginas de cada PDF)
+#                y se reparte en fragmentos equilibrados por número de páginas.
+#   2. procesar: cada nodo procesa su fragmento y escribe en su propio almacén.
+#   3. fusionar: se combinan los almacenes de todos los fragmentos en uno solo.
+
+import argparse  # argparse: lectura de los argumentos de la línea de comandos.
+import heapq  # heapq: permite encontrar rápidamente el fragmento con menos páginas asignadas.
+import json
+import os
+
+from almacen_resultados import (
+    calcular_hash,
+    construir_registro,
+    fusionar_almacenes,
+    guardar_registro,
+    hashes_en_almacen,
+)
+from almacen_texto import AlmacenTexto, extraido_o_guardado
+from rae2 import procesar_documento
+from triaje import ESTADO_TEXTO, clasificar_pdf, registro_separado, ruta_cola_triaje
+
+
+def enumerar_pdfs(directorio):
+    """ Devuelve las rutas de todos los PDFs bajo el directorio, en orden estable. """
+    rutas = []
+    for raiz, _, archivos in os.walk(directorio):
+        for nombre in archivos:
+            if nombre.lower().endswith(".pdf"):
+                rutas.append(os.path.join(raiz, nombre))
+    return sorted(rutas)
+
+
+def describir_pdf(ruta_pdf, directorio):
+    """
+    Reúne los datos del PDF que necesita el manifiesto. La ruta se guarda relativa
+    al directorio del corpus, porque cada máquina puede montarlo en un lugar distinto.
+    El triaje (ver triaje.py) indica si el PDF tiene texto, es solo imagen, está cifrado o dañado.
+    """
+    clasificacion = clasificar_pdf(ruta_pdf)
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        print(f"⚠️ {ruta_pdf}: {clasificacion['estado']}")
+
+    return {
+        "ruta": os.path.relpath(ruta_pdf, directorio),
+        "bytes": os.path.getsize(ruta_pdf),
+        "hash": calcular_hash(ruta_pdf),
+        "paginas": clasificacion["paginas"],
+        "estado": clasificacion["estado"],
+        "detalle": clasificacion["detalle"],
+    }
+
+
+def repartir_por_paginas(documentos, num_fragmentos):
+    """
+    Reparte los documentos en fragmentos con un total de páginas parecido.
+    Se asignan de mayor a menor al fragmento que lleva menos páginas (el costo de
+    procesar_documento crece con las páginas, no con la cantidad de archivos).
+    """
+    if num_fragmentos < 1:
+        raise ValueError(f"La cantidad de fragmentos debe ser al menos 1 (se pidió {num_fragmentos}).")
+    fragmentos = [[] for _ in range(num_fragmentos)]
+    cargas = [(0, i) for i in range(num_fragmentos)]  # (páginas asignadas, índice)
+
+    for documento in sorted(documentos, key=lambda d: d["paginas"], reverse=True):
+        carga, indice = heapq.heappop(cargas)
+        fragmentos[indice].append(documento)
+        # Un documento sin páginas legibles también cuesta abrirlo
+        heapq.heappush(cargas, (carga + max(documento["paginas"], 1), indice))
+
+    return fragmentos
+
+
+def crear_manifiesto(directorio, ruta_manifiesto, num_fragmentos):
+    """
+    Enumera el corpus una sola vez y guarda el manifiesto con los fragmentos.
+    Los PDFs sin capa de texto, cifrados o dañados no entran en los fragmentos:
+    se anotan en la cola de triaje junto al manifiesto.
+    """
+    directorio = os.path.abspath(directorio)
+    documentos = []
+    separados = []
+    vistos = set()
+
+    for ruta_pdf in enumerar_pdfs(directorio):
+        documento = describir_pdf(ruta_pdf, directorio)
+        # Copias idénticas del mismo PDF se procesan una sola vez
+        if documento["hash"] in vistos:
+            continue
+        vistos.add(documento["hash"])
+        if documento["estado"] == ESTADO_TEXTO:
+            documentos.append(documento)
+        else:
+            separados.append(documento)
+
+    ruta_cola = ruta_cola_triaje(ruta_manifiesto)
+    for documento in separados:
+        clasificacion = {k: documento[k] for k in ("estado", "paginas", "detalle")}
+        registro = registro_separado(os.path.join(directorio, documento["ruta"]), clasificacion, documento["hash"])
+        guardar_registro(ruta_cola, registro)
+
+    fragmentos = repartir_por_paginas(documentos, num_fragmentos)
+    manifiesto = {
+        "version": 1,
+        "directorio": directorio,
+        "fragmentos": [
+            {
+                "indice": i,
+                "paginas": sum(d["paginas"] for d in fragmento),
+                "documentos": fragmento,
+            }
+            for i, fragmento in enumerate(fragmentos)
+        ],
+    }
+
+    # Escritura atómica: los nodos nunca ven un manifiesto a medio escribir
+    ruta_temporal = ruta_manifiesto + ".tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=1)
+    os.replace(ruta_temporal, ruta_manifiesto)
+
+    for fragmento in manifiesto["fragmentos"]:
+        print(f"📦 Fragmento {fragmento['indice']}: {len(fragmento['documentos'])} documentos, {fragmento['paginas']} páginas")
+    if separados:
+        print(f"🚫 {len(separados)} documentos sin texto, cifrados o dañados separados en {ruta_cola}")
+    return manifiesto
+
+
+def cargar_manifiesto(ruta_manifiesto):
+    with open(ruta_manifiesto, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def ruta_almacen_fragmento(ruta_manifiesto, indice):
+    """ Cada fragmento escribe en su propio almacén, junto al manifiesto. """
+    base = os.path.splitext(ruta_manifiesto)[0]
+    return f"{base}.fragmento-{indice:03d}.jsonl"
+
+
+def procesar_fragmento(ruta_manifiesto, indice, raiz=None, guardar_texto=False):
+    """
+    Procesa los documentos de un fragmento y guarda cada resultado en el almacén del fragmento.
+    Si el proceso se interrumpe, al volver a ejecutarlo se saltan los documentos ya guardados.
+    'raiz' permite indicar dónde está montado el corpus en esta máquina.
+    Con 'guardar_texto' el texto de cada página queda en un AlmacenTexto, y al reprocesar
+    se lee de ahí en lugar de volver a abrir el PDF.
+    """
+    manifiesto = cargar_manifiesto(ruta_manifiesto)
+    raiz = raiz or manifiesto["directorio"]
+    fragmento = manifiesto["fragmentos"][indice]
+    ruta_almacen = ruta_almacen_fragmento(ruta_manifiesto, indice)
+    ya_procesados = hashes_en_almacen(ruta_almacen)
+
+    # Los manifiestos anteriores al triaje no traen "estado": se asume que tienen texto
+    pendientes = [
+        d for d in fragmento["documentos"]
+        if d["hash"] not in ya_procesados and d.get("estado", ESTADO_TEXTO) == ESTADO_TEXTO
+    ]
+    # El texto por páginas queda junto al almacén del fragmento (ver almacen_texto.py)
+    almacen_texto = AlmacenTexto(os.path.splitext(ruta_almacen)[0]) if guardar_texto else None
+    print(f"🔹 Fragmento {indice}: {len(pendientes)} de {len(fragmento['documentos'])} documentos pendientes")
+
+    for documento in pendientes:
+        ruta_pdf = os.path.join(raiz, documento["ruta"])
+        print(f"\n📄 Procesando: {ruta_pdf}")
+        try:
+            extraido = extraido_o_guardado(almacen_texto, ruta_pdf, documento["hash"]) if almacen_texto else None
+            resultado = procesar_documento(ruta_pdf, extraido)
+        except Exception as error:
+            print(f"❌ Error procesando {ruta_pdf}: {error}")
+            continue
+        registro = construir_registro(ruta_pdf, resultado, documento["hash"], documento["paginas"])
+        guardar_registro(ruta_almacen, registro)
+
+    if almacen_texto:
+        almacen_texto.cerrar()
+    return ruta_almacen
+
+
+def fusionar_fragmentos(ruta_manifiesto, ruta_destino):
+    """ Combina los almacenes de todos los fragmentos del manifiesto en un único almacén. """
+    manifiesto = cargar_manifiesto(ruta_manifiesto)
+    rutas = [
+        ruta_almacen_fragmento(ruta_manifiesto, fragmento["indice"])
+        for fragmento in manifiesto["fragmentos"]
+    ]
+    faltantes = [ruta for ruta in rutas if not os.path.exists(ruta)]
+    if faltantes:
+        print(f"⚠️ Fragmentos sin almacén todavía: {', '.join(faltantes)}")
+
+    escritos = fusionar_almacenes(rutas, ruta_destino)
+    print(f"✅ {escritos} registros fusionados en {ruta_destino}")
+    return escritos
+
+
+# --------------------------------------------
+# EJECUCIÓN DESDE LA LÍNEA DE COMANDOS
+# --------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Reparto del corpus de PDFs entre varias máquinas.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_crear = sub.add_parser("crear", help="Enumera el corpus y crea el manifiesto con los fragmentos.")
+    p_crear.add_argument("directorio")
+    p_crear.add_argument("manifiesto")
+    p_crear.add_argument("--fragmentos", type=int, required=True)
+
+    p_procesar = sub.add_parser("procesar", help="Procesa un fragmento del manifiesto en esta máquina.")
+    p_procesar.add_argument("manifiesto")
+    p_procesar.add_argument("indice", type=int)
+    p_procesar.add_argument("--raiz", help="Ruta donde está montado el corpus en esta máquina.")
+    p_procesar.add_argument("--guardar-texto", action="store_true",
+                            help="Guarda el texto por páginas en un almacén junto al del fragmento.")
+
+    p_fusionar = sub.add_parser("fusionar", help="Combina los almacenes de todos los fragmentos.")
+    p_fusionar.add_argument("manifiesto")
+    p_fusionar.add_argument("destino")
+
+    args = parser.parse_args()
+    if args.accion == "crear" and args.fragmentos < 1:
+        # Antes de enumerar el corpus, que puede tardar
+        parser.error("--fragmentos debe ser al menos 1")
+    if args.accion == "crear":
+        crear_manifiesto(args.directorio, args.manifiesto, args.fragmentos)
+    elif args.accion == "procesar":
+        procesar_fragmento(args.manifiesto, args.indice, args.raiz, args.guardar_texto)
+    else:
+        fusionar_fragmentos(args.manifiesto, args.destino)
+
+
+if __name__ == "__main__":
+    main()
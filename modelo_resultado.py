@@ -0,0 +1,203 @@
+# --------------------------------------------
+# MODELO COMPACTO DE RESULTADOS
+# --------------------------------------------
+# procesar_documento devuelve diccionarios anidados con claves para mostrar ("TÍTULO",
+# "AUTOR(ES)", ...) y textos centinela ("No encontrado", "No disponible"). Para reportes con
+# muchos documentos en memoria se usa ResultadoTesis: un objeto con __slots__ (sin diccionario
+# por instancia ni claves repetidas), un esquema fijo y None cuando falta un valor.
+#
+# Los dos formatos de documento (RAE y sin formato) se llevan al mismo esquema. Se puede
+# serializar a JSON Lines, a una tabla de Arrow o a Parquet (estos dos requieren pyarrow).
+
+import json
+import re
+
+from almacen_resultados import leer_almacen
+
+CENTINELAS = re.compile(r"(?i)^\s*(no\s+encontrad|no\s+registrado|no\s+disponible|no\s+clasificad)")
+PATRON_AÑO = re.compile(r"\b(20\d{2})\b")  # Mismo criterio que detectar_año en rae2.py
+
+# Esquema estable: (campo, tipo). El tipo es el de Arrow; en Python, None si falta el valor.
+ESQUEMA = [
+    ("hash", "string"),
+    ("ruta", "string"),
+    ("paginas", "int32"),
+    ("formato", "string"),  # "rae" o "libre"
+    ("titulo", "string"),
+    ("autores", "list<string>"),
+    ("director", "string"),
+    ("palabras_clave", "list<string>"),
+    ("unidad_patrocinante", "string"),
+    ("publicacion", "string"),
+    ("año", "int16"),
+    ("descripcion", "string"),
+    ("metodologia", "string"),
+    ("conclusiones", "string"),
+    ("contenidos", "string"),
+    ("fuentes", "string"),
+    ("referencias", "list<referencia>"),
+    ("lineas_investigacion", "list<string>"),
+    ("procedencia", "json"),
+]
+CAMPOS = [campo for campo, _ in ESQUEMA]
+
+
+def valor_o_none(valor):
+    """ Texto limpio, o None si está vacío o es un centinela como "No encontrado". """
+    if valor is None:
+        return None
+    if isinstance(valor, list):
+        valor = "\n".join(str(v) for v in valor)
+    valor = str(valor).strip()
+    if not valor or CENTINELAS.match(valor):
+        return None
+    return valor
+
+
+def lista_de(valor, separador):
+    texto = valor_o_none(valor)
+    if texto is None:
+        return []
+    return [parte.strip() for parte in re.split(separador, texto) if parte.strip()]
+
+
+class ResultadoTesis:
+    """ Resultado de un documento con esquema fijo (ver ESQUEMA). """
+
+    __slots__ = tuple(CAMPOS)
+
+    def __init__(self, **valores):
+        for campo in CAMPOS:
+            setattr(self, campo, valores.pop(campo, None))
+        if valores:
+            raise TypeError(f"Campos desconocidos: {', '.join(valores)}")
+        for campo in ("autores", "palabras_clave", "referencias", "lineas_investigacion"):
+            if getattr(self, campo) is None:
+                setattr(self, campo, [])
+
+    @classmethod
+    def desde_diccionario(cls, resultado, hash_pdf=None, ruta=None, paginas=None):
+        """ Convierte el diccionario de procesar_documento al modelo. """
+        info = resultado.get("Información General") or {}
+        es_rae = "FECHA DE PUBLICACIÓN" in info
+        publicacion = valor_o_none(info.get("FECHA DE PUBLICACIÓN") if es_rae else info.get("PUBLICACIÓN"))
+        año = PATRON_AÑO.search(publicacion) if publicacion else None
+
+        return cls(
+            hash=hash_pdf,
+            ruta=ruta,
+            paginas=paginas,
+            formato="rae" if es_rae else "libre",
+            titulo=valor_o_none(info.get("TÍTULO")),
+            autores=lista_de(info.get("AUTOR(ES)"), r"\s*/\s*|\n+"),
+            director=valor_o_none(info.get("DIRECTOR")),
+            palabras_clave=lista_de(info.get("PALABRAS CLAVE"), r"\s*[,;]\s*"),
+            unidad_patrocinante=valor_o_none(info.get("UNIDAD PATROCINANTE")),
+            publicacion=publicacion,
+            año=int(año.group(1)) if año else None,
+            descripcion=valor_o_none(resultado.get("Descripción")),
+            metodologia=valor_o_none(resultado.get("Metodología")),
+            conclusiones=valor_o_none(resultado.get("Conclusiones")),
+            contenidos=valor_o_none(resultado.get("Contenidos")),
+            fuentes=valor_o_none(resultado.get("Fuentes")),
+            referencias=resultado.get("Referencias") or [],
+            lineas_investigacion=[
+                l for l in resultado.get("LÍNEAS DE INVESTIGACIÓN") or [] if valor_o_none(l)
+            ],
+            procedencia=resultado.get("Procedencia") or None,
+        )
+
+    @classmethod
+    def desde_registro(cls, registro):
+        """ Convierte un registro del almacén (hash, ruta, páginas y resultado). """
+        return cls.desde_diccionario(
+            registro["resultado"], registro.get("hash"), registro.get("ruta"), registro.get("paginas")
+        )
+
+    def a_diccionario(self):
+        return {campo: getattr(self, campo) for campo in CAMPOS}
+
+    def a_json(self):
+        return json.dumps(self.a_diccionario(), ensure_ascii=False)
+
+    def __eq__(self, otro):
+        return isinstance(otro, ResultadoTesis) and all(
+            getattr(self, campo) == getattr(otro, campo) for campo in CAMPOS
+        )
+
+    def __repr__(self):
+        return f"ResultadoTesis(hash={self.hash!r}, titulo={self.titulo!r})"
+
+
+def cargar_resultados(ruta_almacen):
+    """ Recorre el almacén devolviendo ResultadoTesis en lugar de registros sueltos. """
+    for registro in leer_almacen(ruta_almacen):
+        yield ResultadoTesis.desde_registro(registro)
+
+
+# --------------------------------------------
+# SERIALIZACIÓN
+# --------------------------------------------
+
+def escribir_jsonl(resultados, ruta):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for resultado in resultados:
+            archivo.write(resultado.a_json() + "\n")
+
+
+def leer_jsonl(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                yield ResultadoTesis(**json.loads(linea))
+
+
+def esquema_arrow():
+    import pyarrow as pa  # Solo se necesita para Arrow/Parquet
+
+    referencia = pa.struct([
+        ("autores", pa.list_(pa.string())),
+        ("año", pa.int32()),
+        ("titulo", pa.string()),
+        ("fuente", pa.string()),
+    ])
+    tipos = {
+        "string": pa.string(),
+        "json": pa.string(),  # La procedencia tiene claves variables: se guarda como texto JSON
+        "int16": pa.int16(),
+        "int32": pa.int32(),
+        "list<string>": pa.list_(pa.string()),
+        "list<referencia>": pa.list_(referencia),
+    }
+    return pa.schema([(campo, tipos[tipo]) for campo, tipo in ESQUEMA])
+
+
+def a_tabla_arrow(resultados):
+    """ Tabla de Arrow armada por columnas (una lista por campo), sin pasar por diccionarios. """
+    import pyarrow as pa
+
+    resultados = list(resultados)
+    columnas = {campo: [getattr(r, campo) for r in resultados] for campo in CAMPOS}
+    columnas["procedencia"] = [
+        json.dumps(p, ensure_ascii=False) if p is not None else None for p in columnas["procedencia"]
+    ]
+    return pa.table(columnas, schema=esquema_arrow())
+
+
+def desde_tabla_arrow(tabla):
+    for fila in tabla.to_pylist():
+        if fila["procedencia"] is not None:
+            fila["procedencia"] = json.loads(fila["procedencia"])
+        yield ResultadoTesis(**fila)
+
+
+def escribir_parquet(resultados, ruta):
+    import pyarrow.parquet as pq
+
+    pq.write_table(a_tabla_arrow(resultados), ruta)
+
+
+def leer_parquet(ruta):
+    import pyarrow.parquet as pq
+
+    return list(desde_tabla_arrow(pq.read_table(ruta)))
@@ -0,0 +1,307 @@
+# --------------------------------------------
+# ÍNDICE DE PERSONAS (AUTORES Y DIRECTORES)
+# --------------------------------------------
+# Un mismo autor o director aparece escrito de varias formas en el corpus: con y sin tilde
+# (García/Garcia, Merchán/Merchan), con o sin segundo apellido, en mayúsculas, o como
+# "Apellidos, Nombres" en los RAE y "Nombres Apellidos" en los documentos sin formato.
+# Buscar la cadena literal da respuestas incompletas.
+#
+# Cada mención se separa en nombres y apellidos, sin tildes y en minúsculas, y se agrupa:
+#   - bloqueo: solo se compara con las personas que comparten el primer apellido plegado;
+#   - agrupamiento incremental: la mención se une a la persona compatible (mismo segundo
+#     apellido o ausente, nombres iguales o iniciales que coinciden) o crea una nueva.
+#
+# Las consultas ("tesis dirigidas por X") parsean el nombre pedido igual que una mención y
+# solo revisan su bloque, así que responden sin recorrer el corpus.
+#
+# Uso:
+#   python personas.py indexar corpus.jsonl --indice personas.json
+#   python personas.py dirigidas "Luis Fernando Martinez" --indice personas.json
+#   python personas.py autor "Merchan, Laura" --indice personas.json
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from configuracion import APELLIDOS_COMUNES
+
+VERSION_INDICE = 1
+ROLES = ("autor", "director")
+TITULOS = {"dr", "dra", "mg", "msc", "mag", "magister", "phd", "lic", "ing", "prof", "esp", "doctor", "doctora"}
+PARTICULAS = {"de", "del", "la", "las", "los", "san"}  # "de la Torre" es un solo apellido
+SEPARADOR_PERSONAS = re.compile(r"\s*/\s*|\s*;\s*|\n+|\s+y\s+")
+
+
+def plegar(texto):
+    """ Minúsculas y sin tildes: García, GARCIA y Garcia dan lo mismo. """
+    texto = unicodedata.normalize("NFD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+APELLIDOS_PLEGADOS = frozenset(plegar(a) for a in APELLIDOS_COMUNES)
+
+
+def palabras_nombre(texto):
+    """ Palabras del nombre plegadas, sin títulos (Dr., Mg.) y con las partículas unidas a la siguiente. """
+    palabras = [p for p in re.findall(r"[^\W\d_]+", plegar(texto)) if p not in TITULOS]
+    unidas = []
+    pendientes = []
+    for palabra in palabras:
+        if palabra in PARTICULAS:
+            pendientes.append(palabra)
+            continue
+        unidas.append(" ".join(pendientes + [palabra]))
+        pendientes = []
+    return unidas
+
+
+def separar_nombre(texto):
+    """
+    (nombres, apellidos) como tuplas plegadas.
+    Con coma se asume "Apellidos, Nombres"; sin coma, "Nombres Apellidos". Con tres palabras se
+    decide por la lista de apellidos comunes si la segunda es nombre o primer apellido.
+    """
+    if "," in texto:
+        apellidos, nombres = texto.split(",", 1)
+        return tuple(palabras_nombre(nombres)), tuple(palabras_nombre(apellidos))[:2]
+
+    palabras = palabras_nombre(texto)
+    if len(palabras) <= 1:
+        return (), tuple(palabras)
+    if len(palabras) == 2:
+        return tuple(palabras[:1]), tuple(palabras[1:])
+    if len(palabras) == 3:
+        corte = 1 if palabras[1] in APELLIDOS_PLEGADOS else 2
+        return tuple(palabras[:corte]), tuple(palabras[corte:])
+    return tuple(palabras[:-2]), tuple(palabras[-2:])
+
+
+def nombres_compatibles(a, b):
+    """ Nombres iguales en orden; una inicial vale por el nombre completo y los que faltan no cuentan. """
+    for x, y in zip(a, b):
+        if x != y and not ((len(x) == 1 or len(y) == 1) and x[0] == y[0]):
+            return False
+    return True
+
+
+def apellidos_compatibles(a, b):
+    if not a or not b or a[0] != b[0]:
+        return False
+    return len(a) < 2 or len(b) < 2 or a[1] == b[1]
+
+
+def completar(actual, nuevo):
+    """ Combina dos variantes compatibles quedándose con la forma más completa de cada parte. """
+    combinado = []
+    for i in range(max(len(actual), len(nuevo))):
+        combinado.append(max(actual[i:i + 1] + nuevo[i:i + 1], key=len))
+    return tuple(combinado)
+
+
+class Persona:
+    """ Grupo de menciones que corresponden a la misma persona. """
+
+    def __init__(self, id_persona, nombres, apellidos):
+        self.id = id_persona
+        self.nombres = nombres
+        self.apellidos = apellidos
+        self.variantes = Counter()
+        self.documentos = {rol: set() for rol in ROLES}
+
+    @property
+    def bloque(self):
+        return self.apellidos[0]
+
+    def compatible(self, nombres, apellidos):
+        if not apellidos_compatibles(self.apellidos, apellidos):
+            return False
+        if not nombres or not self.nombres:
+            # Solo apellidos: se acepta únicamente si ambos apellidos están y coinciden
+            return len(apellidos) == 2 and apellidos == self.apellidos
+        return nombres_compatibles(self.nombres, nombres)
+
+    def coincidencia(self, nombres, apellidos):
+        """ Cuántas partes coinciden completas: desempata entre varias personas compatibles. """
+        return (
+            sum(x == y for x, y in zip(self.nombres, nombres))
+            + sum(x == y for x, y in zip(self.apellidos, apellidos))
+        )
+
+    def agregar(self, variante, nombres, apellidos, rol, hash_pdf):
+        self.nombres = completar(self.nombres, nombres)
+        self.apellidos = completar(self.apellidos, apellidos)
+        self.variantes[variante] += 1
+        self.documentos[rol].add(hash_pdf)
+
+    def nombre(self):
+        """ La variante más completa; entre iguales, la que trae tildes y luego la más frecuente. """
+        return max(
+            self.variantes,
+            key=lambda v: (len(palabras_nombre(v)), v != plegar(v), self.variantes[v]),
+        )
+
+    def a_diccionario(self):
+        return {
+            "id": self.id,
+            "nombres": list(self.nombres),
+            "apellidos": list(self.apellidos),
+            "variantes": dict(self.variantes),
+            **{rol: sorted(self.documentos[rol]) for rol in ROLES},
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        persona = cls(datos["id"], tuple(datos["nombres"]), tuple(datos["apellidos"]))
+        persona.variantes.update(datos["variantes"])
+        for rol in ROLES:
+            persona.documentos[rol].update(datos[rol])
+        return persona
+
+
+class IndicePersonas:
+    """ Personas del corpus agrupadas por bloque (primer apellido plegado). """
+
+    def __init__(self):
+        self.personas = []
+        self.bloques = defaultdict(list)  # primer apellido -> posiciones en self.personas
+        self.hashes = set()  # Documentos ya indexados
+
+    def __len__(self):
+        return len(self.personas)
+
+    def candidatas(self, nombres, apellidos):
+        """ Personas compatibles del bloque, de la que más coincide a la que menos. """
+        if not apellidos:
+            return []
+        compatibles = [
+            self.personas[i] for i in self.bloques.get(apellidos[0], ())
+            if self.personas[i].compatible(nombres, apellidos)
+        ]
+        return sorted(
+            compatibles,
+            key=lambda p: (p.coincidencia(nombres, apellidos), sum(p.variantes.values())),
+            reverse=True,
+        )
+
+    def agregar_mencion(self, texto, rol, hash_pdf):
+        texto = " ".join(texto.split())
+        nombres, apellidos = separar_nombre(texto)
+        if not apellidos:
+            return None
+        candidatas = self.candidatas(nombres, apellidos)
+        if candidatas:
+            persona = candidatas[0]
+        else:
+            persona = Persona(len(self.personas), nombres, apellidos)
+            self.personas.append(persona)
+            self.bloques[persona.bloque].append(persona.id)
+        persona.agregar(texto, nombres, apellidos, rol, hash_pdf)
+        return persona
+
+    def agregar_resultado(self, hash_pdf, autores, director):
+        """ Indexa las personas de un documento (una sola vez por hash). """
+        if hash_pdf in self.hashes:
+            return False
+        for autor in autores:
+            for mencion in SEPARADOR_PERSONAS.split(autor):
+                self.agregar_mencion(mencion, "autor", hash_pdf)
+        for mencion in SEPARADOR_PERSONAS.split(director or ""):
+            if mencion.strip():
+                self.agregar_mencion(mencion, "director", hash_pdf)
+        self.hashes.add(hash_pdf)
+        return True
+
+    def buscar(self, texto):
+        """ Personas que corresponden al nombre consultado. """
+        return self.candidatas(*separar_nombre(texto))
+
+    def documentos_de(self, texto, rol):
+        """ Hashes de los documentos en que la persona consultada aparece con ese rol. """
+        documentos = set()
+        for persona in self.buscar(texto):
+            documentos |= persona.documentos[rol]
+        return documentos
+
+    def dirigidas_por(self, texto):
+        return self.documentos_de(texto, "director")
+
+    def escritas_por(self, texto):
+        return self.documentos_de(texto, "autor")
+
+    def guardar(self, ruta_indice):
+        datos = {
+            "version": VERSION_INDICE,
+            "hashes": sorted(self.hashes),
+            "personas": [persona.a_diccionario() for persona in self.personas],
+        }
+        ruta_temporal = ruta_indice + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta_indice)
+
+    @classmethod
+    def cargar(cls, ruta_indice):
+        indice = cls()
+        if not os.path.exists(ruta_indice):
+            return indice
+        with open(ruta_indice, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        if datos.get("version") != VERSION_INDICE:
+            raise ValueError(f"Versión de índice de personas no soportada en {ruta_indice}")
+        for persona in map(Persona.desde_diccionario, datos["personas"]):
+            indice.personas.append(persona)
+            indice.bloques[persona.bloque].append(persona.id)
+        indice.hashes.update(datos["hashes"])
+        return indice
+
+
+def indexar_almacenes(indice, rutas_almacen):
+    """ Agrega al índice los documentos de los almacenes que todavía no estén. Devuelve cuántos. """
+    from modelo_resultado import cargar_resultados
+
+    nuevos = 0
+    for ruta in rutas_almacen:
+        for resultado in cargar_resultados(ruta):
+            if indice.agregar_resultado(resultado.hash, resultado.autores, resultado.director):
+                nuevos += 1
+    return nuevos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de autores y directores del corpus.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_indexar = sub.add_parser("indexar", help="Agrega al índice las personas de uno o varios almacenes.")
+    p_indexar.add_argument("almacenes", nargs="+")
+    p_indexar.add_argument("--indice", required=True)
+
+    for accion, ayuda in (("dirigidas", "Tesis dirigidas por la persona."), ("autor", "Tesis escritas por la persona.")):
+        p_consulta = sub.add_parser(accion, help=ayuda)
+        p_consulta.add_argument("nombre")
+        p_consulta.add_argument("--indice", required=True)
+
+    args = parser.parse_args()
+    indice = IndicePersonas.cargar(args.indice)
+
+    if args.accion == "indexar":
+        nuevos = indexar_almacenes(indice, args.almacenes)
+        indice.guardar(args.indice)
+        print(f"✅ {nuevos} documentos nuevos; {len(indice)} personas en {args.indice}")
+        return
+
+    rol = "director" if args.accion == "dirigidas" else "autor"
+    personas = indice.buscar(args.nombre)
+    if not personas:
+        print(f"❌ No se encontró a '{args.nombre}' en el índice.")
+        return
+    for persona in personas:
+        print(f"👤 {persona.nombre()} ({', '.join(sorted(persona.variantes))})")
+        for hash_pdf in sorted(persona.documentos[rol]):
+            print(f"   {hash_pdf}")
+
+
+if __name__ == "__main__":
+    main()
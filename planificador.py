@@ -0,0 +1,86 @@
+# --------------------------------------------
+# PLANIFICADOR DE LOTES POR COSTO ESTIMADO
+# --------------------------------------------
+# El tiempo de procesar_documento crece con las páginas (y el tamaño) del PDF. Si los archivos
+# se envían al grupo de procesos en el orden en que se seleccionaron, unas pocas tesis enormes
+# al final dejan los demás núcleos sin trabajo mientras terminan.
+#
+# Antes de empezar se lee de cada PDF solo el número de páginas y el tamaño del archivo (abrir
+# con fitz no lee el contenido de las páginas), se estima su costo y se envían del más costoso
+# al menos costoso ("el más largo primero"): lo pesado arranca al principio y los documentos
+# cortos rellenan los huecos al final, así el lote dura cerca de trabajo total / núcleos.
+#
+# Solo se envían tantos documentos como procesos haya; así se puede limitar cuántos documentos
+# pesados (que ocupan mucha memoria) corren a la vez, y cancelar no deja trabajos en la cola.
+
+from concurrent.futures import FIRST_COMPLETED, wait
+import os
+
+import fitz
+
+BYTES_POR_PAGINA = 200_000  # Cuántos bytes del archivo pesan como una página más en el costo
+PAGINAS_PESADO = 400  # Desde aquí un documento se considera pesado en memoria
+BYTES_PESADO = 100 * 1024 * 1024
+
+
+def estimar_costo(ruta_pdf):
+    """ Páginas, bytes y costo estimado del PDF. Los que no se pueden abrir se estiman por tamaño. """
+    tamano = os.path.getsize(ruta_pdf)
+    try:
+        with fitz.open(ruta_pdf) as doc:
+            paginas = doc.page_count
+    except Exception:
+        paginas = 0
+    return {
+        "ruta": ruta_pdf,
+        "paginas": paginas,
+        "bytes": tamano,
+        "costo": paginas + tamano / BYTES_POR_PAGINA,
+        "pesado": paginas >= PAGINAS_PESADO or tamano >= BYTES_PESADO,
+    }
+
+
+def max_pesados_por_defecto(procesos):
+    return max(1, procesos // 2)
+
+
+def tomar_siguiente(pendientes, pesados_en_curso, max_pesados):
+    """
+    Saca de 'pendientes' (ordenados de mayor a menor costo) la tarea más costosa que se pueda
+    iniciar: si ya hay demasiados pesados en curso, la más costosa que no sea pesada.
+    """
+    for posicion, tarea in enumerate(pendientes):
+        if not tarea["pesado"] or pesados_en_curso < max_pesados:
+            return pendientes.pop(posicion)
+    return None
+
+
+def ejecutar_por_costo(grupo, funcion, rutas_pdf, procesos, max_pesados=None, cancelar=None, **kwargs):
+    """
+    Ejecuta funcion(ruta, **kwargs) en el grupo de procesos, del documento más costoso al menos
+    costoso, y va devolviendo (ruta, resultado, error) en el orden en que terminan.
+    Si 'cancelar' (threading.Event) se activa, no se inician más documentos; los que están en
+    curso terminan y se devuelven.
+    """
+    max_pesados = max_pesados or max_pesados_por_defecto(procesos)
+    pendientes = sorted((estimar_costo(ruta) for ruta in rutas_pdf), key=lambda t: t["costo"], reverse=True)
+    en_curso = {}
+
+    while pendientes or en_curso:
+        if cancelar is not None and cancelar.is_set():
+            pendientes = []
+        pesados_en_curso = sum(tarea["pesado"] for tarea in en_curso.values())
+        while len(en_curso) < procesos:
+            tarea = tomar_siguiente(pendientes, pesados_en_curso, max_pesados)
+            if tarea is None:
+                break
+            pesados_en_curso += tarea["pesado"]
+            en_curso[grupo.submit(funcion, tarea["ruta"], **kwargs)] = tarea
+        if not en_curso:
+            break
+
+        terminados, _ = wait(en_curso, timeout=0.2, return_when=FIRST_COMPLETED)
+        for futuro in terminados:
+            tarea = en_curso.pop(futuro)
+            error = futuro.exception()
+            yield tarea["ruta"], None if error else futuro.result(), error
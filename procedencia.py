@@ -0,0 +1,237 @@
+# --------------------------------------------
+# PROCEDENCIA DE LOS CAMPOS EXTRAÍDOS
+# --------------------------------------------
+# Cada extractor anota en un diccionario de "ubicaciones" el rango de caracteres donde encontró
+# su campo (el de la coincidencia de su expresión, o la página en que detectó un nombre). Buscar
+# el valor después en todo el documento daría la página equivocada para valores cortos o
+# repetidos: un nombre, una palabra clave o un título que también está en la hoja RAE.
+# Aquí solo se ajusta el rango al valor, buscándolo dentro de lo que anotó el extractor.
+#
+# Como extraer_texto une las páginas en orden, basta con la posición en que empieza cada página
+# (desplazamientos) para pasar de un rango de caracteres a un rango de páginas, sin volver a
+# leer el PDF. Los extractores que trabajan sobre una parte de las páginas (sin el índice, solo
+# cuerpo y referencias) traducen sus rangos al texto completo con mapa_paginas.
+#
+# procesar_documento agrega al resultado la clave "Procedencia":
+#   {"Metodología": {"paginas": [12, 13], "inicio": 30512, "fin": 32840, "inicio_en_pagina": 415,
+#                    "ancla": "El enfoque de esta investigación es"}, ...}
+#
+# Las posiciones se refieren al texto ya limpio (sin encabezados ni pies de página repetidos);
+# para resaltar en el PDF se usa el "ancla", las primeras palabras del campo tal como aparecen.
+#
+# renderizar_evidencia dibuja solo la página donde empieza un campo, resaltando su inicio,
+# para que quien revisa no tenga que abrir el PDF y buscar a mano.
+
+import argparse
+import json
+import re
+from bisect import bisect_right
+
+import fitz
+
+# Campos que se ubican: los de Información General y las secciones de texto corrido.
+# "Contenidos" y "Referencias" se reconstruyen (numeración, registros), por eso no se ubican.
+CAMPOS_CON_PROCEDENCIA = [
+    "TÍTULO", "AUTOR(ES)", "DIRECTOR", "PALABRAS CLAVE",
+    "Descripción", "Metodología", "Conclusiones", "Fuentes",
+]
+PALABRAS_ANCLA = 6  # Palabras del inicio y del final del valor que se buscan en el texto
+VALORES_VACIOS = re.compile(r"(?i)^\s*(no\s+encontrad|no\s+registrado|no\s+disponible)")
+
+
+def desplazamientos_paginas(paginas):
+    """ Posición (en caracteres) donde empieza cada página dentro del texto unido. """
+    desplazamientos = []
+    total = 0
+    for texto_pagina in paginas:
+        desplazamientos.append(total)
+        total += len(texto_pagina)
+    return desplazamientos
+
+
+def pagina_de(posicion, desplazamientos):
+    """ Número de página (desde 1) que contiene la posición dada del texto. """
+    return max(1, bisect_right(desplazamientos, posicion))
+
+
+def patron_ancla(palabras):
+    """ Busca las palabras en orden, admitiendo cualquier separación (espacios, saltos, signos). """
+    return re.compile(r"\W+".join(re.escape(p) for p in palabras))
+
+
+def mapa_paginas(paginas, incluidas):
+    """
+    Para un texto armado con las páginas 'incluidas' (índices en orden): pares (posición en ese
+    texto, posición en el texto completo) del inicio de cada una de ellas.
+    """
+    completo = desplazamientos_paginas(paginas)
+    mapa = []
+    posicion = 0
+    for i in incluidas:
+        mapa.append((posicion, completo[i]))
+        posicion += len(paginas[i])
+    return mapa
+
+
+def rango_en_texto_completo(rango, mapa):
+    """ Traduce un rango (inicio, fin) de un texto parcial al texto completo (ver mapa_paginas). """
+    if not mapa:
+        return rango
+    inicios = [parcial for parcial, _ in mapa]
+
+    def traducir(posicion):
+        parcial, completo = mapa[max(0, bisect_right(inicios, posicion) - 1)]
+        return completo + posicion - parcial
+
+    inicio, fin = rango
+    if fin <= inicio:
+        return traducir(inicio), traducir(inicio)
+    # El fin se traduce desde su último carácter: un rango no se estira sobre las páginas omitidas
+    return traducir(inicio), traducir(fin - 1) + 1
+
+
+def anotar(ubicaciones, campo, inicio, fin):
+    """ Guarda el rango donde un extractor encontró el campo (si se están anotando ubicaciones). """
+    if ubicaciones is not None and fin > inicio:
+        ubicaciones[campo] = (inicio, fin)
+
+
+def rango_grupo(match, grupo, desplazamiento=0):
+    """ Rango del grupo de una coincidencia sin los espacios de los bordes (como el .strip() del valor). """
+    valor = match.group(grupo)
+    inicio = desplazamiento + match.start(grupo)
+    return inicio + len(valor) - len(valor.lstrip()), inicio + len(valor.rstrip())
+
+
+def rango_de_paginas(primera, ultima, desplazamientos, total):
+    """ Rango de caracteres de las páginas primera..última (índices desde 0) en un texto de 'total' caracteres. """
+    fin = desplazamientos[ultima + 1] if ultima + 1 < len(desplazamientos) else total
+    return desplazamientos[primera], fin
+
+
+def localizar(valor, texto, desde=0, hasta=None):
+    """
+    Rango (inicio, fin) de caracteres de 'valor' dentro de texto[desde:hasta], o None si no aparece.
+    Los extractores normalizan espacios y saltos, así que no se busca el valor literal:
+    se ubican sus primeras palabras y, a partir de ahí, sus últimas palabras.
+    """
+    hasta = len(texto) if hasta is None else hasta
+    if isinstance(valor, list):
+        valor = " ".join(str(v) for v in valor)
+    if not isinstance(valor, str) or VALORES_VACIOS.match(valor):
+        return None
+    palabras = re.findall(r"\w+", valor)
+    if not palabras:
+        return None
+
+    inicio = patron_ancla(palabras[:PALABRAS_ANCLA]).search(texto, desde, hasta)
+    if not inicio:
+        return None
+    if len(palabras) <= PALABRAS_ANCLA:
+        return inicio.start(), inicio.end()
+
+    fin = patron_ancla(palabras[-PALABRAS_ANCLA:]).search(texto, inicio.end(), hasta)
+    return inicio.start(), fin.end() if fin else inicio.end()
+
+
+def es_vacio(valor):
+    """ Valores que los extractores devuelven cuando no encontraron el campo. """
+    if isinstance(valor, list):
+        return not valor
+    return not isinstance(valor, str) or not valor.strip() or bool(VALORES_VACIOS.match(valor))
+
+
+def calcular_procedencia(resultado, texto, desplazamientos=None, ubicaciones=None):
+    """
+    Procedencia de cada campo del resultado de procesar_documento que se pudo ubicar.
+    'ubicaciones' son los rangos que anotaron los extractores (en el texto completo): el valor
+    se busca solo dentro de su rango, y un campo sin rango anotado no se informa. Sin
+    ubicaciones se busca en todo el texto. Sin desplazamientos se informa solo el rango de caracteres.
+    """
+    info_general = resultado.get("Información General") or {}
+    procedencia = {}
+    for campo in CAMPOS_CON_PROCEDENCIA:
+        valor = resultado.get(campo, info_general.get(campo))
+        if es_vacio(valor):
+            continue
+        if ubicaciones is None:
+            rango = localizar(valor, texto)
+        elif campo in ubicaciones:
+            rango = localizar(valor, texto, *ubicaciones[campo]) or ubicaciones[campo]
+        else:
+            rango = None
+        if not rango:
+            continue
+        inicio, fin = rango
+        datos = {"inicio": inicio, "fin": fin, "ancla": " ".join(texto[inicio:fin].split()[:PALABRAS_ANCLA])}
+        if desplazamientos:
+            primera = pagina_de(inicio, desplazamientos)
+            datos["paginas"] = [primera, pagina_de(max(inicio, fin - 1), desplazamientos)]
+            datos["inicio_en_pagina"] = inicio - desplazamientos[primera - 1]
+        procedencia[campo] = datos
+    return procedencia
+
+
+# --------------------------------------------
+# SALTO A LA EVIDENCIA
+# --------------------------------------------
+
+def areas_del_ancla(pagina, ancla):
+    """ Rectángulos del ancla en la página; si no aparece completa, se prueba con menos palabras. """
+    palabras = ancla.split()
+    while palabras:
+        areas = pagina.search_for(" ".join(palabras))
+        if areas:
+            return areas
+        palabras = palabras[:-1] if len(palabras) > 2 else []
+    return []
+
+
+def renderizar_evidencia(ruta_pdf, procedencia_campo, zoom=2.0):
+    """
+    Imagen PNG (bytes) de la página donde empieza el campo, con su inicio resaltado.
+    Solo se abre y se dibuja esa página.
+    """
+    doc = fitz.open(ruta_pdf)
+    try:
+        pagina = doc[procedencia_campo["paginas"][0] - 1]
+        areas = areas_del_ancla(pagina, procedencia_campo.get("ancla", ""))
+        if not areas:
+            # Registros sin ancla: se usa la primera línea desde la posición dentro de la página
+            inicio = procedencia_campo.get("inicio_en_pagina", 0)
+            primera_linea = pagina.get_text()[inicio:].strip().split("\n", 1)[0].strip()
+            areas = pagina.search_for(primera_linea[:80]) if primera_linea else []
+        for area in areas:
+            pagina.add_highlight_annot(area)  # Solo en memoria: el archivo no se modifica
+        return pagina.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+    finally:
+        doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dibuja la página de la que salió un campo extraído.")
+    parser.add_argument("pdf")
+    parser.add_argument("campo", help='Nombre del campo, por ejemplo "Metodología".')
+    parser.add_argument("--resultado", help="JSON con el resultado ya calculado (si no, se procesa el PDF).")
+    parser.add_argument("--salida", default="evidencia.png")
+    parser.add_argument("--zoom", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.resultado:
+        with open(args.resultado, encoding="utf-8") as archivo:
+            resultado = json.load(archivo)
+    else:
+        from rae2 import procesar_documento
+        resultado = procesar_documento(args.pdf)
+
+    datos = resultado.get("Procedencia", {}).get(args.campo)
+    if not datos or "paginas" not in datos:
+        print(f"❌ No se conoce la procedencia de '{args.campo}'.")
+        return
+    with open(args.salida, "wb") as archivo:
+        archivo.write(renderizar_evidencia(args.pdf, datos, args.zoom))
+    print(f"🔎 {args.campo}: páginas {datos['paginas'][0]}-{datos['paginas'][1]} → {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
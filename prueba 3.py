@@ -139,4 +139,5 @@ def seleccionar_multiples_pdfs():
               font=("Arial", 12), bg="green", fg="white").pack(pady=50)
     root.mainloop()
 
-seleccionar_multiples_pdfs()
+if __name__ == "__main__":
+    seleccionar_multiples_pdfs()
@@ -8,87 +8,222 @@ import re  # re (regular expressions): permite buscar patrones dentro del texto,
 import tkinter as tk  # tkinter: se utiliza para construir interfaces gráficas sencillas en Python.
 from tkinter import filedialog  # filedialog: permite abrir una ventana para seleccionar archivos desde el explorador.
 
-from collections import Counter  # Counter: útil para contar la frecuencia de palabras, ideal para saber cuál es la más repetida.
+import numpy as np  # numpy: arreglos compactos para la tabla de rasgos por línea.
 
-LINEAS_INVESTIGACION = {
-    "Educación y tecnología": ["tecnología educativa", "tics", "recursos digitales", "educación virtual", "plataformas", "aplicaciones"],
-    "Desarrollo curricular": ["currículo", "plan de estudios", "competencias", "contenidos curriculares"],
-    "Evaluación educativa": ["evaluación", "instrumentos", "rúbrica", "desempeño académico"],
-    "Innovación pedagógica": ["estrategia pedagógica", "innovación", "práctica docente", "didáctica"],
-    "Inclusión y diversidad": ["inclusión", "discapacidad", "educación inclusiva", "diversidad", "equidad"],
-    "Formación docente": ["formación docente", "capacitación", "desarrollo profesional", "profesorado"],
-    "Comunicación y medios": ["audiovisual", "comunicación", "radio escolar", "podcast", "video educativo"],
-}
+from collections import Counter  # Counter: útil para contar la frecuencia de palabras, ideal para saber cuál es la más repetida.
+from functools import lru_cache  # lru_cache: guarda la lectura de la portada de cada documento.
+
+from configuracion import (  # Listas y encabezados configurables, ya compilados (ver configuracion_extraccion.json).
+    APELLIDOS_COMUNES,
+    PATRON_ETIQUETAS_NOMBRES,
+    PATRON_FUENTES,
+    PATRON_PROHIBIDAS_LINEAS_NOMBRES,
+    PATRON_PROHIBIDAS_NOMBRES,
+    PATRON_TABLA_CONTENIDO,
+    STOPWORDS_PALABRAS_CLAVE,
+    patron_apellidos,
+    patron_seccion,
+)
+from referencias import parsear_referencias  # Convierte la bibliografía en registros (autores, año, título, fuente).
+from procedencia import (  # Páginas de las que sale cada campo (cada extractor anota dónde lo encontró).
+    anotar,
+    calcular_procedencia,
+    desplazamientos_paginas,
+    mapa_paginas,
+    rango_de_paginas,
+    rango_en_texto_completo,
+    rango_grupo,
+)
+from triaje import ESTADO_TEXTO, clasificar_pdf  # Separa los PDFs escaneados o cifrados antes de extraer.
+from clasificador_lineas import lineas_por_palabras_clave, modelo_configurado  # Palabras clave y modelo opcional.
+from roles_pagina import ROLES_SECCIONES, clasificar_paginas, texto_de_roles  # Portada, índice, cuerpo, referencias, anexos...
+
+import os
+import queue  # queue: comunica el hilo de trabajo con la ventana sin bloquearla.
+import threading  # threading: el lote se procesa en un hilo aparte de la ventana.
+import time
+from concurrent.futures import ProcessPoolExecutor  # Procesa varios PDFs (o las páginas de uno grande) en paralelo.
+from planificador import ejecutar_por_costo  # Envía primero los documentos más costosos.
+from tkinter import ttk  # ttk: barra de progreso.
 
 def clasificar_lineas_investigacion(titulo, descripcion):
-    texto_base = f"{titulo} {descripcion}".lower()
-    lineas_detectadas = set()
-
-    for linea, palabras_clave in LINEAS_INVESTIGACION.items():
-        for palabra in palabras_clave:
-            if palabra.lower() in texto_base:
-                lineas_detectadas.add(linea)
-                break  # Evita duplicados por palabra repetida
+    texto_base = f"{titulo} {descripcion}"
+    # Una sola pasada con la expresión que reúne las palabras clave de todas las líneas
+    lineas_detectadas = lineas_por_palabras_clave(texto_base)
+    if lineas_detectadas:
+        return lineas_detectadas
+
+    # Sin palabras clave: si hay un modelo entrenado (MODELO_LINEAS_INVESTIGACION), se le consulta
+    modelo = modelo_configurado()
+    if modelo is not None:
+        return modelo.clasificar([texto_base])[0]
+    return ["No clasificada"]
+
+# Por debajo de esta cantidad de páginas no compensa repartir la extracción entre procesos
+PAGINAS_MIN_PARALELO = 100
+
+def leer_pagina(pagina):
+    """ Texto de la página y cuántas imágenes tiene (solo la lista, sin decodificarlas). """
+    return pagina.get_text(), len(pagina.get_images())
+
+def extraer_rango_paginas(pdf_path, inicio, fin):
+    """ (texto, imágenes) de las páginas [inicio, fin). Corre en un proceso trabajador, con su propio documento abierto. """
+    with fitz.open(pdf_path) as doc:
+        return [leer_pagina(doc[i]) for i in range(inicio, fin)]
+
+def extraer_paginas_en_paralelo(grupo, pdf_path, num_paginas, partes):
+    """
+    Reparte las páginas en rangos contiguos entre los procesos de 'grupo' y devuelve en orden
+    el (texto, imágenes) de cada una.
+    Son procesos y no hilos: PyMuPDF no es seguro entre hilos (ni con un documento por hilo)
+    y no suelta el GIL mientras extrae, así que con hilos no se gana nada.
+    """
+    tamano = -(-num_paginas // partes)  # División hacia arriba
+    futuros = [
+        grupo.submit(extraer_rango_paginas, pdf_path, inicio, min(inicio + tamano, num_paginas))
+        for inicio in range(0, num_paginas, tamano)
+    ]
+    return [lectura for futuro in futuros for lectura in futuro.result()]
 
-    return list(lineas_detectadas) if lineas_detectadas else ["No clasificada"]
+# Encabezados y pies de página: líneas que se repiten en el borde de muchas páginas
+LINEAS_BORDE = 3  # Líneas no vacías que se revisan arriba y abajo de cada página
+FRECUENCIA_MIN_REPETIDAS = 0.3  # Fracción mínima de páginas en que debe repetirse
+PAGINAS_MIN_REPETIDAS = 3
 
-def extraer_texto(pdf_path):
-    # Abrir el archivo PDF
-    doc = fitz.open(pdf_path)
-    num_paginas = len(doc)
-    
-    # Extraer el texto de cada página
-    texto = ""
-    for pagina in doc:
-        texto += pagina.get_text()
-    
-    # Devolver el texto y el número de páginas
-    return texto, num_paginas, pdf_path
+def forma_linea(linea):
+    """ Forma comparable de una línea: minúsculas, espacios simples y números como '#' ("Página # de #"). """
+    return re.sub(r"\d+", "#", " ".join(linea.lower().split()))
 
+def bordes_pagina(lineas):
+    """ (zona, índice) de las primeras y últimas LINEAS_BORDE líneas no vacías de una página. """
+    no_vacias = [i for i, linea in enumerate(lineas) if linea.strip()]
+    superiores = no_vacias[:LINEAS_BORDE]
+    inferiores = [i for i in no_vacias[-LINEAS_BORDE:] if i not in superiores]
+    return [("arriba", i) for i in superiores] + [("abajo", i) for i in inferiores]
 
-def eliminar_tabla_contenido(doc):
+def detectar_lineas_repetidas(paginas):
     """
-    Elimina páginas desde que se detecta 'Tabla de contenido' o similar,
-    y continúa eliminando mientras más del 30% de las líneas contengan números o numeración tipo índice.
+    Formas de línea que aparecen en la misma zona (arriba o abajo) de muchas páginas:
+    encabezados, pies y números de página. Cada página cuenta una vez por forma.
     """
-    texto_total = ""
-    eliminar = False
-    saltando = False
-
-    for i, pagina in enumerate(doc):
-        texto_pagina = pagina.get_text()
+    if len(paginas) < PAGINAS_MIN_REPETIDAS:
+        return set()
+    conteo = Counter()
+    for texto_pagina in paginas:
         lineas = texto_pagina.splitlines()
+        conteo.update({(zona, forma_linea(lineas[i])) for zona, i in bordes_pagina(lineas)})
+    minimo = max(PAGINAS_MIN_REPETIDAS, FRECUENCIA_MIN_REPETIDAS * len(paginas))
+    return {clave for clave, veces in conteo.items() if veces >= minimo}
+
+def quitar_lineas_repetidas(paginas, repetidas):
+    """ Quita de cada página las líneas de borde cuya forma está en 'repetidas'. """
+    if not repetidas:
+        return paginas
+    limpias = []
+    for texto_pagina in paginas:
+        lineas = texto_pagina.splitlines(keepends=True)
+        quitar = {i for zona, i in bordes_pagina(lineas) if (zona, forma_linea(lineas[i])) in repetidas}
+        limpias.append("".join(linea for i, linea in enumerate(lineas) if i not in quitar))
+    return limpias
+
+def extraer_texto_paginado(pdf_path, limpiar=True):
+    # Abrir el archivo PDF y extraer el texto (y cuántas imágenes hay) de cada página
+    with fitz.open(pdf_path) as doc:
+        num_paginas = len(doc)
+        lecturas = [leer_pagina(pagina) for pagina in doc]
+    return unir_paginas(lecturas, num_paginas, pdf_path, limpiar)
+
+def unir_paginas(lecturas, num_paginas, pdf_path, limpiar=True):
+    """ Misma tupla que extraer_texto_paginado a partir del (texto, imágenes) de cada página. """
+    paginas = [texto_pagina for texto_pagina, _ in lecturas]
+    imagenes = [cantidad for _, cantidad in lecturas]
+    # Se quitan encabezados, pies y números de página antes de que cualquier extractor vea el texto
+    if limpiar:
+        paginas = quitar_lineas_repetidas(paginas, detectar_lineas_repetidas(paginas))
+    texto = "".join(paginas)
+
+    # Devolver el texto, el número de páginas, los desplazamientos (dónde empieza cada página en
+    # el texto) y la cantidad de imágenes de cada página (para clasificar_paginas)
+    return texto, num_paginas, pdf_path, desplazamientos_paginas(paginas), imagenes
 
-        # Detecta el título de la tabla de contenido
-        if not eliminar:
-            if re.search(r"(?i)(TABLA\s+DE\s+CONTENIDO|Índice\s+de\s+contenido|Contenido|Tabla\s+de\s+contenidos)", texto_pagina):
-                eliminar = True
-                saltando = True
-                print(f"📌 Tabla de contenido detectada en página {i+1}, analizando siguientes páginas...")
-                continue
+def extraer_texto(pdf_path):
+    # Igual que antes: texto, número de páginas y ruta
+    return extraer_texto_paginado(pdf_path)[:3]
 
-        # Si estamos eliminando, revisar si esta página es índice (basado en numeraciones)
-        if eliminar and saltando:
-            total = len(lineas)
-            if total == 0:
-                continue
+def separar_paginas(texto, desplazamientos):
+    """ Recupera el texto de cada página a partir del texto completo y sus desplazamientos. """
+    limites = list(desplazamientos[1:]) + [len(texto)]
+    return [texto[inicio:fin] for inicio, fin in zip(desplazamientos, limites)]
 
-            numeradas = sum(
-                1 for linea in lineas
-                if re.match(r"\s*\d+(\.\d+)*\s+.+", linea)  # Ej: "1. Introducción", "3.4 Marco teórico"
-            )
 
-            porcentaje = numeradas / total
-            if porcentaje >= 0.3:
-                print(f"🧹 Página {i+1} eliminada (índice con {porcentaje:.0%} de líneas numeradas)")
-                continue  # Saltamos esta página
-            else:
-                saltando = False  # Ya no estamos en tabla de contenido
+# Solo se busca la tabla de contenido en las primeras páginas, y se admite que ocupe varias
+PAGINAS_BUSQUEDA_INDICE = 15
+PAGINAS_MAX_INDICE = 10
+PUNTOS_GUIA = re.compile(r"[\.·…_]{3,}|(\.\s){3,}")  # "Metodología ........ 12"
+NUMERO_FINAL = re.compile(r"\D\s+\d{1,3}\s*$")  # "Metodología 12"
 
-        # Conservar el resto de las páginas
-        texto_total += texto_pagina
+def puntaje_indice(tabla, primera, ultima):
+    """
+    Qué fracción de las líneas [primera, ultima) de la tabla parecen entradas de índice:
+    con puntos guía o terminadas en número de página. Las líneas con solo un número
+    (el número de página quedó en otra línea) cuentan la mitad.
+    """
+    utiles = ~tabla.vacia[primera:ultima]
+    total = int(utiles.sum())
+    if not total:
+        return 0.0
+    entradas = tabla.entrada_indice[primera:ultima] & utiles
+    sueltos = tabla.solo_numero[primera:ultima] & ~entradas & utiles
+    return (int(entradas.sum()) + 0.5 * int(sueltos.sum())) / total
+
+def puntaje_pagina(tabla, pagina):
+    return puntaje_indice(tabla, *tabla.lineas_de_pagina(pagina))
+
+def detectar_tabla_contenido(paginas, paginas_busqueda=PAGINAS_BUSQUEDA_INDICE, tabla=None):
+    """
+    Devuelve el rango (primera, última) de páginas (desde 0) de la tabla de contenido, o None.
+    Una página inicia el índice si tiene el encabezado en una línea propia y al menos 30% de
+    líneas tipo índice, o si sin encabezado supera el 60%. Las páginas siguientes se suman
+    mientras sigan siendo tipo índice, hasta PAGINAS_MAX_INDICE.
+    """
+    limite = min(len(paginas), paginas_busqueda)
+    if tabla is None:
+        tabla = TablaLineas.desde_paginas(paginas[:min(len(paginas), limite + PAGINAS_MAX_INDICE)])
+    inicio = None
+    for i in range(limite):
+        puntaje = puntaje_pagina(tabla, i)
+        if (PATRON_TABLA_CONTENIDO.search(paginas[i]) and puntaje >= 0.3) or puntaje >= 0.6:
+            inicio = i
+            break
+    if inicio is None:
+        return None
+
+    fin = inicio
+    while fin + 1 < min(len(paginas), inicio + PAGINAS_MAX_INDICE) and puntaje_pagina(tabla, fin + 1) >= 0.3:
+        fin += 1
+    return inicio, fin
+
+def texto_de_paginas(paginas, rango):
+    """ Texto de las páginas del rango (primera, última), ambas incluidas. """
+    primera, ultima = rango
+    return "".join(paginas[primera:ultima + 1])
 
-    return texto_total
+def eliminar_tabla_contenido(paginas, rango=None):
+    """
+    Devuelve el texto del documento sin las páginas de la tabla de contenido.
+    'rango' es el de detectar_tabla_contenido; si no se da, se detecta aquí.
+    """
+    if rango is None:
+        rango = detectar_tabla_contenido(paginas)
+    if rango is None:
+        return "".join(paginas)
+
+    primera, ultima = rango
+    print(f"📌 Tabla de contenido detectada en páginas {primera+1}-{ultima+1}, se eliminan.")
+    return "".join(
+        texto_pagina for i, texto_pagina in enumerate(paginas)
+        if not primera <= i <= ultima
+    )
 
 
 import unicodedata
@@ -107,15 +242,17 @@ def normalizar(texto):
 
 # Esta función intenta extraer el título de un texto
 # Ignora encabezados típicos y se detiene si encuentra el nombre del autor
-def obtener_titulo(texto, nombre_autor=None):
+def obtener_titulo(texto, nombre_autor=None, ubicaciones=None):
     """
     Extrae el título tomando máximo 10 líneas desde el primer contenido útil
     e ignorando encabezados institucionales. Detiene la extracción si encuentra el nombre del autor.
+    Si se da 'ubicaciones', anota el rango de las líneas tomadas (ver procedencia).
     """
-    # Divide el texto completo en líneas
-    lineas = texto.splitlines() 
-    # Lista donde se irán guardando las líneas del posible título
+    # Rasgos de las líneas del texto (se calculan una sola vez por texto, ver TablaLineas)
+    tabla = tabla_lineas(texto)
+    # Lista donde se irán guardando las líneas del posible título (y sus índices en la tabla)
     titulo_lineas = []
+    indices_titulo = []
     # Contador para detectar si hay dos líneas vacías seguidas (lo cual indica posible final del título)
     lineas_vacias_seguidas = 0
     # Bandera para saber cuándo empezar a considerar líneas como parte del título
@@ -124,24 +261,22 @@ def obtener_titulo(texto, nombre_autor=None):
     max_lineas = 10    # Si se proporcionó el nombre del autor, se normaliza para compararlo fácilmente
     autor_normalizado = normalizar(nombre_autor) if nombre_autor else None
     # Recorremos todas las líneas del texto
-    for linea in lineas:
+    for i in range(len(tabla)):
         # Quitamos espacios al inicio y al final
-        limpia = linea.strip()
+        limpia = tabla.lineas[i].strip()
         # Si la línea tiene palabras institucionales comunes, la ignoramos
-        if any(pal in limpia.upper() for pal in [
-            "UNIVERSIDAD PEDAGÓGICA NACIONAL", "FACULTAD", "DEPARTAMENTO", "LICENCIATURA", "PÁGINA"
-        ]):
+        if tabla.institucional[i]:
             continue
         # Si aún no hemos empezado y la línea está vacía o solo tiene un número o dice "página", la ignoramos
-        if not ha_empezado and (not limpia or limpia.isdigit() or re.search(r'\|\s*P\s*a\s*g\s*e', limpia, re.IGNORECASE)):
+        if not ha_empezado and (tabla.vacia[i] or tabla.numero_pagina[i]):
             continue
         # Marcamos que ya empezamos a encontrar contenido útil
         ha_empezado = True
         # Si encontramos el nombre del autor, detenemos la extracción
-        if autor_normalizado and autor_normalizado in normalizar(limpia):
+        if autor_normalizado and autor_normalizado in tabla.normalizada(i):
             break
         # Si la línea está vacía, aumentamos el contador de vacías seguidas
-        if not limpia:
+        if tabla.vacia[i]:
             lineas_vacias_seguidas += 1
             # Si hay 2 vacías seguidas, probablemente se acabó el bloque del título
             if lineas_vacias_seguidas >= 2:
@@ -151,10 +286,11 @@ def obtener_titulo(texto, nombre_autor=None):
             # Si no está vacía, reiniciamos el contador
             lineas_vacias_seguidas = 0
         # Si la línea tiene solo un número o es una marca de página, la ignoramos
-        if limpia.isdigit() or re.search(r'\|\s*P\s*a\s*g\s*e', limpia, re.IGNORECASE):
+        if tabla.numero_pagina[i]:
             continue
         # Agregamos esta línea como parte del posible título
         titulo_lineas.append(limpia)
+        indices_titulo.append(i)
         # Si ya tenemos suficientes líneas (10), paramos
         if len(titulo_lineas) >= max_lineas:
             break
@@ -162,74 +298,51 @@ def obtener_titulo(texto, nombre_autor=None):
     titulo = ' '.join(titulo_lineas)  
     # Eliminamos espacios múltiples entre palabras
     titulo = re.sub(r'\s{2,}', ' ', titulo).strip()
+    if titulo:
+        ultima = indices_titulo[-1]
+        anotar(ubicaciones, "TÍTULO", int(tabla.inicio[indices_titulo[0]]), int(tabla.inicio[ultima]) + len(tabla.lineas[ultima]))
     # Si se encontró un título, lo devolvemos; si no, devolvemos None
     return titulo if titulo else None
 
-#lista de apellidos 
-APELLIDOS_COMUNES = [
-    "Abella", "Acevedo", "Aldana", "Ardila", "Ariza", "Arias", "Acosta", "Barahona", "Barrera", "Beltrán", "Benítez", "Bohórquez","Bossa", "Bustamante","Buitrago",
-    "Cano", "Cárdenas", "Cely", "Casallas", "Castillo", "Castro", "Chacón", "Cifuentes", "Cordero", "Cortés","Cocunubo", "Corredor", "Díaz", "Duarte", "Estupiñán", 
-    "Escobar", "Fayad", "Florez","García", "Garcia", "Gómez", "González", "Guataquí", "Guerrero", "Gutiérrez", "Hernández", "Jiménez", "Leiva", "Lopera", "López",
-    "Lozano", "Mahecha", "Maldonado", "Malagón", "Marroquín", "Marín", "Martin", "Martínez", "Medina", "Merchan", "Merchán", "Montero", "Monsalve", "More", "Moreno", 
-    "Murillo", "Ordoñez","Oviedo", "Otálora", "Patiño", "Peña", "Perdomo", "Perez", "Pereira", "Pilar", "Pinzón", "Poveda", "Prieto", "Quintero", "Ramírez", "Reyes", 
-    "Rivera", "Roberto", "Rodríguez", "Rojas","Romero", "Rua", "Rincón", "Rueda", "Salazar", "Sánchez","Sandoval", "Sarmiento","Sanabria", "Suarez", "Suárez", "Torres",
-    "Téllez", "Terreros", "Urueña", "Valero", "Vargas", "Vega", "Velandia", "Velásquez","Valencia","Zamora"
-]
+#lista de apellidos: APELLIDOS_COMUNES se carga desde configuracion_extraccion.json
 
 #Filtra los nombres encontrados  y elimina los que no corresponda 
-def detectar_nombres_por_apellidos(texto, apellidos_comunes):
-    etiquetas = [
-        "autor(es):", "autor:", "presentado por:", "asesor:", "asesora:",
-        "asesor", "asesora", "director:", "tutor:", "elaborado por:",
-        "docente:", "nombre:","directora:", "dirigido por:", "profesor:"
-    ]
-    palabras_prohibidas = [
-        "cedid", "institucion", "institución", "institución educativa", "colegio",
-        "tecnología en"
-    ]
+def detectar_nombres_por_apellidos(texto, apellidos_comunes, lineas_nombres=None):
+    # 'lineas_nombres', si se da, recibe la línea de la tabla donde apareció cada nombre
+    # Etiquetas, palabras prohibidas y apellidos llegan compilados en una expresión cada uno
+    busca_apellido = patron_apellidos(apellidos_comunes)
     nombres_detectados = []
-    linea_anterior = ""
+    tabla = tabla_lineas(texto)
 
-    for linea in texto.splitlines():
+    for i, linea in enumerate(tabla.lineas):
         linea_original = linea.strip()
 
         # Si la línea anterior contiene palabras prohibidas, no procesar esta
-        if any(p in linea_anterior.lower() for p in palabras_prohibidas):
-            linea_anterior = linea  # actualizar igual
+        if i > 0 and tabla.prohibida[i - 1]:
             continue
         # Si esta línea contiene palabras prohibidas, también se descarta
-        if any(p in linea_original.lower() for p in palabras_prohibidas):
-            linea_anterior = linea  # actualizar
+        if tabla.prohibida[i]:
             continue
         # Ahora sí: limpiar y procesar
-        linea_limpia = linea_original.lower()
-        for etiqueta in etiquetas:
-            linea_limpia = linea_limpia.replace(etiqueta, "")
+        linea_limpia = PATRON_ETIQUETAS_NOMBRES.sub("", linea_original.lower())
         # Separar si hay múltiples nombres
         posibles_nombres = re.split(r"/|,| y ", linea_limpia)
         for nombre in posibles_nombres:
             nombre_candidato = " ".join(p.capitalize() for p in nombre.strip().split())
             if (
-                any(ap.lower() in nombre_candidato.lower() for ap in apellidos_comunes)
+                busca_apellido.search(nombre_candidato)
                 and len(nombre_candidato.split()) <= 5
                 and not re.search(r"\b[\w\.-]+@[\w\.-]+\.\w+\b", nombre_candidato)
             ):
                 if nombre_candidato not in nombres_detectados:
                     nombres_detectados.append(nombre_candidato)
-        linea_anterior = linea  # actualizar para la próxima vuelta
+                    if lineas_nombres is not None:
+                        lineas_nombres[nombre_candidato] = i
 
     return nombres_detectados
 #Función para eliminar autores encontrados dentro de agradecimientos
 def es_nombre_valido(texto):
-    texto = texto.lower()
-    palabras_prohibidas = [
-        "gracias", "agradezco", "agradecimiento", "felicito", "mira", "dedico",  
-        "abuelo", "abuela", "mamá", "maestro", "maestra",                        
-        "padres", "madre", "padre", "cuidados", "esposa", "esposo",              
-        "profesor", "familia", "cedid", "institucion", "institución", 
-        "institución educativa", "colegio"                                                    
-    ]
-    return not any(p in texto for p in palabras_prohibidas)
+    return not PATRON_PROHIBIDAS_NOMBRES.search(texto)
 
 def detectar_año(texto):
     """
@@ -239,21 +352,283 @@ def detectar_año(texto):
     coincidencias = re.findall(r"\b(20\d{2})\b", texto)
     return coincidencias[0] if coincidencias else None
 
-def extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf):
-    """Extrae información clave si el documento no tiene formato RAE."""
+# --------------------------------------------
+# TABLA DE RASGOS POR LÍNEA
+# --------------------------------------------
+# Varias heurísticas revisan las mismas líneas con las mismas expresiones (numeración,
+# números de página, encabezados, palabras prohibidas, forma normalizada). TablaLineas las
+# evalúa una sola vez por texto y guarda cada rasgo en un arreglo; las heurísticas consultan
+# la tabla en lugar de volver a recorrer las líneas.
+
+MARCA_PAGINA = re.compile(r'\|\s*P\s*a\s*g\s*e', re.IGNORECASE)  # "| Page"
+NUMERACION = re.compile(r"^\s*(\d+\.){1,3}\s*")  # "1.", "2.3.", "4.1.2."
+
+class TablaLineas:
+    """
+    Rasgos de cada línea de un texto, calculados en una sola pasada:
+      inicio          posición de la línea dentro del texto
+      vacia           solo espacios
+      numerada        empieza con numeración tipo "1." o "2.3."
+      numero_pagina   es solo un número o una marca "| Page"
+      solo_numero     es un número de hasta 3 cifras (número de página suelto)
+      entrada_indice  tiene puntos guía o termina en número de página
+      encabezado      corta (hasta 8 palabras), sin punto final y con mayúscula o número inicial
+      institucional   contiene un encabezado institucional (ENCABEZADOS_INSTITUCIONALES)
+      prohibida       contiene palabras que descartan nombres en la línea siguiente
+      puntos, largo   cantidad de '.' y de caracteres (para proporciones por rango)
+      mayusculas      proporción de letras mayúsculas
+    La forma normalizada (normalizar) se calcula al pedirla y queda guardada.
+    """
+
+    def __init__(self, lineas, inicios, paginas=None):
+        n = len(lineas)
+        self.lineas = lineas
+        self.inicio = np.asarray(inicios, dtype=np.int64)
+        self.pagina = np.asarray(paginas if paginas is not None else np.zeros(n), dtype=np.int32)
+        self.vacia = np.zeros(n, dtype=bool)
+        self.numerada = np.zeros(n, dtype=bool)
+        self.numero_pagina = np.zeros(n, dtype=bool)
+        self.solo_numero = np.zeros(n, dtype=bool)
+        self.entrada_indice = np.zeros(n, dtype=bool)
+        self.encabezado = np.zeros(n, dtype=bool)
+        self.institucional = np.zeros(n, dtype=bool)
+        self.prohibida = np.zeros(n, dtype=bool)
+        self.puntos = np.zeros(n, dtype=np.int32)
+        self.largo = np.zeros(n, dtype=np.int32)
+        self.mayusculas = np.zeros(n, dtype=np.float32)
+        self._normalizadas = [None] * n
+
+        for i, linea in enumerate(lineas):
+            limpia = linea.strip()
+            self.largo[i] = len(linea)
+            if not limpia:
+                self.vacia[i] = True
+                continue
+            self.puntos[i] = linea.count(".")
+            self.numerada[i] = bool(NUMERACION.match(linea))
+            self.numero_pagina[i] = limpia.isdigit() or bool(MARCA_PAGINA.search(limpia))
+            self.solo_numero[i] = bool(re.fullmatch(r"\d{1,3}", limpia))
+            self.entrada_indice[i] = bool(PUNTOS_GUIA.search(limpia) or NUMERO_FINAL.search(limpia))
+            self.encabezado[i] = (
+                len(limpia.split()) <= 8 and not limpia.endswith(".") and (limpia[0].isupper() or limpia[0].isdigit())
+            )
+            mayuscula = limpia.upper()
+            self.institucional[i] = any(pal in mayuscula for pal in ENCABEZADOS_INSTITUCIONALES)
+            self.prohibida[i] = bool(PATRON_PROHIBIDAS_LINEAS_NOMBRES.search(linea))
+            letras = sum(1 for c in limpia if c.isalpha())
+            if letras:
+                self.mayusculas[i] = sum(1 for c in limpia if c.isupper()) / letras
+
+    @classmethod
+    def desde_texto(cls, texto):
+        lineas, inicios = partir_lineas(texto)
+        return cls(lineas, inicios)
+
+    @classmethod
+    def desde_paginas(cls, paginas):
+        """ Tabla de un documento a partir del texto de cada página (las líneas no cruzan páginas). """
+        lineas, inicios, numeros = [], [], []
+        desplazamiento = 0
+        for numero, texto_pagina in enumerate(paginas):
+            lineas_pagina, inicios_pagina = partir_lineas(texto_pagina)
+            lineas.extend(lineas_pagina)
+            inicios.extend(desplazamiento + inicio for inicio in inicios_pagina)
+            numeros.extend([numero] * len(lineas_pagina))
+            desplazamiento += len(texto_pagina)
+        return cls(lineas, inicios, numeros)
+
+    def __len__(self):
+        return len(self.lineas)
+
+    def normalizada(self, i):
+        if self._normalizadas[i] is None:
+            self._normalizadas[i] = normalizar(self.lineas[i])
+        return self._normalizadas[i]
+
+    def rango(self, inicio, fin):
+        """ Índices [primera, última+1) de las líneas que empiezan entre las posiciones inicio y fin. """
+        primera = int(np.searchsorted(self.inicio, inicio, side="left"))
+        ultima = int(np.searchsorted(self.inicio, fin, side="left"))
+        return primera, max(primera, ultima)
+
+    def linea_en(self, posicion):
+        """ Índice de la línea que contiene la posición del texto. """
+        return max(0, int(np.searchsorted(self.inicio, posicion, side="right")) - 1)
+
+    def lineas_de_pagina(self, pagina):
+        return int(np.searchsorted(self.pagina, pagina, side="left")), int(np.searchsorted(self.pagina, pagina, side="right"))
+
+def partir_lineas(texto):
+    """ Líneas del texto (como splitlines) y la posición donde empieza cada una. """
+    lineas, inicios = [], []
+    posicion = 0
+    for linea in texto.splitlines(keepends=True):
+        inicios.append(posicion)
+        posicion += len(linea)
+        lineas.append(linea.rstrip("\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"))
+    return lineas, inicios
+
+@lru_cache(maxsize=8)
+def tabla_lineas(texto):
+    """ Tabla de rasgos del texto; queda en caché para que todas las heurísticas compartan la misma. """
+    return TablaLineas.desde_texto(texto)
+
+# --------------------------------------------
+# LECTURA DE LA PORTADA POR DISEÑO (TAMAÑO DE LETRA Y BLOQUES)
+# --------------------------------------------
+
+ENCABEZADOS_INSTITUCIONALES = ["UNIVERSIDAD PEDAGÓGICA NACIONAL", "FACULTAD", "DEPARTAMENTO", "LICENCIATURA", "PÁGINA"]
+
+# Etiquetas de la portada que indican de quién son los nombres que siguen
+ETIQUETAS_PORTADA = [
+    (re.compile(r"(?i)^\s*(director[a]?|dirigido\s+por|asesor[a]?|tutor[a]?)\b\s*:?"), "DIRECTOR"),
+    (re.compile(r"(?i)^\s*(autor(?:\(es\)|es|a)?|presentado\s+por|elaborado\s+por|estudiantes?)\b\s*:?"), "AUTOR(ES)"),
+]
+
+def parece_nombre(linea):
+    """ Línea de 2 a 5 palabras con mayúscula inicial, sin números ni palabras prohibidas. """
+    palabras = linea.split()
+    return (
+        2 <= len(palabras) <= 5
+        and all(p[0].isupper() for p in palabras if len(p) > 3)
+        and not re.search(r"\d", linea)
+        and es_nombre_valido(linea)
+        and not any(pal in linea.upper() for pal in ENCABEZADOS_INSTITUCIONALES)
+    )
+
+@lru_cache(maxsize=512)
+def _leer_portada(ruta_pdf, tamano, modificado):
+    # 'tamano' y 'modificado' forman parte de la clave de la caché: si el PDF cambia, se vuelve a leer
+    with fitz.open(ruta_pdf) as doc:
+        # Primera página con texto (algunas tesis traen una hoja en blanco al inicio)
+        datos, alto = None, 1
+        for pagina in doc.pages(0, min(2, len(doc))):
+            datos = pagina.get_text("dict")
+            alto = pagina.rect.height
+            if any(b.get("type") == 0 for b in datos["blocks"]):
+                break
+
+    lineas = []
+    for num_bloque, bloque in enumerate(datos["blocks"] if datos else []):
+        if bloque.get("type") != 0:  # Bloques de imagen
+            continue
+        for linea in bloque["lines"]:
+            texto = " ".join(span["text"].strip() for span in linea["spans"] if span["text"].strip())
+            if texto:
+                lineas.append({
+                    "texto": re.sub(r"\s{2,}", " ", texto),
+                    "tam": round(max(span["size"] for span in linea["spans"]), 1),
+                    "y": linea["bbox"][1] / alto,  # Posición vertical relativa (0 arriba, 1 abajo)
+                    "bloque": num_bloque,
+                })
+
+    return {"titulo": titulo_por_tamano(lineas), **personas_por_bloques(lineas)}
+
+def titulo_por_tamano(lineas):
+    """
+    El título es el grupo de líneas seguidas con la letra más grande de la portada,
+    sin contar encabezados institucionales, etiquetas ni líneas en el último quinto de la página.
+    """
+    candidatas = [
+        l for l in lineas
+        if l["y"] < 0.8
+        and not any(pal in l["texto"].upper() for pal in ENCABEZADOS_INSTITUCIONALES)
+        and not any(patron.match(l["texto"]) for patron, _ in ETIQUETAS_PORTADA)
+        and not l["texto"].isdigit()
+    ]
+    if not candidatas:
+        return None
+
+    tam_max = max(l["tam"] for l in candidatas)
+    titulo, anterior = [], None
+    for linea in candidatas:
+        if linea["tam"] >= tam_max * 0.9:
+            # Solo líneas contiguas: una línea grande más abajo y separada es otro elemento
+            if anterior is not None and linea["y"] - anterior["y"] > 0.08:
+                break
+            titulo.append(linea["texto"])
+            anterior = linea
+        elif titulo:
+            break
+    return " ".join(titulo) or None
+
+def personas_por_bloques(lineas):
+    """
+    Asigna nombres a autor o director según la etiqueta más cercana por encima
+    ("Presentado por", "Director", ...), dentro del mismo bloque o en el bloque siguiente.
+    Sin etiquetas, los nombres con apellidos conocidos se toman como autores.
+    """
+    personas = {"AUTOR(ES)": [], "DIRECTOR": []}
+    rol, bloque_rol = None, None
+
+    for linea in lineas:
+        texto = linea["texto"]
+        for patron, rol_etiqueta in ETIQUETAS_PORTADA:
+            match = patron.match(texto)
+            if match:
+                rol, bloque_rol = rol_etiqueta, linea["bloque"]
+                texto = texto[match.end():].strip()
+                break
+
+        # La etiqueta vale para su bloque y el siguiente (nombre escrito debajo, en otro bloque)
+        if rol and linea["bloque"] > bloque_rol + 1:
+            rol = None
+        if not texto or not parece_nombre(texto):
+            continue
+
+        if rol:
+            personas[rol].append(texto)
+        elif patron_apellidos(APELLIDOS_COMUNES).search(texto):
+            personas["AUTOR(ES)"].append(texto)
+
+    return {
+        "autores": personas["AUTOR(ES)"],
+        "director": personas["DIRECTOR"][0] if personas["DIRECTOR"] else None,
+    }
+
+def leer_portada(ruta_pdf):
+    """
+    Lee solo la portada con la salida por fragmentos de PyMuPDF (get_text("dict")) y devuelve
+    {"titulo", "autores", "director"}. El resultado queda en caché por documento.
+    """
+    info = os.stat(ruta_pdf)
+    return _leer_portada(os.path.abspath(ruta_pdf), info.st_size, info.st_mtime_ns)
+
+def extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf, usar_portada=False, ubicaciones=None, desplazamientos=None):
+    """
+    Extrae información clave si el documento no tiene formato RAE.
+    Con usar_portada=True, el título, los autores y el director se toman primero del diseño
+    de la portada (leer_portada) y las heurísticas de texto solo completan lo que falte.
+    Con 'ubicaciones' se anota dónde se encontró cada campo: el título por sus líneas y los
+    nombres por la página en que aparecieron (hacen falta los 'desplazamientos' del texto).
+    """
     #Primeras paginas
     doc = fitz.open(ruta_pdf)
     primeras_paginas = ""
+    origen_primeras = []  # (posición en primeras_paginas, índice de la página en el documento)
     paginas_leidas = 0
     i = 0
 
     while paginas_leidas < 2 and i < len(doc):
         contenido = doc[i].get_text().strip()
         if contenido:  # Si no está vacía
+            origen_primeras.append((len(primeras_paginas), i))
             primeras_paginas += contenido + "\n"
             paginas_leidas += 1
         i += 1
 
+    # Rango en el texto de las páginas donde está cada nombre (o la portada)
+    anotar_paginas = ubicaciones is not None and desplazamientos is not None
+    lineas_nombres = {}
+
+    def pagina_de_nombre(nombre):
+        posicion = int(tabla_lineas(primeras_paginas).inicio[lineas_nombres[nombre]])
+        return max(pagina for inicio, pagina in origen_primeras if inicio <= posicion)
+
+    def anotar_paginas_de(campo, primera, ultima):
+        if anotar_paginas:
+            anotar(ubicaciones, campo, *rango_de_paginas(primera, ultima, desplazamientos, len(texto)))
+
     info = {
         "TÍTULO": "No encontrado",
         "AUTOR(ES)": "No encontrado",
@@ -263,14 +638,17 @@ def extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf):
         "PUBLICACIÓN": "No disponible",
         
     }
-    # Si no se encontró título, usar el nombre del archivo como fallback
-    info["TÍTULO"] = obtener_titulo(texto)
+    portada = leer_portada(ruta_pdf) if usar_portada else {"titulo": None, "autores": [], "director": None}
+    if portada["autores"]:
+        info["AUTOR(ES)"] = " /\n ".join(portada["autores"][:2])
+        anotar_paginas_de("AUTOR(ES)", 0, 0)
+
+    nombres_unicos = []
     # Buscar AUTOR
     if info["AUTOR(ES)"] == "No encontrado":
-        posibles_nombres = detectar_nombres_por_apellidos(primeras_paginas, APELLIDOS_COMUNES)
+        posibles_nombres = detectar_nombres_por_apellidos(primeras_paginas, APELLIDOS_COMUNES, lineas_nombres)
     
         vistos = set()
-        nombres_unicos = []
     
         for nombre in posibles_nombres:
             if nombre not in vistos and es_nombre_valido(nombre):  # <- asumes que ya tienes esta función
@@ -289,8 +667,23 @@ def extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf):
                 info["AUTOR(ES)"] = f"{nombres_unicos[0]} /\n {nombres_unicos[1]}"
                 info["DIRECTOR"] = nombres_unicos[2]
 
-    nombre_para_titulo = nombres_unicos[0] if nombres_unicos else None
-    info["TÍTULO"] = obtener_titulo(texto, nombre_para_titulo)
+            autores = nombres_unicos[:2 if len(nombres_unicos) == 3 else 1]
+            anotar_paginas_de("AUTOR(ES)", pagina_de_nombre(autores[0]), pagina_de_nombre(autores[-1]))
+            if len(nombres_unicos) > 1:
+                pagina = pagina_de_nombre(nombres_unicos[-1])
+                anotar_paginas_de("DIRECTOR", pagina, pagina)
+
+    # El director indicado en la portada prevalece sobre el deducido por orden de aparición
+    if portada["director"]:
+        info["DIRECTOR"] = portada["director"]
+        anotar_paginas_de("DIRECTOR", 0, 0)
+
+    if portada["titulo"]:
+        info["TÍTULO"] = portada["titulo"]
+        anotar_paginas_de("TÍTULO", 0, 0)
+    else:
+        nombre_para_titulo = nombres_unicos[0] if nombres_unicos else (portada["autores"] or [None])[0]
+        info["TÍTULO"] = obtener_titulo(texto, nombre_para_titulo, ubicaciones)
     # Buscar FECHA
     año = detectar_año(primeras_paginas)
     if año:
@@ -301,14 +694,11 @@ def extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf):
     return info
 
 
-def extraer_descripcion(texto, cierres):
+def extraer_descripcion(texto, cierres, ubicaciones=None):
     contenido_dec = ""
+    tabla = tabla_lineas(texto)
     for cierre in cierres:
-        matches = list(re.finditer(
-            rf"\s*(\d+\s*\.\s*)?(Introducci[oó]n|INTRODUCCI[OÓ]N|Introducci[oó]n\s*y\s*aspectos\s0*generales|CAP[IÌ]TULO I|Resumen|RESUMEN|Resumen\.|Resumen\s*Ejecutivo)\s*\n([\s\S]*?){cierre}",
-            texto,
-            re.MULTILINE | re.DOTALL
-        ))
+        matches = list(patron_seccion("descripcion", cierre).finditer(texto))
 
         for match in matches:
             posible_contenido = match.group(3).strip()
@@ -320,16 +710,21 @@ def extraer_descripcion(texto, cierres):
             ):
                 continue
 
-            lineas_numeradas = sum(
-                1 for l in lineas if re.match(r"^\s*(\d+\.){1,3}\s*", l)
-            )
-            if lineas_numeradas / max(1, len(lineas)) > 0.4:
-                continue
+            # Las líneas del contenido son las de la tabla que contienen su primer y su último
+            # carácter; la última puede quedar cortada por el cierre, así que se evalúa aparte.
+            if lineas:
+                inicio = match.start(3) + len(match.group(3)) - len(match.group(3).lstrip())
+                primera = tabla.linea_en(inicio)
+                ultima = primera + len(lineas) - 1
+                lineas_numeradas = int(tabla.numerada[primera:ultima].sum()) + bool(NUMERACION.match(lineas[-1]))
+                if lineas_numeradas / len(lineas) > 0.4:
+                    continue
 
-            if sum(1 for c in posible_contenido if c == '.') / max(1, len(posible_contenido)) > 0.2:
+            if posible_contenido.count('.') / max(1, len(posible_contenido)) > 0.2:
                 continue
 
             contenido_dec = posible_contenido
+            anotar(ubicaciones, "Descripción", *rango_grupo(match, 3))
             break
 
     if contenido_dec:
@@ -349,17 +744,12 @@ def extraer_descripcion(texto, cierres):
 
     return "No encontrado"
 
-def extraer_fuentes(texto):
-    matches_f = re.finditer(
-        r"\s*(\d+[\.\s]*)?"
-        r"(Referencias|REFERENCIAS|Bibliograf[ií]a|BIBLIOGRAFÍA|Bibliogr[aáÁ]ficos|Referencias\s*bibliográficas|Referencias\s*Bibliográficas|Referencias\s*Bibliográficas\s*:|REFERENCIAS\s*BIBLIOGRÁFICAS|BIBLIOGRÁFICOS)"
-        r"\s*\n+(?!\s*\d\.\d)"
-        r"([\s\S]*?)(?=(Anexo|Anexos|ANEXOS|INDICE|Listas|Ap[eéÉ]ndice\sA|Tabla\s*de\s*Imágenes|Plan\s*de\s*trabajo\s*semanal|Contenido|\Z)\s*$)",
-        texto,
-        re.MULTILINE | re.DOTALL
-    )
-
-    fuente_final = ""
+def extraer_lineas_fuentes(texto, ubicaciones=None):
+    """
+    Devuelve las líneas completas de la bibliografía (sin límite de palabras),
+    o una lista vacía si no se encuentra una sección de referencias con citas.
+    """
+    matches_f = PATRON_FUENTES.finditer(texto)
 
     for match in matches_f:
         posible_fuente = match.group(3).strip()
@@ -376,16 +766,25 @@ def extraer_fuentes(texto):
         ]
 
         if lineas_fuente:
-            texto_fuente = '\n'.join(lineas_fuente).strip()
+            anotar(ubicaciones, "Fuentes", *rango_grupo(match, 3))
+            return lineas_fuente
+
+    return []
+
+def extraer_fuentes(texto, lineas_fuente=None):
+    """ Bibliografía como texto plano, limitada a 1000 palabras para mostrarla. """
+    if lineas_fuente is None:
+        lineas_fuente = extraer_lineas_fuentes(texto)
+    if not lineas_fuente:
+        return ""
 
-            # Limitar a 1000 palabras
-            palabras = texto_fuente.split()
-            if len(palabras) > 1000:
-                palabras = palabras[:1000]
-            fuente_final = ' '.join(palabras)
-            return fuente_final
+    texto_fuente = '\n'.join(lineas_fuente).strip()
 
-    return ""
+    # Limitar a 1000 palabras
+    palabras = texto_fuente.split()
+    if len(palabras) > 1000:
+        palabras = palabras[:1000]
+    return ' '.join(palabras)
 
 
 # Función para extraer las palabras más frecuentes ignorando conectores
@@ -393,39 +792,8 @@ def extraer_palabras_clave(titulo, descripcion, metodologia, cantidad=7):
     # Unificar todo el contenido en un solo bloque de texto
     texto = f"{titulo} {descripcion} {metodologia}".lower()
 
-    #  Diccionario de palabras que queremos excluir
-    stopwords = {
-        'la', 'el', 'los', 'las', 'de', 'del', 'en', 'y', 'a', 'que', 'un', 'una',
-        'es', 'se', 'por', 'para', 'con', 'como', 'su', 'al', 'lo', 'sus', 'le',
-        'o', 'más', 'pero', 'no', 'ni', 'porque', 'cuando', 'donde', 'sobre', 'ya',
-        'cual', 'cuál', 'qué', 'puede', 'mismo', 'cada', 'otros', 'otras', 'parte',
-        'tiene', 'ser', 'estar', 'siendo', 'desde', 'trabajo', 'estudio', 'investigación',
-        'proceso', 'desarrollo', 'proyecto', 'educación', 'educativa', 'tema', 'aspectos',
-        'forma', 'caso', 'nuevo', 'nueva', 'análisis', 'información', 'grado',
-        'estrategia', 'tecnologías', 'comunicación', 'tic', 'nueva', 'décimo',
-        'undécimo', 'primero', 'segundo', 'tercero', 'cuarto', 'quinto', 'sexto',
-        'séptimo', 'octavo', 'noveno', 'once', 'doce', 'básico', 'media', 'mayor',
-        'menor', 'actual', 'primaria', 'secundaria', 'niveles', 'atención',
-        'colegio', 'escolar', 'universidad', 'institución', 'estancia', 'educativo',
-        'académico', 'sede', 'docente', 'docentes', 'estudiante', 'estudiantes',
-        'profesor', 'profesores', 'ltda', 's.a.', 'cia', 'compañía', 'sociedad',
-        'empresa', 'ejemplo', 'uso', 'realización', 'finalidad', 'propósito',
-        'objetivo', 'contexto', 'modo', 'manera', 'medio', 'nivel', 'ámbito',
-        'campo', 'forma', 'mediada', 'moderar', 'función', 'propuesta', 'presente',
-        'nace', 'pedagógica', 'fin', 'nacional', 'cargas', 'estresoras', 'producen',
-        'elementos', 'considerar', 'informe', 'club', 'social', 'proyección',
-        'informativa', 'consolidar', 'escenario', 'teniendo', 'práctico', 'formación'
-        'está', 'proyectado', 'actividades', 'desarrollen', 'habilidades' ,'ejemplos',
-        'algunas','etapa','personas','leal','esta','personas','grupo','siguiente',
-        'brindar','necesidad','coherencia','través','cuales','implican','permiten',
-        'utilizado','combinación','área','este', 'diferentes','asignatura','dinámica',
-        'basado', 'básica','respuestas','fundamentación', 'título','estructuración',
-        'formación','productivo','vereda','actividad','encontrado','hemos','muchas',
-        'fase','documento','busca','buscar','unidad','analogías','figura','partir',
-        'recorrido','ello','realizó','tipo','plantear','licenciatura','cabo','encuentran',
-        'descritas','abordamos','específico','taller','aplicadas','revisión','muestra',
-        'roles','participación','está','genere'
-    }
+    #  Palabras que queremos excluir (conjunto de la configuración)
+    stopwords = STOPWORDS_PALABRAS_CLAVE
 
     #  Extraer solo palabras de 3 o más letras
     palabras = re.findall(r'\b[a-záéíóúñ]{4,}\b', texto)
@@ -439,40 +807,26 @@ def extraer_palabras_clave(titulo, descripcion, metodologia, cantidad=7):
 
     return ', '.join(palabras_clave) if palabras_clave else "No disponibles"
 
-def extraer_contenidos(texto):
+def extraer_contenidos(texto_indice):
     """
-    Extrae la sección de Contenidos a partir de un encabezado común (índice, tabla de contenido, etc.)
+    Recibe el texto de las páginas de la tabla de contenido (ver detectar_tabla_contenido)
     y devuelve una lista numerada limpia.
     """
-    
-    import re #Se colocó de nuevo la biblioteca porque no la detectaba
-    
-    # Buscar encabezado entre múltiples variantes
-    encabezado_patron = re.compile(
-        r'\b(Tabla\s*de\s*contenido|Índice\s*de\s*contenido|Tabla\s+de\s+Contenidos|Contenido|ÍNDICE|TABLA\s*DE\s*CONTENIDO)\b',
-        re.IGNORECASE
-    )
-    match = encabezado_patron.search(texto)
-    if not match:
-        return "No encontrado (no se encontró encabezado de contenido)"
-
-    # Obtener texto desde el final del encabezado
-    inicio = match.end()
-    texto_restante = texto[inicio:]
+    # Si el encabezado está en las páginas, se empieza después de él (se saltan los encabezados de página)
+    match = PATRON_TABLA_CONTENIDO.search(texto_indice)
+    texto_restante = texto_indice[match.end():] if match else texto_indice
 
     # Separar en líneas no vacías
     lineas = texto_restante.splitlines()
-    lineas_utiles = [l.strip() for l in lineas if l.strip()]
-
-    # Tomar las primeras 40 líneas útiles
-    posibles_contenidos = lineas_utiles[:40]
+    posibles_contenidos = [l.strip() for l in lineas if l.strip()]
 
     # Limpiar y filtrar líneas
     elementos = []
     for linea in posibles_contenidos:
         linea = re.sub(r'[\.·•…\-_]{3,}', '', linea)  # quitar puntos suspensivos y similares
+        linea = re.sub(r'\s+\d{1,3}\s*$', '', linea)  # quitar el número de página final
         linea = re.sub(r'\s+', ' ', linea)  # normalizar espacios
-        linea = re.sub(r'^\d+(\.\d+)*\s*', '', linea)  # quitar numeraciones tipo 1.1
+        linea = re.sub(r'^\d+(\.\d+)*\.?\s*', '', linea)  # quitar numeraciones tipo 1. o 1.1
         linea = linea.strip()
         if len(linea) > 2:
             elementos.append(linea)
@@ -491,41 +845,10 @@ def extraer_contenidos(texto):
 
     return "\n".join(f"{i+1}. {elem}" for i, elem in enumerate(final))
 
-def extraer_metodologia(texto, cierres):
+def extraer_metodologia(texto, cierres, ubicaciones=None):
     candidatos = []
     for cierre in cierres:
-        pattern = re.finditer(
-            rf"""
-            \s*
-            (\d+\s*\.\s*)?[\s\n]*
-            (
-                Metodolog[íi]a\.? |
-                METODOLOG[IÍ]A |
-                Diseño\s[Mm]etodol[oó]gico|
-                Marco\smetodol[oóÓ]gico|
-                Marco\sMetodol[oóÓ]gico|
-                MARCO\s*METODOL[OÓ]GICO|
-                Aspectos\s+Metodol[oóÓ]gicos |
-                ASPECTOS\sMETODOL[OÓ]GICOS |
-                Marco\s+procedimental |
-                Metodolog[íiÍI]a\s+de\s+la\s+sesi[oóÓ]n |
-                ejercicios\spropuestos |
-                Design\sThinking |
-                Diseño\s*de\s*investigación|
-                Plan\sDe\sTrabajo |
-                PLAN\sDE\sTRABAJO |
-                Capítulo\sI\:\sContextualizaci[oó]n |
-                Guías\sy\sTalleres\sSTEM |
-                Metodología\spara\srecolección\sde\sdatos\sde\spérdidas |
-                Enfoque\s*y\s*Metodología\s*investigación\. |
-                METODOLOGÍA\s*DE\s*DISEÑO|
-                Metodología\s*de\s*Desarrollo\s*de\s*software\s*RUP
-            )
-
-             \s*\n([\s\S]*?){cierre}""",
-            texto,
-            re.MULTILINE | re.DOTALL | re.VERBOSE
-        )
+        pattern = patron_seccion("metodologia", cierre).finditer(texto)
 
         for match in pattern:
             posible_contenido = match.group(3).strip()
@@ -539,10 +862,11 @@ def extraer_metodologia(texto, cierres):
                     continue
 
             if 10 < len(posible_contenido.split()) < 1000:
-                candidatos.append(posible_contenido)
+                candidatos.append((posible_contenido, rango_grupo(match, 3)))
 
     if candidatos:
-        mejor = max(candidatos, key=len)
+        mejor, rango = max(candidatos, key=lambda candidato: len(candidato[0]))
+        anotar(ubicaciones, "Metodología", *rango)
         parrafos = re.split(r'\n\s*\n', mejor)
         parrafos_largos = [
             re.sub(r'\s+', ' ', p).strip()
@@ -559,17 +883,11 @@ def extraer_metodologia(texto, cierres):
 
     return "No encontrado"
 
-def extraer_conclusiones(texto, cierres):
+def extraer_conclusiones(texto, cierres, ubicaciones=None):
     candidatos = []
 
     for cierre in cierres:
-        pattern_conc = re.finditer(
-            r"\s*(\d+\s*\.\s*\d*\s*)?"
-            r"(Conclusiones|Conclusi[oó]n|CONCLUSIONES|CONCLUSIONES\.|CONCLUSI[OÓ]N|Conclusiones\s*y\s*recomendaciones)"
-            rf"\s*[\n\.]*([\s\S]*?){cierre}",
-            texto,
-            re.MULTILINE | re.DOTALL
-        )
+        pattern_conc = patron_seccion("conclusiones", cierre).finditer(texto)
 
         for match in pattern_conc:
             posible_contenido = match.group(3).strip()
@@ -596,10 +914,11 @@ def extraer_conclusiones(texto, cierres):
                 if sum(1 for c in posible_contenido if c in ".·•") / max(1, len(posible_contenido)) > 0.3:
                     continue
 
-                candidatos.append(posible_contenido)
+                candidatos.append((posible_contenido, rango_grupo(match, 3)))
 
     if candidatos:
-        mejor = max(candidatos, key=len)
+        mejor, rango = max(candidatos, key=lambda candidato: len(candidato[0]))
+        anotar(ubicaciones, "Conclusiones", *rango)
         parrafos = re.split(r'\n\s*\n', mejor)
         parrafos_largos = [
             re.sub(r'\s+', ' ', p).strip()
@@ -616,27 +935,57 @@ def extraer_conclusiones(texto, cierres):
 
     return "No encontrado"
 
-def extraer_secciones_sin_formato_rae(texto, num_paginas, ruta_pdf):
-    doc = fitz.open(ruta_pdf)
-
-    contenidos = extraer_contenidos(texto)
-    texto = eliminar_tabla_contenido(doc)
-    texto = re.sub(r'\n\s*\d+\s*\n', '', texto)
+def extraer_secciones_sin_formato_rae(texto, num_paginas, ruta_pdf, usar_portada=False, paginas=None, imagenes=None, ubicaciones=None):
+    # 'paginas' es el texto de cada página si ya se extrajo; si no, se lee el PDF.
+    # 'imagenes' es la cantidad de imágenes de cada página, si se conoce (ver clasificar_paginas).
+    # 'ubicaciones' recibe dónde se encontró cada sección, en el texto unido de 'paginas'.
+    if paginas is None:
+        with fitz.open(ruta_pdf) as doc:
+            lecturas = [leer_pagina(pagina) for pagina in doc]
+        paginas = [texto_pagina for texto_pagina, _ in lecturas]
+        imagenes = [cantidad for _, cantidad in lecturas]
+
+    # La tabla de contenido se detecta una sola vez y sirve para extraerla y para quitarla del texto
+    rango_indice = detectar_tabla_contenido(paginas)
+    if rango_indice:
+        contenidos = extraer_contenidos(texto_de_paginas(paginas, rango_indice))
+    else:
+        contenidos = "No encontrado (no se detectó tabla de contenido)"
+    # Los números de página sueltos ya se quitaron al extraer el texto (quitar_lineas_repetidas)
+    texto = eliminar_tabla_contenido(paginas, rango_indice)
+
+    # Las secciones se buscan solo en las páginas de cuerpo y referencias (sin portada, índice ni anexos)
+    roles = clasificar_paginas(paginas, imagenes, rango_indice)
+    texto_secciones = texto_de_roles(paginas, roles)
+    # Páginas que forman texto_secciones, para llevar los rangos anotados al texto completo
+    incluidas = [i for i, rol in enumerate(roles) if rol in ROLES_SECCIONES]
+    if not texto_secciones:
+        texto_secciones = texto
+        incluidas = [i for i in range(len(paginas)) if not (rango_indice and rango_indice[0] <= i <= rango_indice[1])]
+    en_secciones = {} if ubicaciones is not None else None
 
     cierres = [
         r"(?=\n\s*\n)",         
         r"(?=\.\s*\n)"
     ]
 
+    # Las referencias estructuradas se arman con la bibliografía completa, sin el límite de palabras
+    lineas_fuente = extraer_lineas_fuentes(texto_secciones, en_secciones)
+
     secciones = {
-        "Información General": extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf),
-        "Descripción": extraer_descripcion(texto, cierres),
+        "Información General": extraer_info_sin_formato_rae(texto, num_paginas, ruta_pdf, usar_portada),
+        "Descripción": extraer_descripcion(texto_secciones, cierres, en_secciones),
         "LÍNEAS DE INVESTIGACIÓN": [],  # Aquí se llenará más abajo
-        "Fuentes": extraer_fuentes(texto) or "No encontrado",
+        "Fuentes": extraer_fuentes(texto_secciones, lineas_fuente) or "No encontrado",
+        "Referencias": parsear_referencias(lineas_fuente),
         "Contenidos": contenidos,
-        "Metodología": extraer_metodologia(texto, cierres),
-        "Conclusiones": extraer_conclusiones(texto, cierres)
+        "Metodología": extraer_metodologia(texto_secciones, cierres, en_secciones),
+        "Conclusiones": extraer_conclusiones(texto_secciones, cierres, en_secciones)
     }
+    if en_secciones:
+        mapa = mapa_paginas(paginas, incluidas)
+        for campo, rango in en_secciones.items():
+            ubicaciones[campo] = rango_en_texto_completo(rango, mapa)
 
     # Extraer título y descripción para clasificar líneas
     info_general = secciones.get("Información General", {})
@@ -654,7 +1003,7 @@ def extraer_secciones_sin_formato_rae(texto, num_paginas, ruta_pdf):
     return secciones
 
     
-def extraer_palabras_c(texto):
+def extraer_palabras_c(texto, ubicaciones=None):
     """
     Extrae las palabras clave desde la sección "Palabras Clave" en formato RAE,
     deteniéndose en la siguiente sección, por ejemplo "2. Descripción".
@@ -674,6 +1023,8 @@ def extraer_palabras_c(texto):
     else:
         texto_palabras = texto_restante[:300]  # fallback
 
+    anotar(ubicaciones, "PALABRAS CLAVE", inicio, inicio + len(texto_palabras.rstrip()))
+
     # Unir líneas partidas, quitar saltos de línea
     texto_plano = " ".join(texto_palabras.splitlines())
 
@@ -683,7 +1034,7 @@ def extraer_palabras_c(texto):
 
     return texto_plano if texto_plano else None
 
-def extraer_titulo_rae(texto):
+def extraer_titulo_rae(texto, ubicaciones=None):
     patron = re.compile(
         r"(?i)T[íi]tulo\s+del\s+documento\s*:?\s*\n*(.+?)(?=\n\s*(AUTOR\(ES\)|AUTOR|DIRECTOR|INFORMACIÓN GENERAL|PALABRAS CLAVE|FECHA DE PUBLICACIÓN))",
         re.DOTALL
@@ -691,11 +1042,12 @@ def extraer_titulo_rae(texto):
     match = patron.search(texto)
     if match:
         titulo = match.group(1)
+        anotar(ubicaciones, "TÍTULO", *rango_grupo(match, 1))
         # Limpiar saltos de línea y espacios
         return " ".join(titulo.strip().splitlines()).strip()
     return None
-def extraer_info_general(texto):
-    """ Extrae la información general sin mezclar datos. """
+def extraer_info_general(texto, ubicaciones=None):
+    """ Extrae la información general sin mezclar datos (y, si se pide, dónde está cada dato). """
     info = {
         "TÍTULO": "No encontrado",
         "AUTOR(ES)": "No encontrado",
@@ -706,7 +1058,7 @@ def extraer_info_general(texto):
     }
 
     # Extraer título (tomando hasta 6 líneas)
-    titulo = extraer_titulo_rae(texto)
+    titulo = extraer_titulo_rae(texto, ubicaciones)
     if titulo:
         info["TÍTULO"] = titulo
 
@@ -726,21 +1078,23 @@ def extraer_info_general(texto):
             match = re.search(patron, texto_info_general)
             if match:
                 info[clave] = match.group(grupo).strip()
+                anotar(ubicaciones, clave, *rango_grupo(match, grupo, match_info_general.start(1)))
 
     # Usar función especializada para palabras clave
-    palabras_clave = extraer_palabras_c(texto)
+    palabras_clave = extraer_palabras_c(texto, ubicaciones)
     if palabras_clave:
         info["PALABRAS CLAVE"] = palabras_clave
 
     return info
 
-def extraer_secciones(texto, num_paginas):
+def extraer_secciones(texto, num_paginas, ubicaciones=None):
     """ Extrae las secciones del documento y clasifica líneas de investigación. """
-    info_general = extraer_info_general(texto)
+    info_general = extraer_info_general(texto, ubicaciones)
     secciones = {
         "Información General": info_general,
         "Descripción": "No encontrado",
         "Fuentes": [],
+        "Referencias": [],
         "Contenidos": "No encontrado",
         "Metodología": "No encontrado",
         "Conclusiones": "No encontrado",
@@ -758,6 +1112,7 @@ def extraer_secciones(texto, num_paginas):
         match = re.search(patron, texto, re.DOTALL)
         if match:
             contenido = match.group(1).strip()
+            anotar(ubicaciones, seccion, *rango_grupo(match, 1))
             if seccion != "Contenidos":
                 contenido = re.sub(r'\n+', ' ', contenido)
             contenido = limpiar_encabezados(contenido)
@@ -766,8 +1121,10 @@ def extraer_secciones(texto, num_paginas):
     # Extraer fuentes como lista
     fuentes_match = re.search(r"(?i)((?:2|3)\.\s*)?(Fuentes|Bibliografía)\s*([\n\s\S]+?)(?=\n\d+\.\s|\Z)", texto, re.DOTALL)
     if fuentes_match:
-        lineas = fuentes_match.group(2).strip().split("\n")
+        anotar(ubicaciones, "Fuentes", *rango_grupo(fuentes_match, 3))
+        lineas = fuentes_match.group(3).strip().split("\n")
         secciones["Fuentes"] = [line.strip() for line in lineas if line.strip()]
+        secciones["Referencias"] = parsear_referencias(secciones["Fuentes"])
 
     # Clasificar líneas de investigación usando título y descripción
     titulo = info_general.get("TÍTULO", "")
@@ -776,27 +1133,36 @@ def extraer_secciones(texto, num_paginas):
 
     return secciones
 
+# Encabezados del formato RAE que pueden quedar dentro de una sección (los repetidos en cada
+# página ya se quitan al extraer el texto). Una sola expresión en lugar de una pasada por patrón.
+PATRON_ENCABEZADOS_RAE = re.compile(
+    r"contenido\s*\d+"
+    r"|FORMATO\s+RESUMEN\s+ANALÍTICO\s+EN\s+EDUCACIÓN\s+-\s+RAE"
+    r"|Código:\s*FOR\d+\w*"
+    r"|Versión:\s*\d+"
+    r"|Fecha de Aprobación:\s*\d{2}-\d{2}-\d{4}"
+    r"|Página\s*\d+\s*de\s*\d+",
+    re.IGNORECASE,
+)
+
 def limpiar_encabezados(texto):
     """Elimina encabezados innecesarios y limpia el texto."""
-    patrones_excluir = [
-        r"(?i)contenido\s*\d+",  
-        r"(?i)FORMATO\s+RESUMEN\s+ANALÍTICO\s+EN\s+EDUCACIÓN\s+-\s+RAE",  
-        r"(?i)Código:\s*FOR\d+\w*",  
-        r"(?i)Versión:\s*\d+",  
-        r"(?i)Fecha de Aprobación:\s*\d{2}-\d{2}-\d{4}",  
-        r"(?i)Página\s*\d+\s*de\s*\d+",  
-    ]
-    
-    for patron in patrones_excluir:
-        texto = re.sub(patron, "", texto)
+    texto = PATRON_ENCABEZADOS_RAE.sub("", texto)
 
     # Elimina líneas vacías y espacios extra
     texto = "\n".join([line.strip() for line in texto.split("\n") if line.strip()])
 
     return texto.strip()
 
-def procesar_documento(path_pdf):
-    texto, num_paginas, ruta_pdf = extraer_texto(path_pdf)
+def procesar_documento(path_pdf, extraido=None, usar_portada=False):
+    # 'extraido' permite reutilizar el resultado de extraer_texto (o extraer_texto_paginado) si ya se calculó antes.
+    # Las tuplas guardadas antes (o las de AlmacenTexto) pueden no traer desplazamientos ni imágenes.
+    texto, num_paginas, ruta_pdf, *resto = extraido or extraer_texto_paginado(path_pdf)
+    desplazamientos = resto[0] if resto else None
+    imagenes = resto[1] if len(resto) > 1 else None
+    # Rangos donde cada extractor encontró su campo; sin desplazamientos (tuplas viejas) no se
+    # puede llevar lo leído de las páginas al texto, y la procedencia se busca en todo el texto
+    ubicaciones = {} if desplazamientos is not None else None
 
     # Verificar si tiene formato RAE directamente por las frases clave
     if (re.search(r"Tipo\s*de\s*documento", texto, re.IGNORECASE) and
@@ -805,79 +1171,225 @@ def procesar_documento(path_pdf):
         
         print("✅ Documento con formato RAE detectado.")
         info_general = extraer_info_general(texto)
-        secciones = extraer_secciones(texto, num_paginas)
+        secciones = extraer_secciones(texto, num_paginas, ubicaciones)
     else:
         print("⚠️ Documento posiblemente sin formato RAE. Aplicando extractor alternativo.")
-        info_general = extraer_info_sin_formato_rae(texto, num_paginas, path_pdf)
-        secciones = extraer_secciones_sin_formato_rae(texto, num_paginas, path_pdf)
+        info_general = extraer_info_sin_formato_rae(
+            texto, num_paginas, path_pdf, usar_portada, ubicaciones, desplazamientos
+        )
+        paginas = separar_paginas(texto, desplazamientos) if desplazamientos is not None else None
+        secciones = extraer_secciones_sin_formato_rae(
+            texto, num_paginas, path_pdf, usar_portada, paginas, imagenes if paginas is not None else None, ubicaciones
+        )
 
     info_general = info_general or {}
     secciones = secciones or {}
 
-    return {**info_general, **secciones}
+    resultado = {**info_general, **secciones}
+    # De qué páginas y caracteres salió cada campo (sin desplazamientos, solo los caracteres)
+    resultado["Procedencia"] = calcular_procedencia(resultado, texto, desplazamientos, ubicaciones)
+    return resultado
     
 
+def procesar_con_triaje(path_pdf):
+    """
+    Ejecuta procesar_documento solo si el PDF tiene capa de texto. Si es solo imagen,
+    cifrado o dañado devuelve {"Triaje": clasificación} sin pasar por el extractor.
+    """
+    clasificacion = clasificar_pdf(path_pdf)
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        return {"Triaje": clasificacion}
+    return procesar_documento(path_pdf)
+
+
+def procesar_repartido(grupo, path_pdf, partes):
+    """
+    Como procesar_con_triaje, pero para un solo documento cuando importa su tiempo de respuesta:
+    el triaje y la lectura de las páginas (repartida en 'partes' rangos) corren en los procesos
+    de 'grupo', y luego un proceso extrae los campos del texto ya leído.
+    Se llama desde un hilo del proceso principal, nunca desde un trabajador del mismo grupo; ese
+    hilo no abre el PDF (fitz solo corre en los trabajadores), así que puede haber varios a la vez.
+    """
+    clasificacion = grupo.submit(clasificar_pdf, path_pdf).result()
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        return {"Triaje": clasificacion}
+    num_paginas = clasificacion["paginas"]
+    if partes < 2 or num_paginas < PAGINAS_MIN_PARALELO:
+        return grupo.submit(procesar_documento, path_pdf).result()
+    lecturas = extraer_paginas_en_paralelo(grupo, path_pdf, num_paginas, partes)
+    return grupo.submit(procesar_documento, path_pdf, unir_paginas(lecturas, num_paginas, path_pdf)).result()
+
+
+def mostrar_resultado(archivo_pdf, info_extraida):
+    """ Muestra en consola la información extraída de un documento. """
+    print(f"\n📄 Archivo: {archivo_pdf}\n")
+
+    print("🔹 **Información General**")
+    if "Información General" in info_extraida and info_extraida["Información General"]:
+        for clave, valor in info_extraida["Información General"].items():
+            print(f"   - {clave}: {valor}\n")
+
+    print("\n🔹 **Descripción**")
+    print(info_extraida.get("Descripción", "No disponible"))
+
+    print("\n🔹 **Metodología**")
+    print(info_extraida.get("Metodología", "No disponible"))
+
+    print("\n🔹 **Conclusiones**")
+    print(info_extraida.get("Conclusiones", "No disponible"))
+
+    print("\n🔹 **Contenidos**")
+    print(info_extraida.get("Contenidos", "No disponible"))
+
+    print("\n🔹 **Fuentes**")
+    fuentes = info_extraida.get("Fuentes", [])
+    if isinstance(fuentes, list):
+        for fuente in fuentes:
+            print(f"   - {fuente}")
+    else:
+        print(fuentes)
+
+    print("\n🔹 **LÍNEAS DE INVESTIGACIÓN**")
+    lineas = info_extraida.get("LÍNEAS DE INVESTIGACIÓN", [])
+    if isinstance(lineas, list):
+        for linea in lineas:
+            print(f"   ✅ {linea}")
+    else:
+        print(lineas)
+
+    print("\n" + "="*80 + "\n")
+
+
+def procesar_lote_en_segundo_plano(archivos_pdf, cola_eventos, cancelar, procesos=None):
+    """
+    Procesa los PDFs en un grupo de procesos y va dejando en 'cola_eventos' una tupla
+    (archivo, resultado, error) por cada documento terminado, en el orden en que terminan.
+    Se ejecuta en un hilo aparte para que la ventana nunca se congele.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        if len(archivos_pdf) == 1 and procesos > 1:
+            # Con un solo documento lo que importa es su tiempo de respuesta: sus páginas se leen en varios procesos
+            try:
+                cola_eventos.put((archivos_pdf[0], procesar_repartido(grupo, archivos_pdf[0], procesos), None))
+            except Exception as error:
+                cola_eventos.put((archivos_pdf[0], None, error))
+        else:
+            # Del documento más costoso al menos costoso; al cancelar, los que están en curso terminan solos
+            for evento in ejecutar_por_costo(grupo, procesar_con_triaje, archivos_pdf, procesos, cancelar=cancelar):
+                cola_eventos.put(evento)
+
+    cola_eventos.put(None)  # Marca de fin del lote
+
+
 def seleccionar_multiples_pdfs():
-    """ Permite seleccionar varios PDFs y muestra la información de cada uno en consola. """
+    """
+    Permite seleccionar varios PDFs y los procesa en segundo plano, mostrando el avance,
+    la velocidad, el tiempo restante estimado y cada resultado a medida que termina.
+    """
     root = tk.Tk()
-    root.geometry("400x150")
+    root.geometry("700x450")
     root.title("Seleccionar varios PDFs")
 
+    cola_eventos = queue.Queue()
+    cancelar = threading.Event()
+    estado = {"total": 0, "hechos": 0, "inicio": 0.0}
+
+    btn = tk.Button(root, text="Seleccionar PDFs", font=("Arial", 12), bg="green", fg="white")
+    btn.pack(pady=10)
+
+    barra = ttk.Progressbar(root, orient="horizontal", mode="determinate", length=600)
+    barra.pack(pady=5)
+
+    etiqueta = tk.Label(root, text="Ningún lote en curso.", font=("Arial", 10))
+    etiqueta.pack()
+
+    btn_cancelar = tk.Button(root, text="Cancelar", state="disabled", font=("Arial", 10))
+    btn_cancelar.pack(pady=5)
+
+    lista_resultados = tk.Listbox(root, font=("Arial", 10))
+    lista_resultados.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def actualizar_estado():
+        transcurrido = max(time.monotonic() - estado["inicio"], 1e-6)
+        velocidad = estado["hechos"] / transcurrido
+        restantes = estado["total"] - estado["hechos"]
+        eta = f"{restantes / velocidad:.0f} s" if velocidad > 0 else "calculando..."
+        etiqueta.config(
+            text=f"{estado['hechos']} de {estado['total']} documentos · "
+                 f"{velocidad * 60:.1f} docs/min · tiempo restante: {eta}"
+        )
+        barra["value"] = estado["hechos"]
+
+    def revisar_cola():
+        """ Lee los resultados que van llegando del hilo de trabajo sin bloquear la ventana. """
+        while True:
+            try:
+                evento = cola_eventos.get_nowait()
+            except queue.Empty:
+                break
+
+            if evento is None:
+                btn.config(state="normal")
+                btn_cancelar.config(state="disabled")
+                final = "Lote cancelado" if cancelar.is_set() else "Lote terminado"
+                etiqueta.config(text=f"{final}: {estado['hechos']} de {estado['total']} documentos procesados.")
+                return
+
+            archivo_pdf, info_extraida, error = evento
+            estado["hechos"] += 1
+            nombre = os.path.basename(archivo_pdf)
+            if error:
+                print(f"\n❌ Error procesando {archivo_pdf}: {error}")
+                lista_resultados.insert("end", f"❌ {nombre}: {error}")
+            elif "Triaje" in info_extraida:
+                # Escaneado, cifrado o dañado: no se extrajo nada
+                estado_triaje = info_extraida["Triaje"]["estado"]
+                print(f"\n🚫 {archivo_pdf}: {estado_triaje}, no se procesa")
+                lista_resultados.insert("end", f"🚫 {nombre}: {estado_triaje}")
+            else:
+                mostrar_resultado(archivo_pdf, info_extraida)
+                titulo = info_extraida.get("TÍTULO") or "Sin título"
+                lista_resultados.insert("end", f"✅ {nombre}: {titulo}")
+            lista_resultados.see("end")
+            actualizar_estado()
+
+        root.after(100, revisar_cola)
+
     def abrir_archivos():
         archivos_pdf = filedialog.askopenfilenames(filetypes=[("Archivos PDF", "*.pdf")])
-
-        if archivos_pdf:
-            for archivo_pdf in archivos_pdf:
-                print(f"\n📄 Archivo seleccionado: {archivo_pdf}\n")
-                
-                # Extraemos el texto y el número de páginas del PDF
-                texto, num_paginas, ruta_pdf = extraer_texto(archivo_pdf)
-                
-                # Procesamos el documento para extraer la información
-                info_extraida = procesar_documento(archivo_pdf)
-
-                print("🔹 **Información General**")
-                if "Información General" in info_extraida and info_extraida["Información General"]:
-                    for clave, valor in info_extraida["Información General"].items():
-                        print(f"   - {clave}: {valor}\n")
-
-                print("\n🔹 **Descripción**")
-                print(info_extraida.get("Descripción", "No disponible"))
-
-                print("\n🔹 **Metodología**")
-                print(info_extraida.get("Metodología", "No disponible"))
-
-                print("\n🔹 **Conclusiones**")
-                print(info_extraida.get("Conclusiones", "No disponible"))
-
-                print("\n🔹 **Contenidos**")
-                print(info_extraida.get("Contenidos", "No disponible"))
-
-                print("\n🔹 **Fuentes**")
-                fuentes = info_extraida.get("Fuentes", [])
-                if isinstance(fuentes, list):
-                    for fuente in fuentes:
-                        print(f"   - {fuente}")
-                else:
-                    print(fuentes)
-
-                print("\n🔹 **LÍNEAS DE INVESTIGACIÓN**")
-                lineas = info_extraida.get("LÍNEAS DE INVESTIGACIÓN", [])
-                if isinstance(lineas, list):
-                    for linea in lineas:
-                        print(f"   ✅ {linea}")
-                else:
-                    print(lineas)
-
-                print("\n" + "="*80 + "\n")
-        else:
+        if not archivos_pdf:
             print("\n❌ No se seleccionó ningún archivo.")
-        
+            return
+
+        cancelar.clear()
+        estado.update(total=len(archivos_pdf), hechos=0, inicio=time.monotonic())
+        barra.config(maximum=len(archivos_pdf), value=0)
+        btn.config(state="disabled")
+        btn_cancelar.config(state="normal")
+        actualizar_estado()
+
+        threading.Thread(
+            target=procesar_lote_en_segundo_plano,
+            args=(archivos_pdf, cola_eventos, cancelar),
+            daemon=True,
+        ).start()
+        revisar_cola()
+
+    def cancelar_lote():
+        cancelar.set()
+        btn_cancelar.config(state="disabled")
+        etiqueta.config(text="Cancelando: se terminan los documentos que ya estaban en curso...")
+
+    def cerrar_ventana():
+        cancelar.set()
         root.destroy()
 
-    btn = tk.Button(root, text="Seleccionar PDFs", command=abrir_archivos, font=("Arial", 12), bg="green", fg="white")
-    btn.pack(pady=50)
-    
+    btn.config(command=abrir_archivos)
+    btn_cancelar.config(command=cancelar_lote)
+    root.protocol("WM_DELETE_WINDOW", cerrar_ventana)
+
     root.mainloop()
 # Ejecutar selección de archivo
-seleccionar_multiples_pdfs()
+if __name__ == "__main__":
+    seleccionar_multiples_pdfs()
@@ -0,0 +1,221 @@
+# --------------------------------------------
+# REFERENCIAS BIBLIOGRÁFICAS ESTRUCTURADAS E ÍNDICE DE CITAS
+# --------------------------------------------
+# Convierte la bibliografía extraída (texto o lista de líneas) en registros con autores,
+# año, título y fuente usando heurísticas de formato APA, y mantiene un índice común a
+# todo el corpus para responder "qué tesis citan X" y contar citas sin volver a abrir PDFs.
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+from almacen_resultados import leer_almacen
+
+# Inicio de una referencia APA: "Apellido, N." o "Apellido Apellido, N. N." seguido del año
+INICIO_REFERENCIA = re.compile(
+    r"(?:(?<=[.\n])|^)\s*(?=[A-ZÁÉÍÓÚÑ][\w'’\-]+(?:\s[A-ZÁÉÍÓÚÑ][\w'’\-]+)?,\s(?:[A-ZÁÉÍÓÚÑ]\.\s?)+[^()]{0,250}?\((?:\d{4}|s\.\s?f\.))"
+)
+# Autor institucional: "Ministerio de Educación Nacional. (2016)."
+INICIO_INSTITUCIONAL = re.compile(r"(?:(?<=[.\n])|^)\s*(?=[A-ZÁÉÍÓÚÑ][^().\n]{3,120}\.\s*\((?:\d{4}|s\.\s?f\.))")
+
+PATRON_REFERENCIA = re.compile(
+    r"^(?P<autores>.+?)\s*\((?P<año>\d{4}[a-z]?|s\.\s?f\.)[^)]*\)\.?\s*"
+    r"(?P<titulo>.+?[.?!])(?:\s+(?P<fuente>.*))?$",
+    re.DOTALL,
+)
+PATRON_AUTOR = re.compile(r"([A-ZÁÉÍÓÚÑ][\w'’\-]+(?:\s[A-ZÁÉÍÓÚÑ][\w'’\-]+)?),\s((?:[A-ZÁÉÍÓÚÑ]\.\s?-?)+)")
+
+
+def plegar(texto):
+    """ Quita tildes, pasa a minúsculas y deja solo letras, números y espacios simples. """
+    texto = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.findall(r"[a-z0-9]+", texto))
+
+
+def separar_referencias(fuentes):
+    """
+    Divide la bibliografía en referencias individuales. Acepta el texto plano que devuelve
+    extraer_fuentes o la lista de líneas de la ruta RAE; las líneas partidas se unen.
+    """
+    texto = "\n".join(fuentes) if isinstance(fuentes, list) else (fuentes or "")
+    inicios = sorted(
+        {m.start() for m in INICIO_REFERENCIA.finditer(texto)}
+        | {m.start() for m in INICIO_INSTITUCIONAL.finditer(texto)}
+    )
+    if not inicios:
+        return []
+
+    referencias = []
+    for inicio, fin in zip(inicios, inicios[1:] + [len(texto)]):
+        referencia = re.sub(r"\s+", " ", texto[inicio:fin]).strip()
+        if referencia:
+            referencias.append(referencia)
+    return referencias
+
+
+def parsear_referencia(referencia):
+    """
+    Convierte una referencia en un registro {autores, año, titulo, fuente}.
+    Devuelve None si no se reconoce la estructura autor (año) título.
+    """
+    match = PATRON_REFERENCIA.match(referencia)
+    if not match:
+        return None
+
+    texto_autores = match.group("autores").strip().rstrip(",")
+    autores = [f"{apellido}, {iniciales.strip()}" for apellido, iniciales in PATRON_AUTOR.findall(texto_autores)]
+    if not autores:
+        autores = [texto_autores.rstrip(".")]  # Autor institucional
+
+    año = match.group("año")
+    return {
+        "autores": autores,
+        "año": int(año[:4]) if año[:4].isdigit() else None,
+        "titulo": match.group("titulo").strip().rstrip("."),
+        "fuente": (match.group("fuente") or "").strip() or None,
+    }
+
+
+def parsear_referencias(fuentes):
+    """ Separa y estructura todas las referencias reconocibles de una bibliografía. """
+    registros = []
+    for referencia in separar_referencias(fuentes):
+        registro = parsear_referencia(referencia)
+        if registro:
+            registros.append(registro)
+    return registros
+
+
+def clave_referencia(registro):
+    """
+    Clave para reconocer la misma obra citada por distintas tesis:
+    primer apellido del primer autor + año + primeras palabras del título.
+    """
+    primer_autor = plegar(registro["autores"][0].split(",")[0]) if registro["autores"] else ""
+    palabras_titulo = plegar(registro["titulo"]).split()[:6]
+    return f"{primer_autor}|{registro['año'] or 'sf'}|{' '.join(palabras_titulo)}"
+
+
+class IndiceCitas:
+    """
+    Índice de referencias compartido por todo el corpus. Guarda cada obra una sola vez
+    y la lista de documentos (por hash) que la citan.
+    """
+
+    def __init__(self):
+        self.referencias = {}  # clave -> registro
+        self.citas = defaultdict(set)  # clave -> hashes de documentos que la citan
+        self.terminos = defaultdict(set)  # término plegado -> claves (búsqueda por autor o título)
+
+    def agregar_documento(self, hash_documento, registros):
+        for registro in registros:
+            clave = clave_referencia(registro)
+            if clave not in self.referencias:
+                self.referencias[clave] = registro
+                self.indexar_terminos(clave, registro)
+            self.citas[clave].add(hash_documento)
+
+    def indexar_terminos(self, clave, registro):
+        texto = " ".join(registro["autores"]) + " " + registro["titulo"]
+        for termino in plegar(texto).split():
+            if len(termino) > 2:
+                self.terminos[termino].add(clave)
+
+    def buscar(self, consulta):
+        """ Claves de las referencias cuyo autor o título contiene todos los términos de la consulta. """
+        terminos = [t for t in plegar(consulta).split() if len(t) > 2]
+        if not terminos:
+            return set()
+        conjuntos = sorted((self.terminos.get(t, set()) for t in terminos), key=len)
+        return set.intersection(*conjuntos)
+
+    def tesis_que_citan(self, consulta):
+        """ Hashes de los documentos que citan alguna obra que coincide con la consulta. """
+        documentos = set()
+        for clave in self.buscar(consulta):
+            documentos |= self.citas[clave]
+        return documentos
+
+    def mas_citadas(self, cantidad=20):
+        """ [(registro, número de tesis que la citan)] ordenado de mayor a menor. """
+        orden = sorted(self.citas.items(), key=lambda par: len(par[1]), reverse=True)[:cantidad]
+        return [(self.referencias[clave], len(hashes)) for clave, hashes in orden]
+
+    def guardar(self, ruta_indice):
+        datos = {
+            "version": 1,
+            "referencias": self.referencias,
+            "citas": {clave: sorted(hashes) for clave, hashes in self.citas.items()},
+        }
+        ruta_temporal = ruta_indice + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta_indice)
+
+    @classmethod
+    def cargar(cls, ruta_indice):
+        indice = cls()
+        if not os.path.exists(ruta_indice):
+            return indice
+        with open(ruta_indice, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        for clave, registro in datos["referencias"].items():
+            indice.referencias[clave] = registro
+            indice.indexar_terminos(clave, registro)
+        for clave, hashes in datos["citas"].items():
+            indice.citas[clave] = set(hashes)
+        return indice
+
+
+def indexar_almacen(ruta_almacen, indice):
+    """
+    Agrega al índice las referencias de todos los registros de un almacén de resultados.
+    Usa el campo "Referencias" ya estructurado y, si falta (resultados antiguos), "Fuentes".
+    """
+    documentos = 0
+    for registro in leer_almacen(ruta_almacen):
+        resultado = registro.get("resultado") or {}
+        referencias = resultado.get("Referencias")
+        if referencias is None:
+            referencias = parsear_referencias(resultado.get("Fuentes") or "")
+        indice.agregar_documento(registro["hash"], referencias)
+        documentos += 1
+    return documentos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de citas del corpus.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_indexar = sub.add_parser("indexar", help="Agrega al índice las referencias de un almacén de resultados.")
+    p_indexar.add_argument("almacen")
+    p_indexar.add_argument("indice")
+
+    p_citan = sub.add_parser("citan", help="Tesis que citan una obra (por autor o palabras del título).")
+    p_citan.add_argument("indice")
+    p_citan.add_argument("consulta")
+
+    p_top = sub.add_parser("top", help="Obras más citadas del corpus.")
+    p_top.add_argument("indice")
+    p_top.add_argument("--cantidad", type=int, default=20)
+
+    args = parser.parse_args()
+    indice = IndiceCitas.cargar(args.indice)
+
+    if args.accion == "indexar":
+        documentos = indexar_almacen(args.almacen, indice)
+        indice.guardar(args.indice)
+        print(f"✅ {documentos} documentos indexados, {len(indice.referencias)} obras distintas.")
+    elif args.accion == "citan":
+        for hash_documento in sorted(indice.tesis_que_citan(args.consulta)):
+            print(hash_documento)
+    else:
+        for registro, total in indice.mas_citadas(args.cantidad):
+            print(f"{total:5d}  {'; '.join(registro['autores'])} ({registro['año'] or 's.f.'}). {registro['titulo']}")
+
+
+if __name__ == "__main__":
+    main()
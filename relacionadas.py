@@ -0,0 +1,254 @@
+# --------------------------------------------
+# TESIS RELACIONADAS (LSA: TF-IDF + SVD TRUNCADA)
+# --------------------------------------------
+# Para cada tesis se arma un texto con su descripción, su metodología y sus palabras clave
+# (del almacén de resultados, sin volver a extraer). Con todo el corpus se calcula una matriz
+# TF-IDF dispersa y se reduce con una SVD truncada aleatorizada (NumPy): cada tesis queda como un
+# vector corto de "temas latentes", y las relacionadas son las de mayor similitud coseno.
+#
+# Todo corre en CPU y sin conexión. El modelo (vocabulario, IDF, componentes y vectores) se guarda
+# en un .npz; consultar es un producto matriz-vector sobre los vectores ya calculados.
+# Las tesis nuevas se agregan proyectándolas sobre los componentes existentes ("fold-in"), sin
+# recalcular la SVD; conviene reconstruir el modelo cuando el corpus haya crecido mucho.
+#
+# Uso:
+#   python relacionadas.py construir corpus.jsonl --modelo relacionadas.npz
+#   python relacionadas.py agregar nuevas.jsonl --modelo relacionadas.npz
+#   python relacionadas.py similares <hash> --modelo relacionadas.npz -k 10
+
+import argparse
+import os
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from configuracion import STOPWORDS_PALABRAS_CLAVE
+from modelo_resultado import cargar_resultados
+
+DIMENSIONES = 100  # Temas latentes
+MIN_DOCUMENTOS = 2  # Términos en menos documentos no aportan a la similitud entre tesis
+MAX_PROPORCION = 0.5  # Términos en más de la mitad del corpus tampoco
+ITERACIONES_POTENCIA = 4
+SEMILLA = 1
+
+
+def plegar(texto):
+    texto = unicodedata.normalize("NFD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+STOPWORDS = frozenset(plegar(p) for p in STOPWORDS_PALABRAS_CLAVE)
+
+
+def terminos(texto):
+    """ Palabras de 3 o más letras, sin tildes ni palabras vacías. """
+    return [p for p in re.findall(r"[a-zñ]{3,}", plegar(texto)) if p not in STOPWORDS]
+
+
+def texto_de_tesis(resultado):
+    """ Descripción, metodología y palabras clave de un ResultadoTesis (las palabras clave pesan doble). """
+    palabras_clave = " ".join(resultado.palabras_clave)
+    return " ".join(filter(None, [resultado.descripcion, resultado.metodologia, palabras_clave, palabras_clave]))
+
+
+def matriz_tfidf(textos, vocabulario, idf):
+    """ Filas TF-IDF (1 + log tf) normalizadas; los términos fuera del vocabulario se ignoran. """
+    from scipy import sparse
+
+    filas, columnas, valores = [], [], []
+    for fila, texto in enumerate(textos):
+        conteo = Counter(t for t in terminos(texto) if t in vocabulario)
+        for termino, veces in conteo.items():
+            filas.append(fila)
+            columnas.append(vocabulario[termino])
+            valores.append((1.0 + np.log(veces)) * idf[vocabulario[termino]])
+    matriz = sparse.csr_matrix(
+        (np.array(valores, dtype=np.float32), (filas, columnas)), shape=(len(textos), len(vocabulario))
+    )
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1.0
+    return sparse.diags(1.0 / normas).dot(matriz).tocsr().astype(np.float32)
+
+
+def svd_truncada(matriz, dimensiones, iteraciones=ITERACIONES_POTENCIA, semilla=SEMILLA):
+    """
+    SVD aleatorizada (Halko et al.): proyecta la matriz dispersa sobre un subespacio aleatorio,
+    lo refina con unas iteraciones de potencia y resuelve una SVD densa pequeña.
+    Devuelve (U, S, Vt) con 'dimensiones' componentes.
+    """
+    generador = np.random.RandomState(semilla)
+    extra = min(10, min(matriz.shape) - dimensiones)
+    omega = generador.standard_normal((matriz.shape[1], dimensiones + max(extra, 0))).astype(np.float32)
+    q, _ = np.linalg.qr(matriz @ omega)
+    for _ in range(iteraciones):
+        q, _ = np.linalg.qr(matriz.T @ q)
+        q, _ = np.linalg.qr(matriz @ q)
+    u_pequena, s, vt = np.linalg.svd((matriz.T @ q).T, full_matrices=False)
+    return (q @ u_pequena)[:, :dimensiones], s[:dimensiones], vt[:dimensiones]
+
+
+def normalizar_filas(vectores):
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return (vectores / normas).astype(np.float32)
+
+
+class ModeloRelacionadas:
+    """ Vocabulario, IDF y componentes de la SVD, más el vector de cada tesis. """
+
+    def __init__(self, terminos_vocabulario, idf, componentes, hashes, titulos, vectores):
+        self.terminos = list(terminos_vocabulario)
+        self.vocabulario = {t: i for i, t in enumerate(self.terminos)}
+        self.idf = idf
+        self.componentes = componentes  # (términos, dimensiones): V de la SVD
+        self.hashes = list(hashes)
+        self.titulos = list(titulos)
+        self.vectores = vectores  # (tesis, dimensiones), filas normalizadas
+        self.fila_por_hash = {h: i for i, h in enumerate(self.hashes)}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, hash_pdf):
+        return hash_pdf in self.fila_por_hash
+
+    def proyectar(self, textos):
+        """ Vectores de textos nuevos sobre los temas del modelo (fold-in). """
+        return normalizar_filas(matriz_tfidf(textos, self.vocabulario, self.idf) @ self.componentes)
+
+    def agregar(self, resultados):
+        """ Agrega las tesis que no estén (sin repetir hashes), sin recalcular la SVD. Devuelve cuántas se agregaron. """
+        unicas = {}
+        for resultado in resultados:
+            if resultado.hash not in self.fila_por_hash:
+                unicas.setdefault(resultado.hash, resultado)
+        nuevas = list(unicas.values())
+        if not nuevas:
+            return 0
+        vectores = self.proyectar([texto_de_tesis(r) for r in nuevas])
+        self.vectores = np.vstack([self.vectores, vectores])
+        for resultado in nuevas:
+            self.fila_por_hash[resultado.hash] = len(self.hashes)
+            self.hashes.append(resultado.hash)
+            self.titulos.append(resultado.titulo or "")
+        return len(nuevas)
+
+    def mas_cercanas(self, vector, k=10, excluir=None):
+        """ [(hash, título, similitud)] de las k tesis más parecidas al vector. """
+        similitudes = self.vectores @ vector
+        if excluir is not None:
+            similitudes[excluir] = -np.inf
+        k = min(k, len(similitudes) - (excluir is not None))
+        if k <= 0:
+            return []
+        mejores = np.argpartition(-similitudes, k - 1)[:k]
+        mejores = mejores[np.argsort(-similitudes[mejores])]
+        return [(self.hashes[i], self.titulos[i], float(similitudes[i])) for i in mejores]
+
+    def similares(self, hash_pdf, k=10):
+        fila = self.fila_por_hash[hash_pdf]
+        return self.mas_cercanas(self.vectores[fila], k, excluir=fila)
+
+    def similares_a_texto(self, texto, k=10):
+        return self.mas_cercanas(self.proyectar([texto])[0], k)
+
+    def guardar(self, ruta_modelo):
+        ruta_temporal = ruta_modelo + ".tmp.npz"
+        np.savez(
+            ruta_temporal,
+            terminos=np.array(self.terminos, dtype=str),
+            idf=self.idf,
+            componentes=self.componentes,
+            hashes=np.array(self.hashes, dtype=str),
+            titulos=np.array(self.titulos, dtype=str),
+            vectores=self.vectores,
+        )
+        os.replace(ruta_temporal, ruta_modelo)
+
+    @classmethod
+    def cargar(cls, ruta_modelo):
+        datos = np.load(ruta_modelo)
+        return cls(
+            [str(t) for t in datos["terminos"]], datos["idf"], datos["componentes"],
+            [str(h) for h in datos["hashes"]], [str(t) for t in datos["titulos"]], datos["vectores"],
+        )
+
+
+def construir(resultados, dimensiones=DIMENSIONES):
+    """ Modelo completo a partir de los ResultadoTesis (sin repetir hashes). """
+    unicos = {}
+    for resultado in resultados:
+        unicos.setdefault(resultado.hash, resultado)
+    resultados = list(unicos.values())
+    textos = [texto_de_tesis(r) for r in resultados]
+
+    frecuencia = Counter()
+    for texto in textos:
+        frecuencia.update(set(terminos(texto)))
+    maximo = MAX_PROPORCION * len(textos)
+    vocabulario_ordenado = sorted(t for t, n in frecuencia.items() if MIN_DOCUMENTOS <= n <= maximo)
+    if not vocabulario_ordenado:
+        raise ValueError("El corpus es demasiado pequeño: ningún término aparece en varias tesis.")
+    vocabulario = {t: i for i, t in enumerate(vocabulario_ordenado)}
+    idf = np.array(
+        [np.log((1 + len(textos)) / (1 + frecuencia[t])) + 1.0 for t in vocabulario_ordenado], dtype=np.float32
+    )
+
+    matriz = matriz_tfidf(textos, vocabulario, idf)
+    dimensiones = max(1, min(dimensiones, min(matriz.shape) - 1))
+    u, s, vt = svd_truncada(matriz, dimensiones)
+    return ModeloRelacionadas(
+        vocabulario_ordenado, idf, vt.T.astype(np.float32),
+        [r.hash for r in resultados], [r.titulo or "" for r in resultados],
+        normalizar_filas(u * s),
+    )
+
+
+def resultados_de_almacenes(rutas_almacen):
+    for ruta in rutas_almacen:
+        yield from cargar_resultados(ruta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesis relacionadas por temas latentes (LSA).")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    p_construir = sub.add_parser("construir", help="Calcula el modelo con todo el corpus.")
+    p_construir.add_argument("almacenes", nargs="+")
+    p_construir.add_argument("--modelo", required=True)
+    p_construir.add_argument("--dimensiones", type=int, default=DIMENSIONES)
+
+    p_agregar = sub.add_parser("agregar", help="Agrega tesis nuevas al modelo sin recalcularlo.")
+    p_agregar.add_argument("almacenes", nargs="+")
+    p_agregar.add_argument("--modelo", required=True)
+
+    p_similares = sub.add_parser("similares", help="Tesis más parecidas a una del corpus.")
+    p_similares.add_argument("hash")
+    p_similares.add_argument("--modelo", required=True)
+    p_similares.add_argument("-k", type=int, default=10)
+
+    args = parser.parse_args()
+    if args.accion == "construir":
+        modelo = construir(resultados_de_almacenes(args.almacenes), args.dimensiones)
+        modelo.guardar(args.modelo)
+        print(f"✅ {len(modelo)} tesis, {len(modelo.terminos)} términos, "
+              f"{modelo.componentes.shape[1]} dimensiones → {args.modelo}")
+    elif args.accion == "agregar":
+        modelo = ModeloRelacionadas.cargar(args.modelo)
+        agregadas = modelo.agregar(resultados_de_almacenes(args.almacenes))
+        modelo.guardar(args.modelo)
+        print(f"✅ {agregadas} tesis agregadas ({len(modelo)} en total)")
+    else:
+        modelo = ModeloRelacionadas.cargar(args.modelo)
+        if args.hash not in modelo:
+            print(f"❌ La tesis {args.hash} no está en el modelo.")
+            return
+        print(f"📚 Relacionadas con: {modelo.titulos[modelo.fila_por_hash[args.hash]]}")
+        for hash_pdf, titulo, similitud in modelo.similares(args.hash, args.k):
+            print(f"   {similitud:.3f}  {titulo or hash_pdf}")
+
+
+if __name__ == "__main__":
+    main()
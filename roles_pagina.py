@@ -0,0 +1,161 @@
+# --------------------------------------------
+# PAPEL DE CADA PÁGINA DEL DOCUMENTO
+# --------------------------------------------
+# Los anexos suelen ser la mitad de las páginas de una tesis y hoy pasan por todas las
+# expresiones de secciones; además, un "Referencias" o un "Anexo" dentro de un anexo confunde
+# a extraer_fuentes. Antes de buscar secciones, cada página se etiqueta con señales baratas:
+# cuánto texto tiene, cuántas imágenes (si se leyó con PyMuPDF) y su primera línea.
+#
+#   portada      primeras páginas con poco texto y sin párrafos, antes del cuerpo
+#   rae          hoja del Formato Resumen Analítico en Educación
+#   indice       tabla de contenido (el rango de detectar_tabla_contenido)
+#   cuerpo       el resto
+#   referencias  desde la página que empieza con el encabezado de bibliografía
+#   anexo        desde la página que empieza con "Anexo"/"Apéndice"
+#   blanco       sin texto útil (en blanco, o una imagen con apenas su pie de foto)
+#
+# Referencias y anexos siguen hasta la próxima página que empiece con el otro encabezado, pero
+# solo después del último encabezado del cuerpo ("Capítulo 4", "5. Conclusiones") al inicio de
+# una página: antes de él, una bibliografía de fin de capítulo o una página que empieza con
+# "Anexo 1 muestra..." no arrastran a las páginas siguientes.
+# Los extractores de secciones (descripción, metodología, conclusiones, fuentes) solo reciben
+# las páginas de cuerpo y referencias; la información general sigue usando todo el texto.
+
+import argparse
+import re
+from collections import Counter
+
+import fitz
+
+from configuracion import PATRON_PAGINA_ANEXO, PATRON_PAGINA_CUERPO, PATRON_PAGINA_FUENTES
+
+ROL_PORTADA = "portada"
+ROL_RAE = "rae"
+ROL_INDICE = "indice"
+ROL_CUERPO = "cuerpo"
+ROL_REFERENCIAS = "referencias"
+ROL_ANEXO = "anexo"
+ROL_BLANCO = "blanco"
+
+ROLES_SECCIONES = {ROL_CUERPO, ROL_REFERENCIAS}  # Páginas que ven los extractores de secciones
+
+MIN_CARACTERES_PAGINA = 30  # Mismo umbral que el triaje: menos es un número de página o un sello
+MAX_CARACTERES_IMAGEN = 200  # Una imagen con solo su pie de foto (anexo escaneado, fotografía)
+MAX_CARACTERES_PORTADA = 800  # Una portada o una nota de aceptación tienen poco texto
+PAGINAS_PORTADA = 3  # Solo las primeras páginas pueden ser portada
+MAX_LARGO_ENCABEZADO = 80  # Una primera línea más larga es un párrafo, no un encabezado
+MAX_LINEAS_PARRAFO_PORTADA = 2  # La portada son líneas cortas centradas; un resumen tiene párrafos
+PATRON_FORMATO_RAE = re.compile(r"(?i)formato\s+resumen\s+anal[ií]tico")
+PATRONES_CAMPOS_RAE = [re.compile(r"(?i)tipo\s*de\s*documento"), re.compile(r"(?i)acceso\s*al\s*documento")]
+
+
+def primera_linea(texto_pagina):
+    for linea in texto_pagina.splitlines():
+        if linea.strip():
+            return linea.strip()
+    return ""
+
+
+def es_hoja_rae(texto_pagina):
+    """ El título del formato, o los campos con que procesar_documento reconoce un RAE. """
+    return bool(PATRON_FORMATO_RAE.search(texto_pagina)) or all(p.search(texto_pagina) for p in PATRONES_CAMPOS_RAE)
+
+
+def caracteres_utiles(texto_pagina):
+    return len("".join(texto_pagina.split()))
+
+
+def lineas_de_parrafo(texto_pagina):
+    """ Líneas largas (de párrafo corrido) de la página. """
+    return sum(len(linea.strip()) > MAX_LARGO_ENCABEZADO for linea in texto_pagina.splitlines())
+
+
+def encabezado_pagina(texto_pagina):
+    """ Primera línea de la página si es corta como un encabezado; si no, cadena vacía. """
+    encabezado = primera_linea(texto_pagina)
+    return encabezado if len(encabezado) <= MAX_LARGO_ENCABEZADO else ""
+
+
+def ultimo_encabezado_cuerpo(encabezados, rango_indice=None):
+    """ Índice de la última página que empieza con un encabezado del cuerpo (fuera del índice), o -1. """
+    for i in range(len(encabezados) - 1, -1, -1):
+        if rango_indice and rango_indice[0] <= i <= rango_indice[1]:
+            continue
+        if encabezados[i] and PATRON_PAGINA_CUERPO.match(encabezados[i]):
+            return i
+    return -1
+
+
+def clasificar_paginas(paginas, imagenes=None, rango_indice=None):
+    """
+    Papel de cada página (lista del mismo largo que 'paginas').
+    'imagenes' es la cantidad de imágenes por página, si se conoce; 'rango_indice' es el
+    (primera, última) de detectar_tabla_contenido, para no volver a calcularlo.
+    """
+    encabezados = [encabezado_pagina(texto_pagina) for texto_pagina in paginas]
+    ultimo_cuerpo = ultimo_encabezado_cuerpo(encabezados, rango_indice)
+    roles = []
+    continuacion = None  # referencias o anexo: se mantiene en las páginas siguientes
+    cuerpo_visto = False
+    for i, texto_pagina in enumerate(paginas):
+        caracteres = caracteres_utiles(texto_pagina)
+        encabezado = encabezados[i]
+        final = i > ultimo_cuerpo  # Solo después del último capítulo empiezan referencias y anexos
+
+        if caracteres < MIN_CARACTERES_PAGINA:
+            rol = ROL_BLANCO
+        elif imagenes is not None and imagenes[i] and caracteres < MAX_CARACTERES_IMAGEN and i >= PAGINAS_PORTADA:
+            # Una imagen con su pie de foto (escaneo de un anexo, una fotografía): nada que extraer
+            rol = ROL_BLANCO
+        elif rango_indice and rango_indice[0] <= i <= rango_indice[1]:
+            rol = ROL_INDICE
+        elif es_hoja_rae(texto_pagina):
+            rol = ROL_RAE
+        elif encabezado and PATRON_PAGINA_ANEXO.match(encabezado) and final:
+            rol = continuacion = ROL_ANEXO
+        elif encabezado and PATRON_PAGINA_FUENTES.match(encabezado):
+            # Antes del último capítulo es una bibliografía parcial: solo esa página
+            rol = ROL_REFERENCIAS
+            continuacion = ROL_REFERENCIAS if final else None
+        elif continuacion:
+            rol = continuacion
+        elif (not cuerpo_visto and i < PAGINAS_PORTADA and caracteres < MAX_CARACTERES_PORTADA
+              and lineas_de_parrafo(texto_pagina) <= MAX_LINEAS_PARRAFO_PORTADA):
+            rol = ROL_PORTADA
+        else:
+            rol = ROL_CUERPO
+        cuerpo_visto = cuerpo_visto or rol == ROL_CUERPO
+        roles.append(rol)
+    return roles
+
+
+def texto_de_roles(paginas, roles, incluidos=ROLES_SECCIONES):
+    """ Texto unido de las páginas cuyo papel está en 'incluidos'. """
+    return "".join(texto_pagina for texto_pagina, rol in zip(paginas, roles) if rol in incluidos)
+
+
+def clasificar_paginas_pdf(ruta_pdf):
+    """ Texto y papel de cada página leyendo el PDF (con la cantidad de imágenes de cada una). """
+    from rae2 import detectar_lineas_repetidas, detectar_tabla_contenido, quitar_lineas_repetidas
+
+    with fitz.open(ruta_pdf) as doc:
+        paginas = [pagina.get_text() for pagina in doc]
+        imagenes = [len(pagina.get_images()) for pagina in doc]  # Solo la lista, sin decodificarlas
+    paginas = quitar_lineas_repetidas(paginas, detectar_lineas_repetidas(paginas))
+    return paginas, clasificar_paginas(paginas, imagenes, detectar_tabla_contenido(paginas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestra el papel de cada página de un PDF.")
+    parser.add_argument("pdf")
+    args = parser.parse_args()
+
+    paginas, roles = clasificar_paginas_pdf(args.pdf)
+    for numero, (texto_pagina, rol) in enumerate(zip(paginas, roles), start=1):
+        print(f"{numero:>4}  {rol:<12} {primera_linea(texto_pagina)[:60]}")
+    conteo = Counter(roles)
+    print("\n" + " · ".join(f"{rol}: {cantidad}" for rol, cantidad in conteo.most_common()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# --------------------------------------------
+# SERVICIO DE INGESTA POR CARPETA VIGILADA
+# --------------------------------------------
+# Servicio de larga duración: vigila una carpeta de entrega, espera a que cada PDF
+# termine de copiarse, lo encola y lo procesa con procesar_documento en un grupo de
+# procesos. asyncio se encarga de la espera y la escritura (E/S) y el grupo de
+# procesos de la extracción (uso intensivo de CPU).
+
+import argparse
+import asyncio  # asyncio: coordina la vigilancia, la cola y la escritura sin bloquear.
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor  # Procesos independientes para la extracción.
+
+from almacen_resultados import calcular_hash, construir_registro, guardar_registro, hashes_en_almacen
+from rae2 import procesar_documento
+from triaje import ESTADO_TEXTO, clasificar_pdf, registro_separado, ruta_cola_triaje
+
+
+def procesar_pdf(ruta_pdf, hash_pdf):
+    """
+    Se ejecuta dentro de un proceso del grupo: procesa el PDF y arma su registro.
+    Si el triaje lo descarta (solo imagen, cifrado, dañado) devuelve el registro de la
+    cola de triaje, que lleva "estado" en lugar de "resultado".
+    """
+    clasificacion = clasificar_pdf(ruta_pdf)
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        return registro_separado(ruta_pdf, clasificacion, hash_pdf)
+    resultado = procesar_documento(ruta_pdf)
+    return construir_registro(ruta_pdf, resultado, hash_pdf)
+
+
+async def vigilar_carpeta(directorio, cola, detener, intervalo=2.0, lecturas_estables=2):
+    """
+    Revisa la carpeta cada 'intervalo' segundos. Un PDF se encola solo cuando su tamaño
+    y fecha de modificación no cambian durante 'lecturas_estables' revisiones seguidas,
+    así no se procesan archivos que todavía se están copiando.
+    """
+    estados = {}  # ruta -> (tamaño, fecha de modificación, revisiones sin cambios)
+    encolados = set()
+
+    while not detener.is_set():
+        try:
+            entradas = await asyncio.to_thread(lambda: list(os.scandir(directorio)))
+        except FileNotFoundError:
+            entradas = []
+
+        presentes = set()
+        for entrada in entradas:
+            if not entrada.is_file() or not entrada.name.lower().endswith(".pdf"):
+                continue
+            ruta = entrada.path
+            presentes.add(ruta)
+            if ruta in encolados:
+                continue
+
+            info = entrada.stat()
+            anterior = estados.get(ruta)
+            if anterior and anterior[:2] == (info.st_size, info.st_mtime_ns):
+                estables = anterior[2] + 1
+            else:
+                estables = 0
+            estados[ruta] = (info.st_size, info.st_mtime_ns, estables)
+
+            if estables >= lecturas_estables and info.st_size > 0:
+                encolados.add(ruta)
+                del estados[ruta]
+                await cola.put(ruta)
+
+        # Olvidar archivos que desaparecieron de la carpeta (permite volver a entregarlos)
+        for ruta in list(estados):
+            if ruta not in presentes:
+                del estados[ruta]
+        encolados &= presentes
+
+        try:
+            await asyncio.wait_for(detener.wait(), timeout=intervalo)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def trabajador(cola, grupo, ruta_almacen, procesados):
+    """ Toma PDFs de la cola, los envía al grupo de procesos y guarda los resultados. """
+    bucle = asyncio.get_running_loop()
+    while True:
+        ruta_pdf = await cola.get()
+        hash_pdf = None
+        try:
+            hash_pdf = await asyncio.to_thread(calcular_hash, ruta_pdf)
+            if hash_pdf in procesados:
+                print(f"⏭️ Ya procesado anteriormente: {ruta_pdf}")
+                continue
+            procesados.add(hash_pdf)
+
+            print(f"📄 Procesando: {ruta_pdf}")
+            registro = await bucle.run_in_executor(grupo, procesar_pdf, ruta_pdf, hash_pdf)
+            if "estado" in registro:
+                await asyncio.to_thread(guardar_registro, ruta_cola_triaje(ruta_almacen), registro)
+                print(f"🚫 {registro['estado']}, separado para revisión: {ruta_pdf}")
+                continue
+            await asyncio.to_thread(guardar_registro, ruta_almacen, registro)
+            print(f"✅ Guardado: {ruta_pdf}")
+        except Exception as error:
+            print(f"❌ Error procesando {ruta_pdf}: {error}")
+            procesados.discard(hash_pdf)  # Se reintentará si el archivo se vuelve a entregar
+        finally:
+            cola.task_done()
+
+
+async def ejecutar_servicio(directorio, ruta_almacen, procesos=None, intervalo=2.0):
+    """ Arranca la vigilancia y los trabajadores hasta recibir Ctrl+C o SIGTERM. """
+    procesos = procesos or os.cpu_count() or 1
+    detener = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, detener.set)
+        except NotImplementedError:  # Windows no permite manejadores de señales en el bucle
+            pass
+
+    # La cola acotada evita acumular miles de rutas si la carpeta recibe un lote enorme
+    cola = asyncio.Queue(maxsize=procesos * 2)
+    # Los ya separados por el triaje también cuentan: si no, se volverían a anexar a su cola en cada reinicio
+    procesados = await asyncio.to_thread(hashes_en_almacen, ruta_almacen)
+    separados = await asyncio.to_thread(hashes_en_almacen, ruta_cola_triaje(ruta_almacen))
+    print(f"👀 Vigilando {directorio} con {procesos} procesos ({len(procesados)} documentos ya en el almacén, "
+          f"{len(separados - procesados)} en la cola de triaje)")
+    procesados |= separados
+
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        trabajadores = [
+            asyncio.create_task(trabajador(cola, grupo, ruta_almacen, procesados))
+            for _ in range(procesos)
+        ]
+        await vigilar_carpeta(directorio, cola, detener, intervalo)
+
+        # Terminar lo que ya estaba en la cola antes de salir
+        await cola.join()
+        for tarea in trabajadores:
+            tarea.cancel()
+        await asyncio.gather(*trabajadores, return_exceptions=True)
+
+    print("🛑 Servicio detenido.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Procesa automáticamente los PDFs que llegan a una carpeta.")
+    parser.add_argument("carpeta", help="Carpeta de entrega que se vigila.")
+    parser.add_argument("almacen", help="Almacén JSON Lines donde se guardan los resultados.")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre revisiones de la carpeta.")
+    args = parser.parse_args()
+
+    asyncio.run(ejecutar_servicio(args.carpeta, args.almacen, args.procesos, args.intervalo))
+
+
+if __name__ == "__main__":
+    main()
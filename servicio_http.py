@@ -0,0 +1,335 @@
+# --------------------------------------------
+# API HTTP LOCAL DE EXTRACCIÓN
+# --------------------------------------------
+# Expone procesar_documento como un pequeño servicio HTTP para el catálogo.
+# Los procesos trabajadores se crean una sola vez y quedan "calientes" (fitz, rae2 y sus
+# expresiones regulares ya cargados), así cada documento no paga el arranque de Python.
+#
+#   POST /extraer              cuerpo application/pdf (archivo subido) o JSON {"ruta": "..."}
+#        ?modo=sincrono        responde con el resultado cuando termina (por defecto)
+#        ?modo=trabajo         responde 202 con un identificador de trabajo
+#   GET  /trabajos/<id>        estado y resultado de un trabajo
+#   GET  /salud                capacidad y ocupación del servicio
+#
+# La cola es acotada: si ya hay demasiados documentos en curso se responde 429, antes de leer
+# el cuerpo de la petición. Los PDF subidos tienen un tamaño máximo (413) y se copian a disco
+# por bloques, sin cargarlos enteros en memoria.
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from almacen_resultados import calcular_hash, construir_registro
+
+# Tiempo que se conserva el resultado de un trabajo terminado antes de descartarlo
+VIGENCIA_TRABAJOS = 3600
+MAX_MB_SUBIDA = 200  # Tamaño máximo de un PDF subido
+MAX_BYTES_JSON = 64 * 1024  # Una petición JSON solo trae la ruta
+TAM_BLOQUE = 1024 * 1024  # Bytes que se copian por vez del cuerpo al archivo temporal
+
+
+# --------------------------------------------
+# FUNCIONES QUE CORREN EN LOS PROCESOS TRABAJADORES
+# --------------------------------------------
+
+def preparar_trabajador():
+    """ Se ejecuta una vez al crear cada proceso: deja cargados fitz y rae2. """
+    import rae2  # noqa: F401  (la importación compila los patrones del módulo)
+
+
+def calentar():
+    """ Tarea vacía para obligar al grupo a crear todos sus procesos al arrancar. """
+    return os.getpid()
+
+
+def extraer_en_trabajador(ruta_pdf):
+    """ Devuelve el registro del documento, o el del triaje ("estado") si no tiene capa de texto. """
+    from rae2 import procesar_documento
+    from triaje import ESTADO_TEXTO, clasificar_pdf, registro_separado
+
+    clasificacion = clasificar_pdf(ruta_pdf)
+    if clasificacion["estado"] != ESTADO_TEXTO:
+        return registro_separado(ruta_pdf, clasificacion)
+    resultado = procesar_documento(ruta_pdf)
+    return construir_registro(ruta_pdf, resultado, calcular_hash(ruta_pdf))
+
+
+def extraer_repartido(grupo, ruta_pdf, partes):
+    """
+    Corre en un hilo del proceso principal: reparte las páginas de un PDF grande entre los
+    procesos del grupo (procesar_repartido) y arma el mismo registro que extraer_en_trabajador.
+    """
+    from rae2 import procesar_repartido
+    from triaje import registro_separado
+
+    resultado = procesar_repartido(grupo, ruta_pdf, partes)
+    if "Triaje" in resultado:
+        return registro_separado(ruta_pdf, resultado["Triaje"])
+    return construir_registro(ruta_pdf, resultado, calcular_hash(ruta_pdf))
+
+
+# --------------------------------------------
+# ESTADO COMPARTIDO DEL SERVICIO
+# --------------------------------------------
+
+class ServicioExtraccion:
+    """ Grupo de procesos, cupo de la cola y registro de trabajos. """
+
+    def __init__(self, procesos, capacidad, raiz_permitida=None, partes_por_documento=1,
+                 max_bytes_subida=MAX_MB_SUBIDA * 1024 * 1024):
+        self.grupo = ProcessPoolExecutor(max_workers=procesos, initializer=preparar_trabajador)
+        self.capacidad = capacidad
+        self.cupo = threading.BoundedSemaphore(capacidad)
+        self.en_curso = 0
+        self.raiz_permitida = os.path.realpath(raiz_permitida) if raiz_permitida else None
+        self.partes_por_documento = partes_por_documento
+        # Hilos que coordinan los documentos repartidos entre procesos; no extraen nada ellos mismos
+        self.coordinadores = ThreadPoolExecutor(max_workers=capacidad) if partes_por_documento > 1 else None
+        self.max_bytes_subida = max_bytes_subida
+        self.trabajos = {}  # id -> futuro
+        self.terminados = {}  # id -> momento en que terminó (para purgar)
+        self.candado = threading.Lock()
+
+        # Crear y calentar todos los procesos desde el inicio
+        for futuro in [self.grupo.submit(calentar) for _ in range(procesos)]:
+            futuro.result()
+
+    def ruta_valida(self, ruta_pdf):
+        ruta_real = os.path.realpath(ruta_pdf)
+        if not ruta_real.lower().endswith(".pdf") or not os.path.isfile(ruta_real):
+            return False
+        if self.raiz_permitida and os.path.commonpath([ruta_real, self.raiz_permitida]) != self.raiz_permitida:
+            return False
+        return True
+
+    def reservar(self):
+        """ Toma un lugar en la cola antes de leer la petición. False si la cola está llena. """
+        if not self.cupo.acquire(blocking=False):
+            return False
+        with self.candado:
+            self.en_curso += 1
+        return True
+
+    def liberar(self):
+        with self.candado:
+            self.en_curso -= 1
+        self.cupo.release()
+
+    def enviar(self, ruta_pdf, temporal=False):
+        """
+        Envía al grupo un documento que ya tiene su lugar (reservar) y devuelve el futuro.
+        El lugar se libera al terminar; los archivos subidos (temporales) se borran.
+        """
+        def al_terminar(_):
+            self.liberar()
+            if temporal:
+                try:
+                    os.remove(ruta_pdf)
+                except OSError:
+                    pass
+
+        try:
+            if self.coordinadores is not None:
+                futuro = self.coordinadores.submit(extraer_repartido, self.grupo, ruta_pdf, self.partes_por_documento)
+            else:
+                futuro = self.grupo.submit(extraer_en_trabajador, ruta_pdf)
+        except Exception:
+            al_terminar(None)
+            raise
+        futuro.add_done_callback(al_terminar)
+        return futuro
+
+    def registrar_trabajo(self, futuro):
+        id_trabajo = uuid.uuid4().hex
+        with self.candado:
+            self.purgar_trabajos()
+            self.trabajos[id_trabajo] = futuro
+        # La vigencia se cuenta desde que termina, no desde que se creó el trabajo
+        futuro.add_done_callback(lambda _: self.marcar_terminado(id_trabajo))
+        return id_trabajo
+
+    def marcar_terminado(self, id_trabajo):
+        with self.candado:
+            if id_trabajo in self.trabajos:
+                self.terminados[id_trabajo] = time.time()
+
+    def purgar_trabajos(self):
+        """ Descarta trabajos terminados hace más de VIGENCIA_TRABAJOS segundos. """
+        limite = time.time() - VIGENCIA_TRABAJOS
+        for id_trabajo, terminado in list(self.terminados.items()):
+            if terminado < limite:
+                del self.terminados[id_trabajo]
+                del self.trabajos[id_trabajo]
+
+
+def crear_manejador(servicio, espera_sincrona):
+
+    class Manejador(BaseHTTPRequestHandler):
+
+        def responder(self, codigo, cuerpo, encabezados=None):
+            datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            for clave, valor in (encabezados or {}).items():
+                self.send_header(clave, valor)
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/salud":
+                self.responder(200, {"capacidad": servicio.capacidad, "en_curso": servicio.en_curso})
+                return
+
+            if url.path.startswith("/trabajos/"):
+                id_trabajo = url.path.rsplit("/", 1)[-1]
+                with servicio.candado:
+                    futuro = servicio.trabajos.get(id_trabajo)
+                if futuro is None:
+                    self.responder(404, {"error": "Trabajo no encontrado"})
+                    return
+                if not futuro.done():
+                    self.responder(200, {"estado": "pendiente"})
+                elif futuro.exception():
+                    self.responder(200, {"estado": "error", "error": str(futuro.exception())})
+                elif "estado" in futuro.result():
+                    self.responder(200, {"estado": "separado", "registro": futuro.result()})
+                else:
+                    self.responder(200, {"estado": "terminado", "registro": futuro.result()})
+                return
+
+            self.responder(404, {"error": "Ruta no encontrada"})
+
+        def leer_documento(self, tipo, longitud):
+            """
+            (ruta del PDF, es temporal) a partir del cuerpo, o (None, False) si ya se respondió
+            con un error. Un PDF subido se copia por bloques a un temporal que el trabajador pueda abrir.
+            """
+            if tipo == "application/pdf":
+                descriptor, ruta_pdf = tempfile.mkstemp(suffix=".pdf")
+                try:
+                    with os.fdopen(descriptor, "wb") as archivo:
+                        pendientes = longitud
+                        while pendientes:
+                            bloque = self.rfile.read(min(TAM_BLOQUE, pendientes))
+                            if not bloque:
+                                raise ConnectionError("El cliente cortó la subida")
+                            archivo.write(bloque)
+                            pendientes -= len(bloque)
+                except Exception:
+                    os.remove(ruta_pdf)
+                    raise
+                return ruta_pdf, True
+
+            try:
+                ruta_pdf = json.loads(self.rfile.read(longitud) or b"{}")["ruta"]
+            except (ValueError, KeyError, TypeError):
+                self.responder(400, {"error": "Se esperaba un PDF o un JSON con la clave 'ruta'"})
+                return None, False
+            if not isinstance(ruta_pdf, str) or not servicio.ruta_valida(ruta_pdf):
+                self.responder(400, {"error": "Ruta de PDF no válida o no permitida"})
+                return None, False
+            return ruta_pdf, False
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/extraer":
+                self.responder(404, {"error": "Ruta no encontrada"})
+                return
+            modo = parse_qs(url.query).get("modo", ["sincrono"])[0]
+            tipo = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+
+            # Todo se decide antes de leer el cuerpo: si se rechaza, la conexión se cierra sin leerlo
+            try:
+                longitud = int(self.headers.get("Content-Length") or -1)
+            except ValueError:
+                longitud = -1
+            if longitud < 0:
+                self.close_connection = True
+                self.responder(411, {"error": "Falta el encabezado Content-Length"})
+                return
+            maximo = servicio.max_bytes_subida if tipo == "application/pdf" else MAX_BYTES_JSON
+            if longitud > maximo:
+                self.close_connection = True
+                self.responder(413, {"error": f"El cuerpo supera el máximo de {maximo} bytes"})
+                return
+            if not servicio.reservar():
+                self.close_connection = True
+                self.responder(429, {"error": "Cola llena, intente más tarde"}, {"Retry-After": "5"})
+                return
+
+            try:
+                ruta_pdf, temporal = self.leer_documento(tipo, longitud)
+            except Exception:
+                servicio.liberar()
+                raise
+            if ruta_pdf is None:
+                servicio.liberar()
+                return
+            futuro = servicio.enviar(ruta_pdf, temporal)
+
+            if modo == "trabajo":
+                id_trabajo = servicio.registrar_trabajo(futuro)
+                self.responder(202, {"trabajo": id_trabajo}, {"Location": f"/trabajos/{id_trabajo}"})
+                return
+
+            try:
+                registro = futuro.result(timeout=espera_sincrona)
+            except TiempoAgotado:
+                # Demoró demasiado: se convierte en trabajo para consultarlo después
+                id_trabajo = servicio.registrar_trabajo(futuro)
+                self.responder(202, {"trabajo": id_trabajo}, {"Location": f"/trabajos/{id_trabajo}"})
+                return
+            except Exception as error:
+                self.responder(500, {"error": str(error)})
+                return
+            if "estado" in registro:
+                # Escaneado, cifrado o dañado: no se extrajo nada
+                self.responder(422, {"error": f"Documento {registro['estado']}, no se procesa", "registro": registro})
+                return
+            self.responder(200, {"registro": registro})
+
+    return Manejador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP local para procesar_documento.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--capacidad", type=int, default=None,
+                        help="Documentos en curso admitidos antes de responder 429 (por defecto 4 por proceso).")
+    parser.add_argument("--espera", type=float, default=120.0,
+                        help="Segundos que espera una petición síncrona antes de devolver un trabajo.")
+    parser.add_argument("--raiz", help="Solo se aceptan rutas de PDF dentro de esta carpeta.")
+    parser.add_argument("--max-mb", type=float, default=MAX_MB_SUBIDA, help="Tamaño máximo de un PDF subido.")
+    parser.add_argument("--partes-por-documento", type=int, default=1,
+                        help="Procesos entre los que se reparten las páginas de un PDF grande (útil con pocos documentos a la vez).")
+    args = parser.parse_args()
+
+    servicio = ServicioExtraccion(args.procesos, args.capacidad or args.procesos * 4, args.raiz,
+                                  args.partes_por_documento, int(args.max_mb * 1024 * 1024))
+    servidor = ThreadingHTTPServer((args.host, args.puerto), crear_manejador(servicio, args.espera))
+    print(f"🌐 Servicio de extracción en http://{args.host}:{args.puerto} con {args.procesos} procesos")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        if servicio.coordinadores is not None:
+            servicio.coordinadores.shutdown(wait=False, cancel_futures=True)
+        servicio.grupo.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
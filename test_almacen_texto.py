@@ -0,0 +1,109 @@
+# --------------------------------------------
+# PRUEBA: PROCESAR DESDE EL ALMACÉN DE TEXTO DA LO MISMO QUE EXTRAER DEL PDF
+# --------------------------------------------
+# El almacén de texto existe para ajustar los extractores sin volver a leer los PDFs, así que
+# procesar_documento con la tupla guardada (AlmacenTexto.extraido) tiene que dar exactamente el
+# mismo resultado que con una extracción nueva, incluidas las imágenes por página que usa
+# clasificar_paginas.
+#
+# Con la variable PDFS_REGRESION apuntando a una carpeta de tesis también se comparan esos PDFs:
+#   PDFS_REGRESION=/ruta/a/pdfs python -m pytest -q test_almacen_texto.py
+
+import contextlib
+import io
+import os
+
+import fitz
+import pytest
+
+import rae2
+from almacen_resultados import calcular_hash
+from almacen_texto import AlmacenTexto, extraido_o_guardado
+
+PARRAFO = (
+    "La investigación se desarrolló con estudiantes de grado décimo durante dos semestres, "
+    "con sesiones semanales de trabajo en el aula y registro en diarios de campo. "
+)
+
+
+def pdf_con_figura(ruta):
+    """ Tesis corta con una página de fotografía y pie de foto en medio del cuerpo. """
+    doc = fitz.open()
+
+    def pagina(texto, imagen=False):
+        nueva = doc.new_page()
+        if imagen:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+            pixmap.set_rect(pixmap.irect, (120, 160, 200))
+            nueva.insert_image(fitz.Rect(100, 200, 500, 600), pixmap=pixmap)
+        nueva.insert_textbox(fitz.Rect(50, 50, 550, 800), texto, fontsize=9)
+
+    pagina("UNIVERSIDAD PEDAGÓGICA NACIONAL\n\nLa escuela rural y la lectura\n\nAna Pérez Gómez\n")
+    pagina("Resumen\n" + PARRAFO * 4)
+    pagina("Capítulo 1\nDescripción\n" + PARRAFO * 6)
+    pagina("Conclusiones\nLas fotografías muestran el trabajo de los estudiantes en el aula rural.", imagen=True)
+    pagina("Capítulo 2\nMetodología\n" + PARRAFO * 6)
+    pagina("Conclusiones\n" + PARRAFO * 3 + "\n\nReferencias\nPérez, A. (2019). Lectura en la escuela rural. Bogotá.\n")
+    doc.save(ruta)
+
+
+def procesar(ruta_pdf, extraido=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return rae2.procesar_documento(ruta_pdf, extraido)
+
+
+def comparar_con_almacen(ruta_pdf, base):
+    hash_pdf = calcular_hash(ruta_pdf)
+    almacen = AlmacenTexto(base)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            nuevo = extraido_o_guardado(almacen, ruta_pdf, hash_pdf)
+        guardado = almacen.extraido(hash_pdf, ruta_pdf)
+        assert guardado == tuple(nuevo)
+        assert procesar(ruta_pdf, guardado) == procesar(ruta_pdf)
+    finally:
+        almacen.cerrar()
+    return nuevo
+
+
+def test_pdf_con_figura(tmp_path):
+    ruta_pdf = str(tmp_path / "figura.pdf")
+    pdf_con_figura(ruta_pdf)
+    extraido = comparar_con_almacen(ruta_pdf, str(tmp_path / "texto"))
+    # La página de la figura solo se reconoce con las imágenes: sin ellas cambian los papeles
+    paginas = rae2.separar_paginas(extraido[0], extraido[3])
+    assert rae2.clasificar_paginas(paginas, extraido[4]) != rae2.clasificar_paginas(paginas)
+
+
+def test_almacen_anterior_sin_imagenes(tmp_path):
+    ruta_pdf = str(tmp_path / "figura.pdf")
+    pdf_con_figura(ruta_pdf)
+    base = str(tmp_path / "texto")
+    extraido = rae2.extraer_texto_paginado(ruta_pdf)
+    almacen = AlmacenTexto(base)
+    almacen.agregar(calcular_hash(ruta_pdf), rae2.separar_paginas(extraido[0], extraido[3]))
+    almacen.cerrar()
+    os.truncate(base + ".imagenes", 0)  # Como un almacén escrito antes de guardar las imágenes
+
+    almacen = AlmacenTexto(base)
+    try:
+        assert almacen.extraido(calcular_hash(ruta_pdf), ruta_pdf)[4] is None
+        with contextlib.redirect_stdout(io.StringIO()):
+            almacen.agregar("00" * 32, ["otra página"], [2])
+        assert almacen.imagenes_de("00" * 32) == [2]
+        assert almacen.imagenes_de(calcular_hash(ruta_pdf)) is None
+    finally:
+        almacen.cerrar()
+
+
+def pdfs_de_prueba():
+    carpeta = os.environ.get("PDFS_REGRESION")
+    if not carpeta:
+        return []
+    return sorted(os.path.join(carpeta, n) for n in os.listdir(carpeta) if n.lower().endswith(".pdf"))
+
+
+@pytest.mark.skipif(not pdfs_de_prueba(), reason="PDFS_REGRESION no apunta a una carpeta con PDFs")
+def test_pdfs_reales(tmp_path):
+    for ruta_pdf in pdfs_de_prueba():
+        comparar_con_almacen(ruta_pdf, str(tmp_path / "texto"))
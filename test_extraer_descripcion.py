@@ -0,0 +1,101 @@
+# --------------------------------------------
+# PRUEBA: extraer_descripcion CON LA TABLA DE LÍNEAS DA LO MISMO QUE ANTES
+# --------------------------------------------
+# descripcion_original es extraer_descripcion tal como estaba antes de usar TablaLineas
+# (recorre las líneas del contenido y cuenta los puntos sobre el texto sin espacios de borde).
+# La versión con la tabla compartida tiene que dar exactamente el mismo resultado.
+#
+# Con la variable PDFS_REGRESION apuntando a una carpeta de tesis también se comparan los
+# textos reales de esos PDFs:
+#   PDFS_REGRESION=/ruta/a/pdfs python -m pytest -q test_extraer_descripcion.py
+
+import os
+import random
+import re
+
+import pytest
+
+import rae2
+from configuracion import patron_seccion
+
+CIERRES = [r"(?=\n\s*\n)", r"(?=\.\s*\n)"]
+
+
+def descripcion_original(texto, cierres):
+    contenido_dec = ""
+    for cierre in cierres:
+        for match in patron_seccion("descripcion", cierre).finditer(texto):
+            posible_contenido = match.group(3).strip()
+            lineas = posible_contenido.splitlines()
+
+            if lineas and (
+                re.match(r"^\s*\d+\s*$", lineas[0]) and int(lineas[0]) >= 2
+                or lineas[0].lower().startswith("xvii")
+            ):
+                continue
+
+            lineas_numeradas = sum(1 for l in lineas if re.match(r"^\s*(\d+\.){1,3}\s*", l))
+            if lineas_numeradas / max(1, len(lineas)) > 0.4:
+                continue
+
+            if sum(1 for c in posible_contenido if c == '.') / max(1, len(posible_contenido)) > 0.2:
+                continue
+
+            contenido_dec = posible_contenido
+            break
+
+    if contenido_dec:
+        parrafos = re.split(r'\n+\s*\n+', contenido_dec)
+        parrafos_largos = [re.sub(r'\s+', ' ', p).strip() for p in parrafos if len(p.split()) > 50]
+        if len(parrafos_largos) >= 2:
+            return '\n\n'.join(parrafos_largos[:2])
+        elif parrafos_largos:
+            return parrafos_largos[0]
+        else:
+            return re.sub(r'\s+', ' ', contenido_dec).strip()
+    return "No encontrado"
+
+
+def comparar(texto):
+    rae2.tabla_lineas.cache_clear()
+    assert rae2.extraer_descripcion(texto, CIERRES) == descripcion_original(texto, CIERRES)
+
+
+def test_primera_linea_con_sangria():
+    texto = "Introducción\n  1. Primera parte del documento\nfoo bar baz\n2. Segunda parte\nbar qux\n\n"
+    assert rae2.extraer_descripcion(texto, CIERRES) == "No encontrado"
+    comparar(texto)
+
+
+LINEAS_AZAR = [
+    "Introducción", "RESUMEN", "Resumen Ejecutivo", "1. Introducción", "CAPÍTULO I", "",
+    "   ", "  1. Primera parte del documento", "2.1. Antecedentes", "1.2.3 Alcance",
+    "Metodología .......... 12", ". . . . . .", "3", "12", "xvii", "   texto con sangría",
+    "La investigación se desarrolló en la Universidad Pedagógica Nacional durante dos años.",
+    "palabra " * 60, "Fin del párrafo.", "2. Metodología", "\x0c", "Conclusiones 45",
+]
+
+
+def test_textos_al_azar():
+    generador = random.Random(41)
+    for _ in range(3000):
+        lineas = [generador.choice(LINEAS_AZAR) for _ in range(generador.randint(3, 25))]
+        comparar("\n".join(lineas) + generador.choice(["", "\n", "\n\n", ".\n"]))
+
+
+def pdfs_de_prueba():
+    carpeta = os.environ.get("PDFS_REGRESION")
+    if not carpeta:
+        return []
+    return sorted(os.path.join(carpeta, n) for n in os.listdir(carpeta) if n.lower().endswith(".pdf"))
+
+
+@pytest.mark.skipif(not pdfs_de_prueba(), reason="PDFS_REGRESION no apunta a una carpeta con PDFs")
+def test_textos_reales():
+    for ruta_pdf in pdfs_de_prueba():
+        texto, _, _, desplazamientos, imagenes = rae2.extraer_texto_paginado(ruta_pdf)
+        comparar(texto)
+        # También sobre el texto que reciben los extractores de secciones (sin portada, índice ni anexos)
+        paginas = rae2.separar_paginas(texto, desplazamientos)
+        roles = rae2.clasificar_paginas(paginas, imagenes, rae2.detectar_tabla_contenido(paginas))
+        comparar(rae2.texto_de_roles(paginas, roles))
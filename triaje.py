@@ -0,0 +1,150 @@
+# --------------------------------------------
+# TRIAJE PREVIO: PDFs CIFRADOS O SOLO IMAGEN
+# --------------------------------------------
+# Las tesis escaneadas sin capa de texto y los PDFs protegidos con contraseña pasan por todo
+# el extractor solo para terminar con "No encontrado" en cada campo. Antes de procesar, se
+# revisa barato cada documento (cifrado, metadatos y, en unas pocas páginas de muestra,
+# cuánto texto hay frente a cuánta superficie ocupan las imágenes) y se clasifica:
+#
+#   texto        la mayoría de las páginas de muestra tienen capa de texto: sigue al extractor
+#   solo_imagen  predominan las páginas escaneadas (imagen sin texto): va a OCR. Una portada
+#                generada en digital no basta para que una tesis escaneada cuente como texto
+#   sin_texto    sin texto ni imágenes (páginas en blanco o contenido vectorial)
+#   cifrado      requiere contraseña para abrirse
+#   danado       PyMuPDF no lo pudo abrir
+#
+# Los que no son "texto" se anotan en una cola aparte (JSON Lines, junto al almacén) con su
+# estado, y no se ejecuta procesar_documento sobre ellos.
+
+import argparse
+import os
+from collections import Counter
+
+import fitz
+
+from almacen_resultados import calcular_hash, guardar_registro
+
+ESTADO_TEXTO = "texto"
+ESTADO_IMAGEN = "solo_imagen"
+ESTADO_SIN_TEXTO = "sin_texto"
+ESTADO_CIFRADO = "cifrado"
+ESTADO_DANADO = "danado"
+
+PAGINAS_MUESTRA = 7
+MIN_CARACTERES_PAGINA = 30  # Menos que esto se considera página sin texto (números de página, sellos)
+MIN_COBERTURA_IMAGEN = 0.5  # Fracción de la página cubierta por imágenes para considerarla escaneada
+MIN_PROPORCION_TEXTO = 0.5  # Fracción de las páginas de muestra con texto para tratar el PDF como texto
+
+
+def paginas_de_muestra(num_paginas, cantidad=PAGINAS_MUESTRA):
+    """ Índices repartidos a lo largo del documento (incluye la primera y la última página). """
+    if num_paginas <= cantidad:
+        return list(range(num_paginas))
+    return sorted({round(i * (num_paginas - 1) / (cantidad - 1)) for i in range(cantidad)})
+
+
+def cobertura_imagenes(pagina):
+    """ Fracción del área de la página cubierta por imágenes (sin pasar de 1). """
+    area_pagina = abs(pagina.rect) or 1
+    area = 0.0
+    for info in pagina.get_image_info():
+        area += abs(fitz.Rect(info["bbox"]) & pagina.rect)
+    return min(1.0, area / area_pagina)
+
+
+def clasificar_documento(doc):
+    """ Clasifica un documento ya abierto. Devuelve {"estado", "paginas", "detalle"}. """
+    metadatos = doc.metadata or {}
+    detalle = {"productor": metadatos.get("producer") or None, "creador": metadatos.get("creator") or None}
+
+    if doc.needs_pass:
+        return {"estado": ESTADO_CIFRADO, "paginas": len(doc), "detalle": detalle}
+
+    muestra = paginas_de_muestra(len(doc))
+    con_texto = 0
+    escaneadas = 0  # Páginas cubiertas por imágenes y sin texto
+    coberturas = []
+    for indice in muestra:
+        pagina = doc[indice]
+        cobertura = cobertura_imagenes(pagina)
+        if len(pagina.get_text().strip()) >= MIN_CARACTERES_PAGINA:
+            con_texto += 1
+        elif cobertura >= MIN_COBERTURA_IMAGEN:
+            escaneadas += 1
+        coberturas.append(cobertura)
+
+    cobertura = sum(coberturas) / len(coberturas) if coberturas else 0.0
+    detalle.update(
+        paginas_muestra=len(muestra),
+        paginas_con_texto=con_texto,
+        paginas_escaneadas=escaneadas,
+        cobertura_imagen=round(cobertura, 3),
+    )
+
+    # Texto si predominan las páginas con texto; las escaneadas pesan en contra (una portada
+    # digital sobre un escaneo no alcanza). Sin páginas escaneadas, basta con que haya texto.
+    proporcion_texto = con_texto / len(muestra) if muestra else 0.0
+    if con_texto > escaneadas and (proporcion_texto >= MIN_PROPORCION_TEXTO or not escaneadas):
+        estado = ESTADO_TEXTO
+    elif escaneadas:
+        estado = ESTADO_IMAGEN
+    else:
+        estado = ESTADO_SIN_TEXTO
+    return {"estado": estado, "paginas": len(doc), "detalle": detalle}
+
+
+def clasificar_pdf(ruta_pdf):
+    """ Abre el PDF solo para clasificarlo; no extrae el texto completo. """
+    try:
+        doc = fitz.open(ruta_pdf)
+    except Exception as error:
+        return {"estado": ESTADO_DANADO, "paginas": 0, "detalle": {"error": str(error)}}
+    try:
+        return clasificar_documento(doc)
+    finally:
+        doc.close()
+
+
+def ruta_cola_triaje(ruta_almacen):
+    """ La cola de documentos separados vive junto al almacén de resultados. """
+    return os.path.splitext(ruta_almacen)[0] + ".triaje.jsonl"
+
+
+def registro_separado(ruta_pdf, clasificacion, hash_pdf=None):
+    """ Registro de la cola de triaje: como los del almacén, pero con estado en lugar de resultado. """
+    return {
+        "hash": hash_pdf or calcular_hash(ruta_pdf),
+        "ruta": ruta_pdf,
+        "bytes": os.path.getsize(ruta_pdf),
+        "paginas": clasificacion["paginas"],
+        "estado": clasificacion["estado"],
+        "detalle": clasificacion["detalle"],
+    }
+
+
+def separar(ruta_cola, ruta_pdf, clasificacion, hash_pdf=None):
+    guardar_registro(ruta_cola, registro_separado(ruta_pdf, clasificacion, hash_pdf))
+    print(f"🚫 {clasificacion['estado']}: {ruta_pdf} (a la cola {ruta_cola})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clasifica los PDFs de una carpeta antes de extraer.")
+    parser.add_argument("directorio")
+    parser.add_argument("--cola", help="Anota aquí los documentos que no tienen capa de texto.")
+    args = parser.parse_args()
+
+    from manifiesto import enumerar_pdfs  # manifiesto importa rae2, que a su vez usa este módulo
+
+    conteo = Counter()
+    for ruta_pdf in enumerar_pdfs(args.directorio):
+        clasificacion = clasificar_pdf(ruta_pdf)
+        conteo[clasificacion["estado"]] += 1
+        if clasificacion["estado"] != ESTADO_TEXTO and args.cola:
+            separar(args.cola, ruta_pdf, clasificacion)
+
+    for estado, cantidad in conteo.most_common():
+        print(f"   {estado}: {cantidad}")
+
+
+if __name__ == "__main__":
+    main()